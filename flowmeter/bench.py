@@ -0,0 +1,294 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+import argparse
+import json
+import platform
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import yaml
+
+from flowmeter import transfer
+from flowmeter.database.database import Database
+from flowmeter.database.schema import Schema, load_schema
+from flowmeter.logic.energyprovider import EnergyProvider
+from flowmeter.logic.resultcache import ResultCache
+
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "database", "database_model.yaml")
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SIZES = (1000, 10000, 100000)
+BENCHMARKS = (
+    "insert_bulk", "import_csv", "get_all_entries", "get_last_entry", "calculate_consumption",
+    "prepare_monthly_data", "plot_data", "initialize", "insert_single",
+)
+HISTORY_START = np.datetime64("2010-01-01T00:00:00", "s")
+SINGLE_INSERTS = 200
+LAST_ENTRY_CALLS = 100
+INITIALIZE_CALLS = 1000
+SCHEMA_LOADS = 1000
+# Startzeit des Hauptmenüs; diese Pakete dürfen dabei nicht geladen werden
+STARTUP = "startup"
+STARTUP_MODULE = "flowmeter.flowmeter"
+HEAVY_MODULES = ("matplotlib", "seaborn", "tkcalendar")
+LOAD_SCHEMA = "load_schema"
+
+
+def synthetic_history(size, seed=0, block_size=100000):
+    """
+    Erzeugt reproduzierbar size Stromzählerstände im Minutentakt als (Zeitstempel, Zählerstand)-Paare.
+    Die Werte entstehen blockweise, damit auch 10 Mio. Einträge nicht auf einmal im Speicher liegen.
+    """
+    rng = np.random.default_rng(seed)
+    reading = 0
+    for start in range(0, size, block_size):
+        count = min(block_size, size - start)
+        timestamps = HISTORY_START + 60 * np.arange(start, start + count)
+        # Zehntel-kWh, höchstens 999999,9 kWh wie im Schema erlaubt
+        tenths = np.minimum(reading + np.cumsum(rng.integers(0, 2, count)), 9999999)
+        reading = int(tenths[-1])
+        yield from zip(np.char.replace(np.datetime_as_string(timestamps), "T", " ").tolist(), (tenths / 10).tolist())
+
+
+def measure(func, repeat, setup=None, warmup=False):
+    # Liefert die Laufzeiten in Sekunden; setup und der Aufwärmlauf (Importe, Caches) zählen nicht mit
+    if warmup:
+        func()
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _result(timings, size, operations=1, throughput=False):
+    best = min(timings)
+    result = {
+        "rows": size,
+        "seconds": best,
+        "median": statistics.median(timings),
+        "per_operation": best / operations,
+    }
+    if throughput:
+        # Für Schreib- und Importpfade: gespeicherte Einträge je Sekunde
+        result["rows_per_second"] = size / best if best else 0.0
+    return result
+
+
+def _plot_data(provider):
+    # Aufbereitung wie in DataDisplayGUI.create_plot_window, headless mit dem Agg-Backend
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from flowmeter.gui.datadisplay import build_plot
+
+    fig, _, _ = build_plot(provider.load_series("electricity"), provider.get_energy_targets())
+    plt.close(fig)
+
+
+def import_profile(module=STARTUP_MODULE):
+    """
+    Importiert module in einem frischen Interpreter mit -X importtime. Liefert die kumulierte
+    Importzeit in Sekunden und die Namen aller dabei geladenen Module.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    )
+    modules = {}
+    for line in completed.stderr.splitlines():
+        parts = line.split("|")
+        if not line.startswith("import time:") or len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        modules[parts[2].strip()] = int(parts[1]) / 1e6
+    return modules[module], set(modules)
+
+
+def measure_startup(repeat=3, module=STARTUP_MODULE):
+    # Der Aufwärmlauf schreibt die .pyc-Dateien, gemessen wird danach wie bei einem normalen Start
+    import_profile(module)
+    profiles = [import_profile(module) for _ in range(repeat)]
+    result = _result([seconds for seconds, _ in profiles], 0)
+    result["heavy_modules"] = sorted({
+        name for _, modules in profiles for name in modules if name.split(".")[0] in HEAVY_MODULES
+    })
+    return result
+
+
+def measure_load_schema(repeat=3):
+    # Erstes Laden: YAML parsen und alle SQL-Anweisungen erzeugen; danach der Treffer im Schema-Zwischenspeicher
+    def parse():
+        with open(SCHEMA_FILE, "r") as file:
+            Schema(yaml.safe_load(file))
+
+    result = _result(measure(parse, repeat, warmup=True), 0)
+    cached = measure(lambda: [load_schema(SCHEMA_FILE) for _ in range(SCHEMA_LOADS)], repeat, warmup=True)
+    result["cached_per_operation"] = min(cached) / SCHEMA_LOADS
+    return result
+
+
+def run_size(size, repeat=3, only=None, directory=None):
+    """
+    Misst alle Benchmarks für eine Historie mit size Einträgen in einer eigenen Datenbank.
+    """
+    selected = [name for name in BENCHMARKS if only is None or name in only]
+    results = {}
+    with tempfile.TemporaryDirectory(dir=directory) as temporary:
+        database = Database(database_name=os.path.join(temporary, "bench.db"), schema_file=SCHEMA_FILE)
+        database.initialize()
+        # Eigener Zwischenspeicher ohne Einträge, damit jede Messung wirklich rechnet
+        provider = EnergyProvider(database=database, cache=ResultCache(max_entries=0))
+        try:
+            timings = measure(
+                lambda: database.insert_meter_readings_bulk("electricity", synthetic_history(size), chunk_size=50000),
+                repeat if "insert_bulk" in selected else 1,
+                setup=database.delete_all_data,
+                warmup="insert_bulk" in selected,
+            )
+            if "insert_bulk" in selected:
+                results["insert_bulk"] = _result(timings, size, size, throughput=True)
+
+            # Dateiimport wie über die Oberfläche (CSV, Duplikate überspringen); danach ist die Historie wieder vollständig
+            if "import_csv" in selected:
+                path = os.path.join(temporary, "history.csv")
+                transfer.export_file(database, "electricity", path)
+                timings = measure(
+                    lambda: transfer.import_file(database, "electricity", path, on_duplicate="skip"),
+                    repeat,
+                    setup=database.delete_all_data,
+                )
+                results["import_csv"] = _result(timings, size, size, throughput=True)
+
+            last_day = str((HISTORY_START + 60 * (size - 1)).astype("datetime64[D]"))
+            provider.add_provider("electricity", 3650, str(HISTORY_START.astype("datetime64[D]")))
+            benchmarks = {
+                "get_all_entries": (lambda: database.get_all_entries("electricity"), 1),
+                "get_last_entry": (lambda: [database.get_last_entry("electricity") for _ in range(LAST_ENTRY_CALLS)], LAST_ENTRY_CALLS),
+                "calculate_consumption": (lambda: provider.calculate_consumption("electricity"), 1),
+                "prepare_monthly_data": (lambda: provider.prepare_monthly_data("electricity", current_date=last_day), 1),
+                "plot_data": (lambda: _plot_data(provider), 1),
+                # Schneller Weg über PRAGMA user_version auf einer bestehenden Datenbank
+                "initialize": (lambda: [
+                    Database(database_name=database.database_name, schema_file=SCHEMA_FILE).initialize()
+                    for _ in range(INITIALIZE_CALLS)
+                ], INITIALIZE_CALLS),
+            }
+            for name, (func, operations) in benchmarks.items():
+                if name in selected:
+                    results[name] = _result(measure(func, repeat, warmup=True), size, operations)
+
+            # Zuletzt, weil einzelne Einträge mit aktuellem Zeitstempel die Historie verändern
+            if "insert_single" in selected:
+                timings = measure(
+                    lambda: [database.insert_meter_reading("electricity", 999999.9) for _ in range(SINGLE_INSERTS)],
+                    repeat,
+                )
+                results["insert_single"] = _result(timings, size, SINGLE_INSERTS)
+        finally:
+            database.close()
+    return results
+
+
+def run(sizes=DEFAULT_SIZES, repeat=3, only=None, directory=None, progress=None):
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "sqlite": sqlite3.sqlite_version,
+            "repeat": repeat,
+        },
+        "results": {},
+    }
+    # Unabhängig von der Größe der Historie
+    for name, func in ((STARTUP, measure_startup), (LOAD_SCHEMA, measure_load_schema)):
+        if only is None or name in only:
+            report["results"][name] = result = func(repeat)
+            if progress:
+                progress(name, result)
+    for size in (sizes if only is None or set(BENCHMARKS) & only else ()):
+        for name, result in run_size(size, repeat, only, directory).items():
+            key = f"{name}@{size}"
+            report["results"][key] = result
+            if progress:
+                progress(key, result)
+    return report
+
+
+def compare(report, baseline, tolerance=0.25):
+    """
+    Vergleicht mit einer gespeicherten Messung. Liefert je gemeinsamem Benchmark das Verhältnis
+    aktuell / Basis und ob es die Toleranz überschreitet.
+    """
+    comparison = {}
+    for key, result in report["results"].items():
+        reference = baseline.get("results", {}).get(key)
+        if not reference or not reference["seconds"]:
+            continue
+        ratio = result["seconds"] / reference["seconds"]
+        comparison[key] = {"ratio": ratio, "regression": ratio > 1 + tolerance}
+    return comparison
+
+
+def print_result(key, result):
+    line = f"{key:<36} {result['seconds'] * 1000:10.2f} ms  {result['per_operation'] * 1e6:12.3f} µs/Op"
+    if "rows_per_second" in result:
+        line += f"  {result['rows_per_second']:12.0f} Einträge/s"
+    print(line, file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m flowmeter.bench", description="Laufzeiten der wichtigsten FlowMeter-Pfade messen.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="Größen der Historie, z. B. 1000,10000,10000000")
+    parser.add_argument("--repeat", type=int, default=3, help="Messungen je Benchmark, gewertet wird die schnellste")
+    parser.add_argument("--only", help=f"Nur diese Benchmarks: {', '.join(BENCHMARKS + (STARTUP, LOAD_SCHEMA))}")
+    parser.add_argument("--output", help="Ergebnis als JSON in diese Datei schreiben (Standard: Ausgabe)")
+    parser.add_argument("--baseline", help="Mit dieser gespeicherten Messung vergleichen")
+    parser.add_argument("--save-baseline", help="Ergebnis zusätzlich als neue Basis speichern")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Erlaubte Verlangsamung gegenüber der Basis (0.25 = 25 %%)")
+    parser.add_argument("--directory", help="Verzeichnis für die temporären Datenbanken")
+    args = parser.parse_args(argv)
+
+    only = set(args.only.split(",")) if args.only else None
+    unknown = (only or set()) - set(BENCHMARKS) - {STARTUP, LOAD_SCHEMA}
+    if unknown:
+        parser.error(f"Unbekannte Benchmarks: {', '.join(sorted(unknown))}")
+    sizes = [int(size) for size in args.sizes.split(",")]
+    report = run(sizes, args.repeat, only, args.directory, print_result)
+
+    regressions = []
+    heavy_modules = report["results"].get(STARTUP, {}).get("heavy_modules")
+    if heavy_modules:
+        regressions.append(STARTUP)
+        print(f"Beim Start geladen: {', '.join(heavy_modules)}", file=sys.stderr)
+    if args.baseline:
+        with open(args.baseline) as file:
+            report["comparison"] = compare(report, json.load(file), args.tolerance)
+        slower = [key for key, entry in report["comparison"].items() if entry["regression"]]
+        regressions += slower
+        for key in slower:
+            print(f"Langsamer als die Basis: {key} ({report['comparison'][key]['ratio']:.2f}x)", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as file:
+            file.write(output + "\n")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
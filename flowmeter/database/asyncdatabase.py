@@ -0,0 +1,145 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
+
+from flowmeter.database.connectionregistry import connection_registry
+from flowmeter.database.database import Database, TIMESTAMP_FORMAT
+from flowmeter.logic.energyprovider import EnergyProvider
+
+
+class AsyncDatabase:
+    """
+    Asyncio-Fassade für Database: Schreibzugriffe laufen in einem eigenen Schreib-Thread, Lesezugriffe in einem Pool.
+    Gleichzeitig eintreffende Zählerstände werden in einer gemeinsamen Transaktion gespeichert.
+    """
+
+    def __init__(self, database_name="flowmeter/database/meter_readings.db", schema_file="flowmeter/database/database_model.yaml", readers=4, max_batch_size=10000):
+        self.database = Database(database_name=database_name, schema_file=schema_file)
+        self.max_batch_size = max_batch_size
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="flowmeter-writer")
+        self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="flowmeter-reader")
+        self._pending = {}
+        self._flush_task = None
+
+    async def __aenter__(self):
+        await self.initialize()
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        await self.close()
+
+    async def _write(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._writer, partial(func, *args))
+
+    async def _read(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._readers, partial(func, *args))
+
+    async def initialize(self):
+        await self._write(self.database.initialize)
+
+    async def close(self):
+        if self._flush_task is not None:
+            await self._flush_task
+        await self._write(self.database.close)
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+        # Die Lese-Threads sind beendet, ihre Verbindungen werden damit frei
+        connection_registry.prune()
+
+    async def insert_meter_reading(self, meter_type, meter_reading, timestamp=None):
+        self.database.get_meter_type(meter_type)
+        if timestamp is None:
+            # Entspricht CURRENT_TIMESTAMP von SQLite (UTC)
+            timestamp = datetime.now(timezone.utc).strftime(TIMESTAMP_FORMAT)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(meter_type, []).append(((timestamp, meter_reading), future))
+        if self._flush_task is None:
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush())
+        await future
+
+    async def _flush(self):
+        try:
+            # Einen Durchlauf der Event-Loop abwarten, damit gleichzeitige Aufrufe in dieselbe Transaktion fallen
+            await asyncio.sleep(0)
+            while self._pending:
+                pending, self._pending = self._pending, {}
+                for meter_type, entries in pending.items():
+                    for start in range(0, len(entries), self.max_batch_size):
+                        await self._commit_batch(meter_type, entries[start:start + self.max_batch_size])
+        finally:
+            self._flush_task = None
+
+    async def _commit_batch(self, meter_type, entries):
+        rows = [row for row, _ in entries]
+        try:
+            result = await self._write(
+                self.database.insert_meter_readings_bulk, meter_type, rows, len(rows)
+            )
+        except Exception as e:
+            for _, future in entries:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        errors = {rejection["index"]: rejection["error"] for rejection in result["rejected"]}
+        for index, (_, future) in enumerate(entries):
+            if future.done():
+                continue
+            if index in errors:
+                future.set_exception(ValueError(errors[index]))
+            else:
+                future.set_result(None)
+
+    async def insert_electricity_meter(self, electricity_meter_reading, timestamp=None):
+        await self.insert_meter_reading("electricity", electricity_meter_reading, timestamp)
+
+    async def insert_gas_meter(self, gas_meter_reading, timestamp=None):
+        await self.insert_meter_reading("gas", gas_meter_reading, timestamp)
+
+    async def get_last_entry(self, meter_type):
+        return await self._read(self.database.get_last_entry, meter_type)
+
+    async def get_last_electricity_meter(self):
+        return await self.get_last_entry("electricity")
+
+    async def get_last_gas_meter(self):
+        return await self.get_last_entry("gas")
+
+    async def get_all_entries(self, meter_type):
+        return await self._read(self.database.get_all_entries, meter_type)
+
+    async def get_all_electricity_meters(self):
+        return await self.get_all_entries("electricity")
+
+    async def get_all_gas_meters(self):
+        return await self.get_all_entries("gas")
+
+    async def delete_entry(self, meter_type, record_id):
+        await self._write(self.database.delete_entry, meter_type, record_id)
+
+    async def delete_all_data(self):
+        await self._write(self.database.delete_all_data)
+
+    async def insert_energy_provider(self, energy_type, annual_energy, start_date):
+        await self._write(self.database.insert_energy_provider, energy_type, annual_energy, start_date)
+
+    async def update_energy_provider(self, energy_type, annual_energy, start_date):
+        await self._write(self.database.update_energy_provider, energy_type, annual_energy, start_date)
+
+    async def delete_energy_provider(self, energy_type):
+        await self._write(self.database.delete_energy_provider, energy_type)
+
+    async def get_energy_provider(self, energy_type):
+        return await self._read(self.database.get_energy_provider, energy_type)
+
+    async def get_all_energy_providers(self):
+        return await self._read(self.database.get_all_energy_providers)
+
+    async def calculate_consumption(self, meter_type, include_consumptions=True):
+        provider = EnergyProvider(database=self.database)
+        return await self._read(provider.calculate_consumption, meter_type, include_consumptions)
@@ -0,0 +1,138 @@
+import atexit
+import os
+import sqlite3
+import threading
+
+
+class ConnectionRegistry:
+    """
+    Prozessweite Verwaltung der SQLite-Verbindungen, je Datenbankpfad und Thread eine Verbindung.
+    Jeder Thread schließt nur seine eigene Verbindung; die Verbindungen beendeter Threads werden
+    beim Öffnen neuer Verbindungen freigegeben, close_all leert beim Beenden den ganzen Bestand.
+    Zusätzlich zählt sie je Datenbankpfad die Änderungen (data_version), damit abgeleitete
+    Ergebnisse erkennen, ob sich seit ihrer Berechnung etwas geändert hat. Änderungen anderer
+    Prozesse (Ingest-Dienst, Import über die Kommandozeile) erkennt sie an PRAGMA data_version.
+    Schreibzugriffe mit scope (z. B. ein Zählertyp) zählen zusätzlich getrennt, damit scope_version
+    nur mit den Änderungen dieses Bereichs, nicht zugeordneten Änderungen und fremden Commits steigt.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (Pfad, Thread) -> (Verbindung, Generation beim Öffnen)
+        self._connections = {}
+        # Pfad -> Generation; invalidate erhöht sie, damit alle Threads neu verbinden
+        self._generations = {}
+        self._versions = {}
+        # Pfad -> Änderungen ohne scope und Commits anderer Prozesse; (Pfad, scope) -> Änderungen im Bereich
+        self._shared = {}
+        self._scoped = {}
+        # (Pfad, Thread) -> zuletzt gesehenes PRAGMA data_version der Verbindung
+        self._seen = {}
+
+    def _path(self, database_name):
+        if database_name == ":memory:":
+            return database_name
+        return os.path.abspath(database_name)
+
+    def _is_open(self, connection):
+        try:
+            connection.total_changes
+        except sqlite3.ProgrammingError:
+            return False
+        return True
+
+    def get(self, database_name, pragmas=None):
+        path = self._path(database_name)
+        key = (path, threading.get_ident())
+        generation = self._generations.get(path, 0)
+        entry = self._connections.get(key)
+        if entry is not None:
+            connection, opened = entry
+            if opened == generation and self._is_open(connection):
+                return connection
+            # Veraltete eigene Verbindung, der Thread schließt sie selbst
+            connection.close()
+
+        self.prune()
+        connection = sqlite3.connect(database_name, check_same_thread=False)
+        for name, value in (pragmas or {}).items():
+            connection.execute(f"PRAGMA {name} = {value};")
+        with self._lock:
+            self._connections[key] = (connection, generation)
+            self._seen.pop(key, None)
+        return connection
+
+    def data_version(self, database_name, connection=None):
+        # Mit connection zählt auch, was andere Verbindungen seit der letzten Abfrage dieses Threads
+        # festgeschrieben haben. Eigene Commits ändern PRAGMA data_version nicht, die zählt bump_data_version.
+        path = self._path(database_name)
+        if connection is not None:
+            self._check_external(path, connection)
+        return self._versions.get(path, 0)
+
+    def scope_version(self, database_name, scope, connection=None):
+        # Wie data_version, aber Schreibzugriffe auf andere Bereiche ändern den Wert nicht
+        path = self._path(database_name)
+        if connection is not None:
+            self._check_external(path, connection)
+        return self._shared.get(path, 0), self._scoped.get((path, scope), 0)
+
+    def _check_external(self, path, connection):
+        key = (path, threading.get_ident())
+        external = connection.execute("PRAGMA data_version;").fetchone()[0]
+        with self._lock:
+            # Eine noch nie abgefragte Verbindung zählt ebenfalls, sie könnte Änderungen verpasst haben
+            if self._seen.get(key) != external:
+                self._seen[key] = external
+                self._versions[path] = self._versions.get(path, 0) + 1
+                self._shared[path] = self._shared.get(path, 0) + 1
+
+    def bump_data_version(self, database_name, scope=None):
+        # Ohne scope gilt die Änderung als möglicherweise alle Bereiche betreffend
+        path = self._path(database_name)
+        with self._lock:
+            self._versions[path] = self._versions.get(path, 0) + 1
+            if scope is None:
+                self._shared[path] = self._shared.get(path, 0) + 1
+            else:
+                self._scoped[(path, scope)] = self._scoped.get((path, scope), 0) + 1
+            return self._versions[path]
+
+    def close(self, database_name):
+        # Schließt nur die Verbindung des aufrufenden Threads, andere Threads arbeiten ungestört weiter
+        key = (self._path(database_name), threading.get_ident())
+        with self._lock:
+            entry = self._connections.pop(key, None)
+            self._seen.pop(key, None)
+        if entry is not None:
+            entry[0].close()
+
+    def invalidate(self, database_name):
+        # Alle Threads öffnen beim nächsten Zugriff eine neue Verbindung, z. B. nach Löschen der Datei
+        path = self._path(database_name)
+        with self._lock:
+            self._generations[path] = self._generations.get(path, 0) + 1
+        self.close(database_name)
+
+    def prune(self):
+        # Verbindungen beendeter Threads freigeben
+        alive = {thread.ident for thread in threading.enumerate()}
+        with self._lock:
+            dead = [key for key in self._connections if key[1] not in alive]
+            entries = [self._connections.pop(key) for key in dead]
+            for key in dead:
+                self._seen.pop(key, None)
+        for connection, _ in entries:
+            connection.close()
+
+    def close_all(self):
+        with self._lock:
+            entries = list(self._connections.values())
+            self._connections.clear()
+            self._seen.clear()
+        for connection, _ in entries:
+            connection.close()
+
+
+connection_registry = ConnectionRegistry()
+atexit.register(connection_registry.close_all)
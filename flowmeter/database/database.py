@@ -3,7 +3,29 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../'
 
 import re
 import sqlite3
-import yaml
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import partial
+from itertools import islice
+from flowmeter.database.connectionregistry import connection_registry
+from flowmeter.database.schema import load_schema
+from flowmeter.database.tracing import TracedCursor, tracer
+
+TIMESTAMP_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$")
+# Ganzer Chunk als eine durch Zeilenumbrüche getrennte Zeichenkette, siehe _validate_chunk
+TIMESTAMP_BLOCK_PATTERN = re.compile(r"(?:\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\n)*\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}")
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+BUCKET_FORMATS = {
+    "hour": "%Y-%m-%d %H:00",
+    "day": "%Y-%m-%d",
+    "week": "%Y-%m-%d",
+    "month": "%Y-%m",
+}
+# Wochen werden nach ihrem Montag benannt, damit eine Woche über den Jahreswechsel ein Intervall bleibt
+BUCKET_MODIFIERS = {
+    "week": ("weekday 0", "-6 days"),
+}
 
 class Database:
     def __init__(self, database_name="flowmeter/database/meter_readings.db", schema_file="flowmeter/database/database_model.yaml"):
@@ -13,76 +35,144 @@ class Database:
         self._load_schema()
 
     def _load_schema(self):
-        try:
-            with open(self.schema_file, "r") as file:
-                self.schema = yaml.safe_load(file)
-        except FileNotFoundError as e:
-            raise FileNotFoundError(f"Schema-Datei nicht gefunden: {e}")
+        self.schema = load_schema(self.schema_file)
+        self.sql = self.schema.sql
 
     def _connect(self):
-        if not self.connection:
-            self.connection = sqlite3.connect(self.database_name)
+        self.connection = connection_registry.get(self.database_name, self.schema.pragmas)
         return self.connection
 
-    def _execute_sql(self, sql, params=None, fetchone=False, fetchall=False, executescript=False):
+    def close(self):
+        connection_registry.close(self.database_name)
+        self.connection = None
+
+    @property
+    def data_version(self):
+        # Prozessweiter Zähler je Datenbankdatei, steigt mit jeder Änderung über eine Database-Instanz
+        # und mit jedem Commit anderer Prozesse auf dieselbe Datei
+        return connection_registry.data_version(self.database_name, self._connect())
+
+    def scope_version(self, scope, external=True):
+        # Datenstand eines Bereichs, z. B. eines Zählertyps oder ("fleet", meterID); external=False
+        # spart das PRAGMA data_version und übersieht dafür Commits anderer Prozesse seit der letzten Abfrage
+        return connection_registry.scope_version(self.database_name, scope, self._connect() if external else None)
+
+    def _execute_sql(self, sql, params=None, fetchone=False, fetchall=False, executescript=False, scope=None):
+        # scope ordnet eine Änderung einem Bereich zu, siehe scope_version
+        if tracer.enabled:
+            return self._execute_sql_traced(sql, params, fetchone, fetchall, executescript, scope)
         with self._connect() as connection:
+            changes = connection.total_changes
             cursor = connection.cursor()
             if executescript:
                 cursor.executescript(sql)
             else:
                 cursor.execute(sql, params or ())
             connection.commit()
+            if connection.total_changes != changes:
+                connection_registry.bump_data_version(self.database_name, scope)
             if fetchone:
                 return cursor.fetchone()
             if fetchall:
                 return cursor.fetchall()
 
-    def _validate_input(self, value, pattern, value_name, is_float=True):
-        if is_float and not isinstance(value, float):
-            raise ValueError(f"{value_name} muss ein Float-Wert sein.")
-        if not re.match(pattern, str(value)):
-            raise ValueError(f"{value_name} entspricht nicht dem Muster {pattern}.")
+    def _execute_sql_traced(self, sql, params, fetchone, fetchall, executescript, scope):
+        # Wie _execute_sql, zusätzlich mit Laufzeit, Zeilenzahl und Commit für tracer.stats()
+        with self._connect() as connection:
+            changes = connection.total_changes
+            start = time.perf_counter()
+            cursor = connection.cursor()
+            if executescript:
+                cursor.executescript(sql)
+            else:
+                cursor.execute(sql, params or ())
+            if fetchone:
+                result = cursor.fetchone()
+                rows = int(result is not None)
+            elif fetchall:
+                result = cursor.fetchall()
+                rows = len(result)
+            else:
+                result = None
+                rows = max(cursor.rowcount, 0)
+            connection.commit()
+            tracer.record_statement(connection, sql, params, time.perf_counter() - start, rows, explain=not executescript)
+            tracer.record_commit()
+            if connection.total_changes != changes:
+                connection_registry.bump_data_version(self.database_name, scope)
+            return result
+
+    @contextmanager
+    def _transaction(self, scope=None):
+        connection = self._connect()
+        changes = connection.total_changes
+        cursor = connection.cursor()
+        try:
+            # IMMEDIATE sichert die Schreibsperre sofort; bei lesenden Schreibtransaktionen würde ein
+            # späteres Hochstufen im WAL-Modus sonst an zwischenzeitlichen Commits anderer scheitern
+            cursor.execute("BEGIN IMMEDIATE")
+            yield TracedCursor(cursor, tracer) if tracer.enabled else cursor
+            connection.commit()
+            if tracer.enabled:
+                tracer.record_commit()
+        except Exception:
+            connection.rollback()
+            raise
+        if connection.total_changes != changes:
+            connection_registry.bump_data_version(self.database_name, scope)
 
     def initialize(self):
+        if self.database_name != ":memory:" and not os.path.exists(self.database_name):
+            # Verbindungen auf eine gelöschte Datei verwerfen, sonst würde weiter in diese geschrieben
+            connection_registry.invalidate(self.database_name)
         if not self._is_consistent():
             self._create_database()
+            self.rebuild_rollups()
 
     def _create_database(self):
-        with self._connect() as connection:
-            cursor = connection.cursor()
-            for table in self.schema["database"]["tables"]:
-                table_name = table["name"]
-                columns = ", ".join(
-                    [f"{column['name']} {column['type']} {' '.join(column.get('constraints', []))}" for column in table["columns"]]
-                )
-                unique_constraints = table.get("unique_constraints", [])
-                for constraint in unique_constraints:
-                    columns += f", UNIQUE ({', '.join(constraint['columns'])})"
-                sql = f"CREATE TABLE IF NOT EXISTS {table_name} ({columns});"
+        with self._transaction() as cursor:
+            # Sichten werden immer neu angelegt, damit sie zur aktuellen Speicherart passen
+            for view in self.schema.views:
+                cursor.execute(f"DROP VIEW IF EXISTS {view};")
+            for meter_type in self.schema.stored_meter_types:
+                self._migrate_storage(cursor, self.schema.meter_types[meter_type])
+            for sql in self.schema.create_statements:
                 cursor.execute(sql)
-            for view in self.schema["database"]["views"]:
-                sql = f"CREATE VIEW IF NOT EXISTS {view['name']} AS {view['definition']}"
-                cursor.execute(sql)
-            connection.commit()
+            cursor.execute(f"PRAGMA user_version = {self.schema.version};")
+
+    def _migrate_storage(self, cursor, meter):
+        # Baut die Zählertabelle um, wenn die Speicherart (integer/decimal) gewechselt hat.
+        # Die Tagessummen werden verworfen und von initialize() neu berechnet.
+        columns = {row[1]: row[2] for row in cursor.execute(f"PRAGMA table_info({meter.table});")}
+        if not columns or columns.get(meter.reading_column) == meter.reading_type:
+            return
+        if meter.integer_storage:
+            converted = f"CAST(ROUND({meter.reading_column} * {meter.scale}) AS INTEGER)"
+        else:
+            converted = f"{meter.reading_column} / {meter.scale}.0"
+        table_sql = next(sql for sql in self.schema.create_statements if sql.startswith(f"CREATE TABLE IF NOT EXISTS {meter.table} "))
+        cursor.execute(f"ALTER TABLE {meter.table} RENAME TO {meter.table}_migration;")
+        cursor.execute(table_sql)
+        cursor.execute(
+            f"INSERT INTO {meter.table} ({meter.id_column}, timestamp, {meter.reading_column}) "
+            f"SELECT {meter.id_column}, timestamp, {converted} FROM {meter.table}_migration;"
+        )
+        cursor.execute(f"DROP TABLE {meter.table}_migration;")
+        cursor.execute(f"DROP TABLE IF EXISTS {meter.daily_table};")
+        cursor.execute(f"DROP TABLE IF EXISTS {meter.monthly_table};")
 
     def _is_consistent(self):
-        if not os.path.exists(self.database_name):
+        if self.database_name != ":memory:" and not os.path.exists(self.database_name):
             return False
-        with self._connect() as connection:
-            cursor = connection.cursor()
-            try:
-                for table in self.schema["database"]["tables"]:
-                    cursor.execute(f"SELECT 1 FROM {table['name']} LIMIT 1;")
-                for view in self.schema["database"]["views"]:
-                    cursor.execute(f"SELECT 1 FROM {view['name']} LIMIT 1;")
-            except sqlite3.Error:
-                return False
-        return True
-
+        try:
+            user_version = self._connect().execute("PRAGMA user_version;").fetchone()[0]
+        except sqlite3.Error:
+            return False
+        return user_version == self.schema.version
 
     def insert_energy_provider(self, energy_type, annual_energy, start_date):
-        sql_insert = self.schema["database"]["sql"]["insert_energy_data"]
-        sql_update = self.schema["database"]["sql"]["update_energy_data"]
+        sql_insert = self.sql["insert_energy_data"]
+        sql_update = self.sql["update_energy_data"]
 
         existing_entry = self.get_energy_provider(energy_type)
         if existing_entry:
@@ -91,11 +181,11 @@ class Database:
             self._execute_sql(sql_insert, (energy_type, annual_energy, start_date))
 
     def update_energy_provider(self, energy_type, annual_energy, start_date):
-        sql = self.schema["database"]["sql"]["update_energy_data"]
+        sql = self.sql["update_energy_data"]
         self._execute_sql(sql, (annual_energy, start_date, energy_type))
 
     def delete_energy_provider(self, energy_type):
-        sql = self.schema["database"]["sql"]["delete_energy_data_entry"]
+        sql = self.sql["delete_energy_data_entry"]
         self._execute_sql(sql, (energy_type,))
 
     def get_energy_provider(self, energy_type):
@@ -103,23 +193,235 @@ class Database:
         return self._execute_sql(sql, (energy_type,), fetchone=True)
 
     def get_all_energy_providers(self):
-        sql = self.schema["database"]["sql"]["query_energy_data"]
+        sql = self.sql["query_energy_data"]
         return self._execute_sql(sql, fetchall=True)
 
-    def insert_meter_reading(self, meter_type, meter_reading, pattern):
-        self._validate_input(meter_reading, pattern, f"{meter_type}-Zählerstand")
-        sql = self.schema["database"]["sql"][f"insert_{meter_type}_meter"]
-        self._execute_sql(sql, (meter_reading,))
+    def get_validator(self, meter_type):
+        # Auch für Zählertypen ohne eigene Tabelle (Zählerflotte)
+        meter = self.schema.meter_types.get(meter_type)
+        if meter is None:
+            raise ValueError(f"Ungültiger Zählertyp {meter_type}. Erlaubt sind: {', '.join(self.schema.meter_types)}.")
+        return meter.validator
+
+    def get_meter_type(self, meter_type):
+        # Zählertypen mit eigener Tabelle; die übrigen werden über die Zählerflotte gespeichert
+        meter = self.schema.meter_types.get(meter_type)
+        if meter is None or meter.sql is None:
+            raise ValueError(f"Ungültiger Zählertyp {meter_type}. Erlaubt sind: {', '.join(self.schema.stored_meter_types)}.")
+        return meter
+
+    def _refresh_rollups(self, cursor, meter, first_timestamp, last_timestamp):
+        days = {"start": first_timestamp[:10], "end": last_timestamp[:10]}
+        months = {"start": first_timestamp[:7], "end": last_timestamp[:7]}
+        cursor.execute(meter.sql.delete_daily_range, days)
+        cursor.execute(meter.sql.insert_daily_range, days)
+        cursor.execute(meter.sql.delete_monthly_range, months)
+        cursor.execute(meter.sql.insert_monthly_range, months)
+
+    def rebuild_rollups(self, meter_types=None):
+        with self._transaction() as cursor:
+            for meter_type in meter_types or self.schema.stored_meter_types:
+                meter = self.get_meter_type(meter_type)
+                cursor.execute(meter.sql.delete_daily_range, {"start": "", "end": "9999-99-99"})
+                cursor.execute(meter.sql.delete_monthly_range, {"start": "", "end": "9999-99"})
+                first_timestamp, last_timestamp = cursor.execute(meter.sql.range).fetchone()
+                if first_timestamp is not None:
+                    self._refresh_rollups(cursor, meter, first_timestamp, last_timestamp)
+
+    def get_rollups(self, meter_type, period="daily", raw=False):
+        # raw=True liefert die gespeicherten Werte, bei storage: integer also skalierte Ganzzahlen
+        if period not in ("daily", "monthly"):
+            raise ValueError(f"Ungültiger Zeitraum {period}. Erlaubt sind: daily, monthly.")
+        meter = self.get_meter_type(meter_type)
+        sql = getattr(meter.raw_sql if raw else meter.sql, period)
+        return self._execute_sql(sql, fetchall=True)
+
+    def insert_meter_reading(self, meter_type, meter_reading):
+        meter = self.get_meter_type(meter_type)
+        scaled = meter.validator.validate(meter_reading)
+        with self._transaction(meter_type) as cursor:
+            cursor.execute(meter.sql.insert, (meter.to_storage(scaled, meter_reading),))
+            timestamp = cursor.execute(meter.sql.timestamp, (cursor.lastrowid,)).fetchone()[0]
+            self._refresh_rollups(cursor, meter, timestamp, timestamp)
 
     def insert_electricity_meter(self, electricity_meter_reading):
-        self.insert_meter_reading("electricity", electricity_meter_reading, r"^\d{0,6}(\.\d)?$")
+        self.insert_meter_reading("electricity", electricity_meter_reading)
 
     def insert_gas_meter(self, gas_meter_reading):
-        self.insert_meter_reading("gas", gas_meter_reading, r"^\d{0,5}(\.\d{1,3})?$")
+        self.insert_meter_reading("gas", gas_meter_reading)
+
+    def validate_readings(self, meter_type, readings):
+        """
+        Prüft (Zeitstempel, Zählerstand)-Paare wie der Massenimport, ohne zu schreiben. Liefert die gültigen
+        als (Index, Zeitstempel, Zählerstand) mit Zeitstempel als Zeichenkette und die abgelehnten.
+        """
+        readings = list(readings)
+        rows, rejected = self._validate_chunk(readings, 0, self.get_validator(meter_type))
+        failed = {rejection["index"] for rejection in rejected}
+        indices = [index for index in range(len(readings)) if index not in failed]
+        return [(index,) + row for index, row in zip(indices, rows)], rejected
+
+    def _validate_chunk(self, chunk, offset, validator, integer_storage=False):
+        rows = self._validate_clean_chunk(chunk, validator, integer_storage)
+        if rows is not None:
+            return rows, []
+        candidates = []
+        rejected = []
+        for index, entry in enumerate(chunk, start=offset):
+            try:
+                timestamp, reading = entry
+            except (TypeError, ValueError):
+                rejected.append({"index": index, "row": entry, "code": "row", "error": "Eintrag muss aus Zeitstempel und Zählerstand bestehen."})
+                continue
+            if isinstance(timestamp, datetime):
+                timestamp = timestamp.strftime(TIMESTAMP_FORMAT)
+            if not isinstance(timestamp, str) or not TIMESTAMP_PATTERN.match(timestamp):
+                rejected.append({"index": index, "row": entry, "code": "timestamp", "error": f"Zeitstempel muss dem Format {TIMESTAMP_FORMAT} entsprechen."})
+            elif type(reading) is not float:
+                code, error = validator.check(reading)
+                rejected.append({"index": index, "row": entry, "code": code, "error": error})
+            else:
+                candidates.append((index, entry, timestamp, reading))
+
+        # Die Zahlenprüfung läuft für den ganzen Chunk auf einmal
+        scaled, mask = validator.scale_array([candidate[3] for candidate in candidates])
+        stored = scaled.tolist() if integer_storage else [candidate[3] for candidate in candidates]
+        rows = []
+        for (index, entry, timestamp, reading), value, valid in zip(candidates, stored, mask.tolist()):
+            if valid:
+                rows.append((timestamp, value))
+            else:
+                code, error = validator.check(reading)
+                rejected.append({"index": index, "row": entry, "code": code, "error": error})
+        rejected.sort(key=lambda rejection: rejection["index"])
+        return rows, rejected
+
+    def _validate_clean_chunk(self, chunk, validator, integer_storage):
+        # Schneller Weg für fehlerfreie Chunks (z. B. Dateiimporte): Zeitstempel mit einem einzigen
+        # regulären Ausdruck, Zählerstände als Array. Bei irgendeinem Fehler None, dann prüft
+        # _validate_chunk zeilenweise und liefert die genauen Meldungen.
+        try:
+            timestamps, readings = zip(*chunk)
+            block = "\n".join(timestamps)
+        except (TypeError, ValueError):
+            return None
+        if len(block) != 20 * len(chunk) - 1 or not TIMESTAMP_BLOCK_PATTERN.fullmatch(block):
+            return None
+        if set(map(type, readings)) != {float}:
+            return None
+        scaled, mask = validator.scale_array(readings)
+        if not mask.all():
+            return None
+        return list(zip(timestamps, scaled.tolist() if integer_storage else readings))
+
+    def insert_meter_readings_bulk(self, meter_type, readings, chunk_size=10000, on_duplicate=None, validated=False):
+        """
+        on_duplicate=None fügt alle Einträge ein, "skip" überspringt Zeitstempel, die bereits gespeichert sind,
+        "replace" überschreibt deren Zählerstand. In beiden Fällen enthält das Ergebnis zusätzlich "duplicates".
+        validated=True übernimmt bereits mit validate_readings geprüfte (Zeitstempel, Zählerstand)-Paare ungeprüft.
+        """
+        meter = self.get_meter_type(meter_type)
+        if on_duplicate not in (None, "skip", "replace"):
+            raise ValueError(f"Ungültige Duplikatbehandlung {on_duplicate}. Erlaubt sind: skip, replace.")
+        if on_duplicate is None:
+            write = None
+        else:
+            write = partial(self._write_deduplicated, meter, on_duplicate == "replace")
+
+        with self._transaction(meter_type) as cursor:
+            if write is not None:
+                cursor.execute(meter.sql.create_staging)
+            result, first_timestamp, last_timestamp = self._insert_chunks(
+                cursor, meter.sql.insert_with_timestamp, readings, meter.validator, chunk_size,
+                integer_storage=meter.integer_storage, write=write, validated=validated
+            )
+            # Nur übersprungene Duplikate ändern nichts an den Tages- und Monatswerten
+            if first_timestamp is not None and (result["inserted"] or on_duplicate == "replace"):
+                self._refresh_rollups(cursor, meter, first_timestamp, last_timestamp)
+        return result
+
+    def _write_deduplicated(self, meter, keep_last, cursor, chunk_rows):
+        # Bereits gespeicherte Zeitstempel überspringen (keep_last=False) oder überschreiben (keep_last=True)
+        rows = self._unique_rows(chunk_rows, keep_last)
+        if rows and not cursor.execute(meter.sql.has_entries_between, self._extend_range(rows, None, None)).fetchone()[0]:
+            cursor.executemany(meter.sql.insert_with_timestamp, rows)
+            return len(rows), len(chunk_rows) - len(rows)
+        cursor.execute(meter.sql.clear_staging)
+        cursor.executemany(meter.sql.insert_staging, rows)
+        if keep_last:
+            cursor.execute(meter.sql.update_from_staging)
+        inserted = cursor.execute(meter.sql.insert_from_staging).rowcount
+        return inserted, len(chunk_rows) - inserted
+
+    def _unique_rows(self, rows, keep_last):
+        # Mehrfach vorkommende Zeitstempel innerhalb eines Chunks: erster oder letzter Zählerstand gilt
+        if len({row[0] for row in rows}) == len(rows):
+            return rows
+        unique = {}
+        for timestamp, reading in rows:
+            if keep_last or timestamp not in unique:
+                unique[timestamp] = reading
+        return list(unique.items())
+
+    def _insert_chunks(self, cursor, sql, readings, validator, chunk_size, prefix=(), integer_storage=False, write=None, validated=False):
+        # prefix wird jeder Zeile vorangestellt, z. B. die meterID der Zählerflotte.
+        # write(cursor, rows) ersetzt das einfache executemany und liefert (eingefügt, Duplikate).
+        # validated: Zeilen sind schon geprüft und werden nur noch in die Speicherart umgerechnet.
+        if chunk_size < 1:
+            raise ValueError("Die Chunk-Größe muss mindestens 1 sein.")
+        inserted = 0
+        duplicates = 0
+        rejected = []
+        offset = 0
+        first_timestamp = last_timestamp = None
+        readings = iter(readings)
+        while True:
+            chunk = list(islice(readings, chunk_size))
+            if not chunk:
+                break
+            if validated:
+                rows, chunk_rejected = self._storage_rows(chunk, validator, integer_storage), []
+            else:
+                rows, chunk_rejected = self._validate_chunk(chunk, offset, validator, integer_storage)
+            first_timestamp, last_timestamp = self._extend_range(rows, first_timestamp, last_timestamp)
+            rows = [prefix + row for row in rows] if prefix else rows
+            if write is None:
+                cursor.executemany(sql, rows)
+                written = len(rows)
+            else:
+                written, skipped = write(cursor, rows)
+                duplicates += skipped
+            inserted += written
+            rejected.extend(chunk_rejected)
+            offset += len(chunk)
+        result = {"inserted": inserted, "rejected": rejected}
+        if write is not None:
+            result["duplicates"] = duplicates
+        return result, first_timestamp, last_timestamp
+
+    def _storage_rows(self, chunk, validator, integer_storage):
+        if not integer_storage:
+            return chunk
+        timestamps, readings = zip(*chunk)
+        return list(zip(timestamps, validator.scale_array(readings)[0].tolist()))
+
+    def _extend_range(self, rows, first_timestamp, last_timestamp):
+        if not rows:
+            return first_timestamp, last_timestamp
+        timestamps = [row[0] for row in rows]
+        chunk_first, chunk_last = min(timestamps), max(timestamps)
+        if first_timestamp is None:
+            return chunk_first, chunk_last
+        return min(first_timestamp, chunk_first), max(last_timestamp, chunk_last)
+
+    def insert_electricity_meters_bulk(self, readings, chunk_size=10000):
+        return self.insert_meter_readings_bulk("electricity", readings, chunk_size=chunk_size)
+
+    def insert_gas_meters_bulk(self, readings, chunk_size=10000):
+        return self.insert_meter_readings_bulk("gas", readings, chunk_size=chunk_size)
 
     def get_last_entry(self, meter_type):
-        sql = self.schema["database"]["sql"][f"query_{meter_type}_meter_last_entry"]
-        return self._execute_sql(sql, fetchone=True)
+        return self._execute_sql(self.get_meter_type(meter_type).sql.last_entry, fetchone=True)
 
     def get_last_electricity_meter(self):
         return self.get_last_entry("electricity")
@@ -128,8 +430,71 @@ class Database:
         return self.get_last_entry("gas")
 
     def get_all_entries(self, meter_type):
-        sql = self.schema["database"]["sql"][f"query_{meter_type}_meter_all_entries"]
-        return self._execute_sql(sql, fetchall=True)
+        return self._execute_sql(self.get_meter_type(meter_type).sql.all_entries, fetchall=True)
+
+    def count_entries(self, meter_type):
+        return self._execute_sql(self.get_meter_type(meter_type).sql.count_entries, fetchone=True)[0]
+
+    def get_entries_page(self, meter_type, limit, before=None, offset=0):
+        # Neueste Einträge zuerst; mit before=(Zeitstempel, ID) als Keyset, sonst per OFFSET
+        meter = self.get_meter_type(meter_type)
+        if before is not None:
+            sql = meter.sql.page_before
+            params = {"before_timestamp": before[0], "before_id": before[1], "limit": limit}
+        else:
+            sql = meter.sql.page_offset
+            params = {"limit": limit, "offset": offset}
+        return self._execute_sql(sql, params, fetchall=True)
+
+    def iter_entry_batches(self, meter_type, start=None, end=None, batch_size=5000, raw=False):
+        if batch_size < 1:
+            raise ValueError("Die Batch-Größe muss mindestens 1 sein.")
+        meter = self.get_meter_type(meter_type)
+        sql = (meter.raw_sql if raw else meter.sql).iter_entries
+        params = {
+            "after_timestamp": "",
+            "after_id": 0,
+            "start": self._format_timestamp(start, ""),
+            "end": self._format_timestamp(end, "9999-12-31 23:59:59~"),
+            "limit": batch_size,
+        }
+        while True:
+            # Jede Seite ist eine eigene Abfrage, damit keine Lesetransaktion über yield hinweg offen bleibt;
+            # über _execute_sql, damit auch diese Lesezugriffe im Tracing erscheinen
+            rows = self._execute_sql(sql, params, fetchall=True)
+            if not rows:
+                return
+            yield rows
+            if len(rows) < batch_size:
+                return
+            params["after_id"], params["after_timestamp"] = rows[-1][0], rows[-1][1]
+
+    def iter_entries(self, meter_type, start=None, end=None, batch_size=5000):
+        for rows in self.iter_entry_batches(meter_type, start, end, batch_size):
+            yield from rows
+
+    def _format_timestamp(self, timestamp, default):
+        if timestamp is None:
+            return default
+        if isinstance(timestamp, datetime):
+            return timestamp.strftime(TIMESTAMP_FORMAT)
+        return timestamp
+
+    def _bucket_params(self, bucket):
+        if bucket not in BUCKET_FORMATS:
+            raise ValueError(f"Ungültiges Intervall {bucket}. Erlaubt sind: {', '.join(BUCKET_FORMATS)}.")
+        # "+0 days" lässt den Zeitstempel unverändert
+        align, shift = BUCKET_MODIFIERS.get(bucket, ("+0 days", "+0 days"))
+        return {"format": BUCKET_FORMATS[bucket], "align": align, "shift": shift}
+
+    def aggregate(self, meter_type, bucket="day", start=None, end=None):
+        sql = self.get_meter_type(meter_type).sql.aggregate
+        params = {
+            **self._bucket_params(bucket),
+            "start": self._format_timestamp(start, ""),
+            "end": self._format_timestamp(end, "9999-12-31 23:59:59~"),
+        }
+        return self._execute_sql(sql, params, fetchall=True)
 
     def get_all_electricity_meters(self):
         return self.get_all_entries("electricity")
@@ -138,15 +503,103 @@ class Database:
         return self.get_all_entries("gas")
 
     def delete_all_data(self):
-        sql = self.schema["database"]["sql"]["delete_all_data"]
+        sql = self.sql["delete_all_data"]
         self._execute_sql(sql, executescript=True)
 
     def delete_entry(self, meter_type, record_id):
-        sql = self.schema["database"]["sql"][f"delete_{meter_type}_meter_entry"]
-        self._execute_sql(sql, (record_id,))
+        meter = self.get_meter_type(meter_type)
+        with self._transaction(meter_type) as cursor:
+            row = cursor.execute(meter.sql.timestamp, (record_id,)).fetchone()
+            cursor.execute(meter.sql.delete_entry, (record_id,))
+            if row:
+                self._refresh_rollups(cursor, meter, row[0], row[0])
 
     def delete_electricity_meter(self, record_id):
         self.delete_entry("electricity", record_id)
 
     def delete_gas_meter(self, record_id):
-        self.delete_entry("gas", record_id)
\ No newline at end of file
+        self.delete_entry("gas", record_id)
+
+    def insert_household(self, name):
+        with self._transaction() as cursor:
+            cursor.execute(self.sql["insert_household"], (name,))
+            return cursor.lastrowid
+
+    def get_household(self, name):
+        return self._execute_sql(self.sql["query_household"], (name,), fetchone=True)
+
+    def get_households(self):
+        return self._execute_sql(self.sql["query_households"], fetchall=True)
+
+    def insert_meter(self, household_id, meter_type, name):
+        if meter_type not in self.schema.meter_types:
+            raise ValueError(f"Ungültiger Zählertyp {meter_type}. Erlaubt sind: {', '.join(self.schema.meter_types)}.")
+        with self._transaction() as cursor:
+            cursor.execute(self.sql["insert_meter"], (household_id, meter_type, name))
+            return cursor.lastrowid
+
+    def get_meter(self, meter_id):
+        return self._execute_sql(self.sql["query_meter"], (meter_id,), fetchone=True)
+
+    def get_meter_by_name(self, household_id, meter_type, name):
+        return self._execute_sql(self.sql["query_meter_by_name"], (household_id, meter_type, name), fetchone=True)
+
+    def get_household_meters(self, household_id):
+        return self._execute_sql(self.sql["query_household_meters"], (household_id,), fetchall=True)
+
+    def _fleet_meter_type(self, meter_id):
+        meter = self.get_meter(meter_id)
+        if meter is None:
+            raise ValueError(f"Zähler mit ID {meter_id} existiert nicht.")
+        return self.schema.meter_types[meter[2]]
+
+    def insert_fleet_reading(self, meter_id, meter_reading):
+        meter = self._fleet_meter_type(meter_id)
+        meter.validator.validate(meter_reading)
+        self._execute_sql(self.sql["insert_meter_reading"], (meter_id, meter_reading), scope=("fleet", meter_id))
+
+    def insert_fleet_readings_bulk(self, meter_id, readings, chunk_size=10000, validated=False):
+        meter = self._fleet_meter_type(meter_id)
+        with self._transaction(("fleet", meter_id)) as cursor:
+            result, _, _ = self._insert_chunks(
+                cursor, self.sql["insert_meter_reading_with_timestamp"], readings, meter.validator,
+                chunk_size, prefix=(meter_id,), validated=validated
+            )
+        return result
+
+    def get_last_fleet_entry(self, meter_id):
+        return self._execute_sql(self.sql["query_meter_reading_last_entry"], (meter_id,), fetchone=True)
+
+    def get_all_fleet_entries(self, meter_id):
+        return self._execute_sql(self.sql["query_meter_reading_all_entries"], (meter_id,), fetchall=True)
+
+    def iter_fleet_entries(self, meter_id, start=None, end=None, batch_size=5000):
+        if batch_size < 1:
+            raise ValueError("Die Batch-Größe muss mindestens 1 sein.")
+        sql = self.sql["iter_meter_reading_entries"]
+        params = {
+            "meter_id": meter_id,
+            "after_timestamp": "",
+            "after_id": 0,
+            "start": self._format_timestamp(start, ""),
+            "end": self._format_timestamp(end, "9999-12-31 23:59:59~"),
+            "limit": batch_size,
+        }
+        while True:
+            rows = self._execute_sql(sql, params, fetchall=True)
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            params["after_id"], params["after_timestamp"] = rows[-1][0], rows[-1][1]
+
+    def aggregate_fleet(self, meter_id, bucket="day", start=None, end=None):
+        params = {
+            "meter_id": meter_id,
+            **self._bucket_params(bucket),
+            "start": self._format_timestamp(start, ""),
+            "end": self._format_timestamp(end, "9999-12-31 23:59:59~"),
+        }
+        return self._execute_sql(self.sql["aggregate_meter_reading"], params, fetchall=True)
+
+    def delete_fleet_entry(self, meter_id, record_id):
+        self._execute_sql(self.sql["delete_meter_reading_entry"], (meter_id, record_id), scope=("fleet", meter_id))
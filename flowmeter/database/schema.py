@@ -0,0 +1,175 @@
+import hashlib
+import os
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+
+import yaml
+
+from flowmeter.database.validation import ReadingValidator
+
+
+class MeterType:
+    """
+    Beschreibung eines Zählertyps aus meter_types: Genauigkeit, Prüfung (validator) und,
+    falls der Typ eine eigene Tabelle hat, die daraus erzeugten SQL-Anweisungen (sql.insert, sql.last_entry, ...)
+    und Sichten (views).
+    """
+
+    __slots__ = ("name", "integer_digits", "decimals", "validator", "storage",
+                 "table", "id_column", "reading_column", "daily_table", "monthly_table", "sql", "raw_sql", "views")
+
+    def __init__(self, name, settings, templates, view_templates=None):
+        self.name = name
+        self.integer_digits = settings["integer_digits"]
+        self.decimals = settings["decimals"]
+        self.validator = ReadingValidator(self.integer_digits, self.decimals, self.value_name)
+        self.table = settings.get("table")
+        self.id_column = settings.get("id_column")
+        self.reading_column = settings.get("reading_column")
+        self.daily_table = settings.get("daily_table")
+        self.monthly_table = settings.get("monthly_table")
+        # "integer": Zählerstände als skalierte Ganzzahlen (Zehntel kWh, Tausendstel m³), "decimal": als REAL
+        self.storage = settings.get("storage", "decimal")
+        if self.storage not in ("integer", "decimal"):
+            raise ValueError(f"Ungültige Speicherart {self.storage} für {name}. Erlaubt sind: integer, decimal.")
+        self.sql = self.raw_sql = None
+        self.views = ()
+        if self.table:
+            unscale = f" / {self.validator.scale}.0" if self.integer_storage else ""
+            # Unveränderliche Tupel, da das Schema prozessweit geteilt wird
+            statements = namedtuple("MeterSql", templates)
+            self.sql = statements(**self._expand(templates, unscale))
+            # Liefert die gespeicherten Werte unverändert, bei storage: integer also exakt als Ganzzahl
+            self.raw_sql = statements(**self._expand(templates, ""))
+            # Sichten aus denselben Platzhaltern, damit sie zur Speicherart passen
+            self.views = tuple(
+                {"name": view_name.format(name=self.name), "definition": definition}
+                for view_name, definition in self._expand(view_templates or {}, unscale).items()
+            )
+
+    def _expand(self, templates, unscale):
+        return {
+            operation: template.format(
+                name=self.name,
+                table=self.table,
+                id_column=self.id_column,
+                reading_column=self.reading_column,
+                daily_table=self.daily_table,
+                monthly_table=self.monthly_table,
+                unscale=unscale,
+            )
+            for operation, template in templates.items()
+        }
+
+    @property
+    def integer_storage(self):
+        return self.storage == "integer"
+
+    @property
+    def scale(self):
+        return self.validator.scale
+
+    def to_storage(self, scaled, value):
+        return scaled if self.integer_storage else value
+
+    @property
+    def value_name(self):
+        return f"{self.name}-Zählerstand"
+
+    @property
+    def reading_type(self):
+        if self.integer_storage:
+            return "INTEGER"
+        return f"DECIMAL({self.integer_digits + self.decimals}, {self.decimals})"
+
+    def tables(self):
+        if not self.table:
+            return []
+        rollup_columns = [
+            {"name": "first_timestamp", "type": "DATETIME", "constraints": ["NOT NULL"]},
+            {"name": "last_timestamp", "type": "DATETIME", "constraints": ["NOT NULL"]},
+            {"name": "first_reading", "type": self.reading_type, "constraints": ["NOT NULL"]},
+            {"name": "last_reading", "type": self.reading_type, "constraints": ["NOT NULL"]},
+            {"name": "entries", "type": "INTEGER", "constraints": ["NOT NULL"]},
+        ]
+        return [
+            {"name": self.table, "columns": [
+                {"name": self.id_column, "type": "INTEGER", "constraints": ["PRIMARY KEY", "AUTOINCREMENT"]},
+                {"name": "timestamp", "type": "DATETIME", "constraints": ["NOT NULL DEFAULT CURRENT_TIMESTAMP"]},
+                {"name": self.reading_column, "type": self.reading_type, "constraints": ["NOT NULL"]},
+            ]},
+            {"name": self.daily_table, "columns": [{"name": "day", "type": "DATE", "constraints": ["PRIMARY KEY"]}] + rollup_columns},
+            {"name": self.monthly_table, "columns": [{"name": "month", "type": "VARCHAR(7)", "constraints": ["PRIMARY KEY"]}] + rollup_columns},
+        ]
+
+    def indexes(self):
+        if not self.table:
+            return []
+        return [{"name": f"idx_{self.name}_meter_timestamp", "table": self.table, "columns": ["timestamp"]}]
+
+
+class Schema:
+    """
+    Vorkompiliertes, unveränderliches Abbild von database_model.yaml.
+    """
+
+    def __init__(self, definition):
+        database = definition["database"]
+        self.pragmas = MappingProxyType(dict(database.get("pragmas", {})))
+        self.meter_types = MappingProxyType({
+            name: MeterType(name, settings, database.get("meter_sql", {}), database.get("meter_views", {}))
+            for name, settings in database.get("meter_types", {}).items()
+        })
+        # Zählertypen mit eigener Tabelle (die übrigen speichern nur in MeterReading)
+        self.stored_meter_types = tuple(name for name, meter in self.meter_types.items() if meter.sql is not None)
+        sql = dict(database["sql"])
+        sql["delete_all_data"] = "".join(
+            [self.meter_types[name].sql.delete_all for name in self.stored_meter_types] + [sql["delete_all_data"]]
+        )
+        self.sql = MappingProxyType(sql)
+        tables = [table for meter in self.meter_types.values() for table in meter.tables()] + database["tables"]
+        indexes = [index for meter in self.meter_types.values() for index in meter.indexes()] + database.get("indexes", [])
+        views = [view for meter in self.meter_types.values() for view in meter.views] + database["views"]
+        self.tables = tuple(table["name"] for table in tables)
+        self.views = tuple(view["name"] for view in views)
+        self.create_statements = tuple(
+            [self._create_table_sql(table) for table in tables]
+            + [
+                f"CREATE INDEX IF NOT EXISTS {index['name']} ON {index['table']} ({', '.join(index['columns'])});"
+                for index in indexes
+            ]
+            + [f"CREATE VIEW IF NOT EXISTS {view['name']} AS {view['definition']}" for view in views]
+        )
+        self.fingerprint = hashlib.sha256("\n".join(self.create_statements).encode("utf-8")).hexdigest()
+        # PRAGMA user_version ist ein vorzeichenbehafteter 32-Bit-Wert
+        self.version = int(self.fingerprint[:7], 16) or 1
+
+    def _create_table_sql(self, table):
+        columns = ", ".join(
+            [f"{column['name']} {column['type']} {' '.join(column.get('constraints', []))}" for column in table["columns"]]
+        )
+        for constraint in table.get("unique_constraints", []):
+            columns += f", UNIQUE ({', '.join(constraint['columns'])})"
+        return f"CREATE TABLE IF NOT EXISTS {table['name']} ({columns});"
+
+
+_schema_cache = {}
+_schema_lock = threading.Lock()
+
+
+def load_schema(schema_file):
+    try:
+        key = (os.path.abspath(schema_file), os.stat(schema_file).st_mtime_ns)
+    except FileNotFoundError as e:
+        raise FileNotFoundError(f"Schema-Datei nicht gefunden: {e}")
+
+    schema = _schema_cache.get(key)
+    if schema is None:
+        with _schema_lock:
+            schema = _schema_cache.get(key)
+            if schema is None:
+                with open(schema_file, "r") as file:
+                    schema = Schema(yaml.safe_load(file))
+                _schema_cache[key] = schema
+    return schema
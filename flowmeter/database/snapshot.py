@@ -0,0 +1,153 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+import argparse
+import shutil
+import struct
+
+import numpy as np
+
+from flowmeter.database.database import Database
+
+# Kopf (64 Byte, little-endian): Kennung, Formatversion, Nachkommastellen, Zählertyp, Anzahl Einträge.
+# Danach folgen zwei int64-Spalten: Epoch-Sekunden und Zählerstände × 10^decimals.
+MAGIC = b"FLOWSNAP"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sII16sQ24x")
+METER_TYPE_SIZE = 16
+
+
+class Snapshot:
+    """
+    Geöffnete Snapshot-Datei. timestamps und readings sind numpy.memmap-Sichten, es wird nichts geparst.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            header = file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"Ungültige Snapshot-Datei {path}: Kopf unvollständig.")
+        magic, version, decimals, meter_type, count = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"Ungültige Snapshot-Datei {path}: unbekannte Kennung.")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Snapshot-Format {version} wird nicht unterstützt.")
+        if os.path.getsize(path) != HEADER.size + 16 * count:
+            raise ValueError(f"Ungültige Snapshot-Datei {path}: Länge passt nicht zu {count} Einträgen.")
+
+        self.path = path
+        self.meter_type = meter_type.rstrip(b"\0").decode("ascii")
+        self.decimals = decimals
+        self.scale = 10 ** decimals
+        self.count = count
+        if count:
+            columns = np.memmap(path, dtype="<i8", mode="r", offset=HEADER.size, shape=(2, count))
+            self.timestamps, self.readings = columns[0], columns[1]
+        else:
+            self.timestamps = self.readings = np.empty(0, dtype="<i8")
+
+    def __len__(self):
+        return self.count
+
+    def values(self):
+        # Zählerstände als float64, wie sie Database liefert
+        return self.readings / self.scale
+
+    def iter_rows(self, chunk_size=10000):
+        # (Zeitstempel, Zählerstand)-Paare für den Bulk-Import, blockweise aus der gemappten Datei
+        for start in range(0, self.count, chunk_size):
+            timestamps = self.timestamps[start:start + chunk_size].astype("datetime64[s]").astype(str)
+            readings = (self.readings[start:start + chunk_size] / self.scale).tolist()
+            yield from zip(np.char.replace(timestamps, "T", " ").tolist(), readings)
+
+
+def _encode_meter_type(meter_type):
+    # Feld im Kopf mit fester Länge, ein längerer Name würde stillschweigend abgeschnitten
+    try:
+        encoded = meter_type.encode("ascii")
+    except UnicodeEncodeError:
+        raise ValueError(f"Zählertyp {meter_type} passt nicht in den Snapshot-Kopf: nur ASCII erlaubt.")
+    if len(encoded) > METER_TYPE_SIZE:
+        raise ValueError(f"Zählertyp {meter_type} passt nicht in den Snapshot-Kopf: höchstens {METER_TYPE_SIZE} Zeichen.")
+    return encoded
+
+
+def export_snapshot(database, meter_type, path, batch_size=50000):
+    """
+    Schreibt die Historie eines Zählertyps als Snapshot und liefert die Anzahl der Einträge.
+    Die Blöcke werden sofort geschrieben: die Zeitstempel direkt in die Datei, die Zählerstände in
+    eine Hilfsdatei, die am Ende angehängt wird. Die Anzahl im Kopf wird zuletzt eingetragen.
+    """
+    meter = database.get_meter_type(meter_type)
+    encoded_meter_type = _encode_meter_type(meter_type)
+    temporary_path = f"{path}.tmp"
+    readings_path = f"{path}.tmp.readings"
+    count = 0
+    try:
+        with open(temporary_path, "wb") as file, open(readings_path, "w+b") as readings_file:
+            file.write(bytes(HEADER.size))
+            for rows in database.iter_entry_batches(meter_type, batch_size=batch_size, raw=True):
+                file.write(np.array([row[1] for row in rows], dtype="datetime64[s]").astype("<i8").tobytes())
+                stored = np.fromiter((row[2] for row in rows), dtype=np.int64 if meter.integer_storage else np.float64, count=len(rows))
+                readings = stored if meter.integer_storage else np.rint(stored * meter.scale)
+                readings_file.write(readings.astype("<i8").tobytes())
+                count += len(rows)
+            readings_file.seek(0)
+            shutil.copyfileobj(readings_file, file)
+            file.seek(0)
+            file.write(HEADER.pack(MAGIC, FORMAT_VERSION, meter.decimals, encoded_meter_type, count))
+        os.replace(temporary_path, path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+    finally:
+        if os.path.exists(readings_path):
+            os.remove(readings_path)
+    return count
+
+
+def load_snapshot(path):
+    return Snapshot(path)
+
+
+def import_snapshot(database, path, meter_type=None, chunk_size=10000):
+    """
+    Liest einen Snapshot über den Bulk-Import ein. Ohne meter_type gilt der Zählertyp aus dem Kopf.
+    """
+    snapshot = Snapshot(path)
+    meter_type = meter_type or snapshot.meter_type
+    meter = database.get_meter_type(meter_type)
+    if snapshot.decimals > meter.decimals:
+        raise ValueError(
+            f"Snapshot mit {snapshot.decimals} Nachkommastellen passt nicht zu {meter_type} ({meter.decimals})."
+        )
+    return database.insert_meter_readings_bulk(meter_type, snapshot.iter_rows(chunk_size), chunk_size)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m flowmeter.database.snapshot", description="Zählerhistorie als Binär-Snapshot sichern und einlesen.")
+    parser.add_argument("action", choices=("export", "import"))
+    parser.add_argument("path", help="Snapshot-Datei")
+    parser.add_argument("--meter", help="Zählertyp (beim Export erforderlich)")
+    parser.add_argument("--database", default="flowmeter/database/meter_readings.db")
+    parser.add_argument("--schema", default="flowmeter/database/database_model.yaml")
+    args = parser.parse_args(argv)
+
+    database = Database(database_name=args.database, schema_file=args.schema)
+    database.initialize()
+    try:
+        if args.action == "export":
+            if not args.meter:
+                parser.error("--meter ist für den Export erforderlich.")
+            count = export_snapshot(database, args.meter, args.path)
+            print(f"{count} Einträge exportiert.")
+        else:
+            result = import_snapshot(database, args.path, args.meter)
+            print(f"{result['inserted']} Einträge importiert, {len(result['rejected'])} abgelehnt.")
+    finally:
+        database.close()
+
+
+if __name__ == "__main__":
+    main()
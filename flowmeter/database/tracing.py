@@ -0,0 +1,253 @@
+import bisect
+import functools
+import inspect
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger("flowmeter.tracing")
+
+# Obere Grenzen der Latenz-Buckets in Sekunden; alles darüber landet im letzten Bucket
+HISTOGRAM_BOUNDS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+HISTOGRAM_LABELS = ("<=0.1ms", "<=0.5ms", "<=1ms", "<=5ms", "<=10ms", "<=50ms", "<=100ms", "<=500ms", "<=1s", ">1s")
+SLOW_QUERY_LIMIT = 50
+WHITESPACE = re.compile(r"\s+")
+
+
+class Timing:
+    """
+    Laufzeiten eines Statements oder einer Operation: Anzahl, Summe, Maximum, Histogramm und Zeilen.
+    """
+
+    __slots__ = ("count", "total", "max", "rows", "histogram")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.histogram = [0] * len(HISTOGRAM_LABELS)
+
+    def add(self, seconds, rows=0):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.rows += rows
+        self.histogram[bisect.bisect_left(HISTOGRAM_BOUNDS, seconds)] += 1
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "rows": self.rows,
+            "histogram": dict(zip(HISTOGRAM_LABELS, self.histogram)),
+        }
+
+
+class Tracer:
+    """
+    Opt-in-Messung der Datenbankzugriffe und der öffentlichen Methoden von BaseMeter und EnergyProvider.
+    Ausgeschaltet kostet jeder Zugriff nur die Abfrage von enabled. Langsame Statements (über
+    slow_query_threshold Sekunden) werden mit ihrem EXPLAIN QUERY PLAN festgehalten.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.slow_query_threshold = None
+        self._lock = threading.Lock()
+        self._reporter = None
+        # Normalisierte Statement-Texte, die SQL-Vorlagen wiederholen sich ständig
+        self._keys = {}
+        self.reset()
+
+    def enable(self, slow_query_threshold=0.1):
+        self.slow_query_threshold = slow_query_threshold
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._statements = {}
+            self._operations = {}
+            self._slow_queries = []
+            self.commits = 0
+
+    def _timing(self, table, key):
+        timing = table.get(key)
+        if timing is None:
+            timing = table[key] = Timing()
+        return timing
+
+    def _key(self, sql):
+        key = self._keys.get(sql)
+        if key is None:
+            key = self._keys[sql] = WHITESPACE.sub(" ", sql).strip()
+        return key
+
+    def record_statement(self, connection, sql, params, seconds, rows=0, explain=True):
+        key = self._key(sql)
+        with self._lock:
+            self._timing(self._statements, key).add(seconds, rows)
+        if self.slow_query_threshold is not None and seconds >= self.slow_query_threshold:
+            self._record_slow_query(connection, key, sql, params if explain else None, seconds, explain)
+
+    def add_rows(self, sql, rows):
+        # Zeilen, die erst nach der Messung abgeholt werden (fetchone/fetchall am Cursor)
+        with self._lock:
+            self._timing(self._statements, self._key(sql)).rows += rows
+
+    def record_commit(self):
+        with self._lock:
+            self.commits += 1
+
+    def record_operation(self, name, seconds):
+        with self._lock:
+            self._timing(self._operations, name).add(seconds)
+
+    def _record_slow_query(self, connection, key, sql, params, seconds, explain):
+        plan = None
+        if explain:
+            try:
+                plan = [row[-1] for row in connection.execute(f"EXPLAIN QUERY PLAN {sql}", params or ())]
+            except sqlite3.Error:
+                pass
+        logger.warning("Langsames Statement (%.1f ms): %s", seconds * 1000, key)
+        with self._lock:
+            self._slow_queries.append({"sql": key, "seconds": seconds, "plan": plan, "time": time.time()})
+            del self._slow_queries[:-SLOW_QUERY_LIMIT]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "commits": self.commits,
+                "statements": {key: timing.to_dict() for key, timing in self._statements.items()},
+                "operations": {key: timing.to_dict() for key, timing in self._operations.items()},
+                "slow_queries": list(self._slow_queries),
+            }
+
+    def dump(self, path):
+        # Atomar schreiben, damit ein Leser nie eine halbe Datei sieht
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(self.stats(), file, indent=2)
+        os.replace(temporary_path, path)
+
+    def start_reporting(self, interval=60.0, path=None):
+        """
+        Schreibt die Statistik alle interval Sekunden nach path (JSON) oder, ohne path, ins Log.
+        """
+        self.stop_reporting()
+        stop = threading.Event()
+
+        def report():
+            while not stop.wait(interval):
+                if path:
+                    self.dump(path)
+                else:
+                    logger.info("Tracing: %s", json.dumps(self.stats()))
+
+        thread = threading.Thread(target=report, name="flowmeter-tracing", daemon=True)
+        self._reporter = (thread, stop)
+        thread.start()
+
+    def stop_reporting(self):
+        if self._reporter is not None:
+            thread, stop = self._reporter
+            stop.set()
+            thread.join()
+            self._reporter = None
+
+
+class TracedCursor:
+    """
+    Hülle um einen sqlite3.Cursor innerhalb von Database._transaction, die execute/executemany misst.
+    """
+
+    def __init__(self, cursor, tracer):
+        self._cursor = cursor
+        self._tracer = tracer
+        self._sql = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def execute(self, sql, params=()):
+        start = time.perf_counter()
+        self._cursor.execute(sql, params)
+        self._sql = sql
+        self._tracer.record_statement(
+            self._cursor.connection, sql, params, time.perf_counter() - start, max(self._cursor.rowcount, 0)
+        )
+        return self
+
+    def executemany(self, sql, rows):
+        start = time.perf_counter()
+        self._cursor.executemany(sql, rows)
+        self._sql = None
+        # Die Parameter sind bereits verbraucht, daher ohne Abfrageplan
+        self._tracer.record_statement(
+            self._cursor.connection, sql, None, time.perf_counter() - start, max(self._cursor.rowcount, 0), explain=False
+        )
+        return self
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None and self._sql:
+            self._tracer.add_rows(self._sql, 1)
+        return row
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        if self._sql:
+            self._tracer.add_rows(self._sql, len(rows))
+        return rows
+
+
+def traced(name=None):
+    """
+    Misst eine Methode als Operation "<Klasse>.<Methode>", solange das Tracing eingeschaltet ist.
+    """
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not tracer.enabled:
+                return method(self, *args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                tracer.record_operation(name or f"{type(self).__name__}.{method.__name__}", time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def traced_methods(cls):
+    # Klassen-Dekorator: alle in der Klasse definierten öffentlichen Methoden messen
+    for attribute, value in list(vars(cls).items()):
+        if inspect.isfunction(value) and not attribute.startswith("_"):
+            setattr(cls, attribute, traced()(value))
+    return cls
+
+
+tracer = Tracer()
+
+# Einschalten ohne Codeänderung, z. B. FLOWMETER_TRACE=0.05 für eine Schwelle von 50 ms
+if os.environ.get("FLOWMETER_TRACE"):
+    try:
+        tracer.enable(float(os.environ["FLOWMETER_TRACE"]))
+    except ValueError:
+        tracer.enable()
+    if os.environ.get("FLOWMETER_TRACE_FILE"):
+        tracer.start_reporting(float(os.environ.get("FLOWMETER_TRACE_INTERVAL", 60)), os.environ["FLOWMETER_TRACE_FILE"])
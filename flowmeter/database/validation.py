@@ -0,0 +1,75 @@
+import math
+
+import numpy as np
+
+
+class ValidationError(ValueError):
+    """
+    Ungültiger Zählerstand. code ist einer von "type", "negative", "range" oder "precision".
+    """
+
+    def __init__(self, message, code, value=None):
+        super().__init__(message)
+        self.code = code
+        self.value = value
+
+
+class ReadingValidator:
+    """
+    Prüft Zählerstände über skalierte Ganzzahlen (Wert × 10^decimals) statt über einen regulären Ausdruck.
+    Ein Wert ist gültig, wenn er sich exakt als Ganzzahl / 10^decimals darstellen lässt.
+    """
+
+    __slots__ = ("integer_digits", "decimals", "scale", "limit", "value_name")
+
+    def __init__(self, integer_digits, decimals, value_name="Zählerstand"):
+        self.integer_digits = integer_digits
+        self.decimals = decimals
+        self.scale = 10 ** decimals
+        # Kleinster skalierter Wert, der mehr als integer_digits Vorkommastellen hätte
+        self.limit = 10 ** (integer_digits + decimals)
+        self.value_name = value_name
+
+    def check(self, value):
+        # Liefert None oder (code, Meldung); wirft nicht, damit Massenprüfungen ohne Ausnahmen auskommen
+        if type(value) is not float:
+            return "type", "Ungültige Eingabe. Es sind nur Fließkommazahlen erlaubt."
+        if value < 0:
+            return "negative", "Der Zählerstand darf nicht negativ sein."
+        if not math.isfinite(value) or value * self.scale >= self.limit:
+            return "range", f"{self.value_name} {value} hat mehr als {self.integer_digits} Vorkommastellen."
+        if round(value * self.scale) / self.scale != value:
+            return "precision", f"{self.value_name} {value} hat mehr als {self.decimals} Nachkommastellen."
+        return None
+
+    def validate(self, value):
+        # Liefert den skalierten Ganzzahlwert oder wirft ValidationError
+        error = self.check(value)
+        if error is not None:
+            raise ValidationError(error[1], error[0], value)
+        return round(value * self.scale)
+
+    def scale_array(self, values):
+        # Liefert die skalierten Werte (int64, ungültige Positionen 0) und die Maske der gültigen Werte
+        values = np.asarray(values, dtype=np.float64)
+        scaled = np.rint(values * self.scale)
+        with np.errstate(invalid="ignore"):
+            mask = (values >= 0) & (scaled < self.limit) & (scaled / self.scale == values)
+        return np.where(mask, scaled, 0).astype(np.int64), mask
+
+    def valid_mask(self, values):
+        return self.scale_array(values)[1]
+
+    def validate_array(self, values):
+        """
+        Prüft ein ganzes Array auf einmal. Liefert die skalierten Werte (int64) und die Fehler als
+        Liste von {"index", "value", "code", "error"}; ungültige Positionen enthalten 0.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        scaled, mask = self.scale_array(values)
+        errors = []
+        for index in np.flatnonzero(~mask):
+            value = float(values[index])
+            code, message = self.check(value)
+            errors.append({"index": int(index), "value": value, "code": code, "error": message})
+        return scaled, errors
@@ -5,23 +5,32 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../'
 from tkinter import messagebox
 import tkinter as tk
 
-from flowmeter.gui.datadisplay import DataDisplayGUI
-from flowmeter.gui.providersettings import ProviderSettingsGUI
+from flowmeter import gui
 from flowmeter.gui.electricitymeter import ElectricityMeterGUI
 from flowmeter.gui.gasmeter import GasMeterGUI
+from flowmeter.gui.backgroundworker import BackgroundWorker
 
 from flowmeter.logic.meters import ElectricityMeter, GasMeter
+from flowmeter.logic.recordpager import RecordPager
+from flowmeter.database.connectionregistry import connection_registry
+
+# Verzögerung, nach der die Datenanzeige und die Versorgereinstellungen im Hintergrund vorgeladen werden
+PREWARM_DELAY_MS = 500
 
 
 class FlowMeterGUI:
-    def __init__(self, root):
+    def __init__(self, root, prewarm=True):
         self.root = root
         self.root.title("FlowMeter Menü")
         self.root.geometry("400x350")
         self.root.configure(bg="black")
         self.root.resizable(False, False)
         self.current_window = None
+        self.worker = BackgroundWorker(self.root)
         self.create_main_menu()
+        # Erst wenn das Menü steht, sonst verzögert der Import dessen Anzeige
+        if prewarm and not os.environ.get("FLOWMETER_NO_PREWARM"):
+            self.root.after(PREWARM_DELAY_MS, gui.prewarm)
 
     def create_main_menu(self):
         title_label = tk.Label(self.root, text="FlowMeter", font=("Arial", 18), fg="white", bg="black")
@@ -86,63 +95,81 @@ class FlowMeterGUI:
         self.current_window.title(title)
         self.current_window.configure(bg="black")
         self.current_window.resizable(True, True)
-        gui_class(self.current_window)
+        gui_class(self.current_window, worker=self.worker)
 
     def reset_all_data(self):
         confirm = tk.messagebox.askyesno("Bestätigung", "Wirklich alles zurücksetzen?")
         if confirm:
-            electricity_meter = ElectricityMeter()
-            electricity_meter.reset_all_data()
-            tk.messagebox.showinfo("Erledigt!", "Alle Daten wurden erfolgreich zurückgesetzt!")
+            self.worker.submit(
+                lambda: ElectricityMeter().reset_all_data(),
+                on_success=lambda _: tk.messagebox.showinfo("Erledigt!", "Alle Daten wurden erfolgreich zurückgesetzt!"),
+                on_error=lambda e: tk.messagebox.showerror("Fehler", f"Fehler beim Zurücksetzen: {str(e)}")
+            )
+
+    def load_records(self, meter):
+        records = RecordPager(meter.database, meter.meter_type)
+        # Anzahl und erste Seite im Hintergrund laden, damit das Fenster sofort befüllt werden kann
+        records[0:records.page_size]
+        return records
 
     def show_gas_data(self):
-        try:
-            gas_meter = GasMeter()
-            records = gas_meter.get_all_records()
+        def show(records):
             if not records:
                 tk.messagebox.showinfo("Gasdaten", "Keine Daten verfügbar.")
                 return
-            self.open_data_display_window("Gasdaten anzeigen", records, self.delete_gas_entry)
-        except Exception as e:
-            tk.messagebox.showerror("Fehler", f"Fehler beim Abrufen der Gasdaten: {str(e)}")
+            self.open_data_display_window("Gasdaten anzeigen", records, self.delete_gas_entry, "gas")
+
+        self.worker.submit(
+            lambda: self.load_records(GasMeter()),
+            on_success=show,
+            on_error=lambda e: tk.messagebox.showerror("Fehler", f"Fehler beim Abrufen der Gasdaten: {str(e)}"),
+            key="show_data"
+        )
 
     def show_electricity_data(self):
-        try:
-            electricity_meter = ElectricityMeter()
-            records = electricity_meter.get_all_records()
+        def show(records):
             if not records:
                 tk.messagebox.showinfo("Stromdaten", "Keine Daten verfügbar.")
                 return
-            self.open_data_display_window("Stromdaten anzeigen", records, self.delete_electricity_entry)
-        except Exception as e:
-            tk.messagebox.showerror("Fehler", f"Fehler beim Abrufen der Stromdaten: {str(e)}")
+            self.open_data_display_window("Stromdaten anzeigen", records, self.delete_electricity_entry, "electricity")
+
+        self.worker.submit(
+            lambda: self.load_records(ElectricityMeter()),
+            on_success=show,
+            on_error=lambda e: tk.messagebox.showerror("Fehler", f"Fehler beim Abrufen der Stromdaten: {str(e)}"),
+            key="show_data"
+        )
 
-    def open_data_display_window(self, title, data, delete_callback):
+    def open_data_display_window(self, title, data, delete_callback, meter_type=None):
         self.close_current_window()
         self.current_window = tk.Toplevel(self.root)
-        DataDisplayGUI(self.current_window, title, data, delete_callback)
+        gui.DataDisplayGUI(self.current_window, title, data, delete_callback, meter_type, worker=self.worker)
 
-    def delete_gas_entry(self, record_id):
-        try:
-            gas_meter = GasMeter()
-            gas_meter.delete_record(record_id)
+    def delete_entry(self, meter_class, record_id, on_done=None):
+        def deleted(_):
             tk.messagebox.showinfo("Erfolg", f"Eintrag mit ID {record_id} wurde gelöscht.")
-        except Exception as e:
-            tk.messagebox.showerror("Fehler", f"Fehler beim Löschen des Eintrags: {str(e)}")
+            if on_done:
+                on_done()
 
-    def delete_electricity_entry(self, record_id):
-        try:
-            electricity_meter = ElectricityMeter()
-            electricity_meter.delete_record(record_id)
-            tk.messagebox.showinfo("Erfolg", f"Eintrag mit ID {record_id} wurde gelöscht.")
-        except Exception as e:
-            tk.messagebox.showerror("Fehler", f"Fehler beim Löschen des Eintrags: {str(e)}")
+        self.worker.submit(
+            lambda: meter_class().delete_record(record_id),
+            on_success=deleted,
+            on_error=lambda e: tk.messagebox.showerror("Fehler", f"Fehler beim Löschen des Eintrags: {str(e)}")
+        )
+
+    def delete_gas_entry(self, record_id, on_done=None):
+        self.delete_entry(GasMeter, record_id, on_done)
+
+    def delete_electricity_entry(self, record_id, on_done=None):
+        self.delete_entry(ElectricityMeter, record_id, on_done)
 
     def open_provider_settings_gui(self):
-        self.open_sub_window("Energieversorger einstellen", ProviderSettingsGUI)
+        self.open_sub_window("Energieversorger einstellen", gui.ProviderSettingsGUI)
 
 
 if __name__ == "__main__":
     root = tk.Tk()
     app = FlowMeterGUI(root)
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
+    app.worker.shutdown()
+    connection_registry.close_all()
\ No newline at end of file
@@ -0,0 +1,36 @@
+import importlib
+import logging
+import threading
+
+logger = logging.getLogger("flowmeter.gui")
+
+# Fenster mit schweren Abhängigkeiten (matplotlib, seaborn, tkcalendar) werden erst beim ersten Zugriff geladen
+LAZY_WINDOWS = {
+    "DataDisplayGUI": "flowmeter.gui.datadisplay",
+    "ProviderSettingsGUI": "flowmeter.gui.providersettings",
+}
+PREWARM_MODULES = tuple(LAZY_WINDOWS.values())
+
+
+def __getattr__(name):
+    module = LAZY_WINDOWS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module), name)
+
+
+def prewarm(modules=PREWARM_MODULES):
+    """
+    Importiert die schweren Module in einem Hintergrund-Thread vor, damit das erste Öffnen der Fenster
+    nicht wartet. Greift das Hauptprogramm vorher zu, wartet es nur auf den laufenden Import.
+    """
+    def load():
+        for module in modules:
+            try:
+                importlib.import_module(module)
+            except Exception:
+                logger.exception("Vorladen von %s fehlgeschlagen", module)
+
+    thread = threading.Thread(target=load, name="flowmeter-prewarm", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,101 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BackgroundTask:
+    def __init__(self, key=None):
+        self.key = key
+        self.future = None
+        self.cancelled = False
+
+    def cancel(self):
+        # Läuft die Aufgabe bereits, wird nur ihr Ergebnis verworfen
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+
+
+class BackgroundWorker:
+    """
+    Führt Datenbankzugriffe außerhalb der Tk-Hauptschleife aus und liefert die Ergebnisse über root.after zurück.
+    Aufträge mit gleichem key werden zusammengefasst: nur der zuletzt eingereichte liefert ein Ergebnis.
+    Ein noch nicht gestarteter Vorgänger entfällt dabei ganz, daher key nur für wiederholbare Lesezugriffe
+    verwenden, nie für Schreibzugriffe.
+    """
+
+    def __init__(self, root, max_workers=1, poll_interval=50):
+        self.root = root
+        self.poll_interval = poll_interval
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="flowmeter-worker")
+        self._results = queue.Queue()
+        self._futures = set()
+        self._pending = {}
+        self._polling = False
+
+    def submit(self, func, *args, on_success=None, on_error=None, key=None):
+        if key is not None and key in self._pending:
+            self._pending[key].cancel()
+
+        task = BackgroundTask(key)
+        task.future = self._executor.submit(self._run, task, func, args, on_success, on_error)
+        self._futures.add(task.future)
+        if key is not None:
+            self._pending[key] = task
+        self._schedule_poll()
+        return task
+
+    def _run(self, task, func, args, on_success, on_error):
+        if task.cancelled:
+            return
+        try:
+            result = func(*args)
+        except Exception as e:
+            self._results.put((task, on_error, e))
+        else:
+            self._results.put((task, on_success, result))
+
+    def reporter(self, callback):
+        """
+        Liefert eine Funktion, die ein Auftrag aus dem Hintergrund aufrufen darf, z. B. als progress-Callback.
+        callback erhält dieselben Argumente, aber im Tk-Thread.
+        """
+        task = BackgroundTask()
+
+        def report(*args):
+            self._results.put((task, lambda values: callback(*values), args))
+        return report
+
+    def _schedule_poll(self):
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        self._polling = False
+        while True:
+            try:
+                task, callback, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if task.key is not None and self._pending.get(task.key) is task:
+                del self._pending[task.key]
+            if not task.cancelled and callback is not None:
+                callback(value)
+
+        self._futures = {future for future in self._futures if not future.done()}
+        if self._futures or not self._results.empty():
+            self._schedule_poll()
+        else:
+            # Abgebrochene Aufträge, die nie gestartet wurden, liefern kein Ergebnis
+            self._pending = {key: task for key, task in self._pending.items() if not task.future.done()}
+
+    def cancel(self, key):
+        task = self._pending.pop(key, None)
+        if task is not None:
+            task.cancel()
+
+    def shutdown(self):
+        for task in self._pending.values():
+            task.cancel()
+        self._pending.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,29 +1,69 @@
 import os, sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
 
+from flowmeter import transfer
+from flowmeter.gui.backgroundworker import BackgroundWorker
+from flowmeter.logic import downsampling
 from flowmeter.logic.energyprovider import EnergyProvider
+from flowmeter.logic.meterseries import MeterSeries
+from flowmeter.logic.recordpager import RecordPager
+import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 import seaborn as sns
 import tkinter as tk
-from tkinter import ttk
+from tkinter import filedialog, ttk
+
+
+TRANSFER_FILETYPES = [("CSV", "*.csv *.csv.gz"), ("JSON Lines", "*.jsonl *.jsonl.gz"), ("Alle Dateien", "*")]
+TABLE_HEADING_HEIGHT = 25
+TABLE_PREFETCH_ROWS = 100
+PLOT_MARKER_LIMIT = 100
+
+
+def build_plot(series, energy_targets):
+    """
+    Erstellt die Abbildung des Datenverlaufs ohne Tk-Bezug; so lässt sich die Aufbereitung auch headless messen.
+    """
+    sns.set_theme(style="darkgrid")
+    fig, ax = plt.subplots(figsize=(6, 4), dpi=100)
+
+    timestamps, values = downsampling.downsample(series.timestamps, series.readings, fig.bbox.width)
+    (plot_line,) = ax.plot(
+        timestamps.astype("datetime64[s]"), values, color="blue", linewidth=2.5, label="Verbrauchsdaten",
+        marker="o" if len(timestamps) <= PLOT_MARKER_LIMIT else None
+    )
+
+    # Ziel-Linien für Strom und Gas einfügen
+    if energy_targets["electricity"]:
+        ax.axhline(y=energy_targets["electricity"], color="green", linestyle="--", label="Ziel (Strom)")
+    if energy_targets["gas"]:
+        ax.axhline(y=energy_targets["gas"], color="red", linestyle="--", label="Ziel (Gas)")
+
+    ax.set_title("Datenverlauf", fontsize=16, weight="bold", color="#333333")
+    ax.set_xlabel("Zeit", fontsize=12, color="#555555")
+    ax.set_ylabel("Wert", fontsize=12, color="#555555")
+    ax.tick_params(axis="x", rotation=45, labelsize=10, colors="#333333")
+    ax.tick_params(axis="y", labelsize=10, colors="#333333")
+    ax.legend(fontsize=10)
+    return fig, ax, plot_line
 
 
 class DataDisplayGUI:
-    def __init__(self, root, title, data, delete_callback=None):
+    def __init__(self, root, title, data, delete_callback=None, meter_type=None, worker=None):
         self.root = root
         self.root.title(title)
         self.root.geometry("900x600")
         self.root.configure(bg="black")
         self.data = data
         self.delete_callback = delete_callback
+        self.meter_type = meter_type
+        self.worker = worker or BackgroundWorker(self.root)
         self.plot_window = None
 
         # Instanz von EnergyProvider erstellen
         self.provider = EnergyProvider()
-
-        # Lade Energieziele aus der Datenbank
-        self.energy_targets = self.load_energy_targets()
+        self.energy_targets = {"electricity": None, "gas": None}
 
         self.create_table()
         self.show_plot_window()
@@ -34,17 +74,8 @@ class DataDisplayGUI:
         Lädt die Energieziele (monatliche Werte) für Strom und Gas aus der Datenbank.
         """
         try:
-            electricity_provider = self.provider.get_provider("electricity")
-            gas_provider = self.provider.get_provider("gas")
-
-            electricity_target = (
-                electricity_provider[2] / 12 if electricity_provider else None
-            )  # Jährliche Energie durch 12 teilen
-            gas_target = (
-                gas_provider[2] / 12 if gas_provider else None
-            )  # Jährliche Energie durch 12 teilen
-
-            return {"electricity": electricity_target, "gas": gas_target}
+            # Jährliche Energie durch 12, zwischengespeichert bis sich Daten oder Anbieter ändern
+            return self.provider.get_energy_targets()
         except Exception as e:
             print(f"Fehler beim Laden der Energieziele: {str(e)}")
             return {"electricity": None, "gas": None}
@@ -61,12 +92,23 @@ class DataDisplayGUI:
         self.tree.heading("Wert", text="Wert")
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
-        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-
-        for record in self.data:
-            self.tree.insert("", tk.END, values=record)
+        # Die Tabelle enthält nur die sichtbaren Zeilen; die Scrollbar steuert den Versatz in self.data
+        self.scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.scroll_table)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.table_offset = 0
+        self.table_total = 0
+        self.visible_rows = 15
+        # Beim nächsten Laden die zwischengespeicherten Seiten verwerfen (nach Löschen oder Import)
+        self._table_stale = False
+        self.tree.bind("<Configure>", self.resize_table)
+        self.tree.bind("<MouseWheel>", lambda event: self.scroll_table("scroll", -1 if event.delta > 0 else 1, "units"))
+        self.tree.bind("<Button-4>", lambda event: self.scroll_table("scroll", -1, "units"))
+        self.tree.bind("<Button-5>", lambda event: self.scroll_table("scroll", 1, "units"))
+        self.tree.bind("<Up>", lambda event: self.scroll_table("scroll", -1, "units"))
+        self.tree.bind("<Down>", lambda event: self.scroll_table("scroll", 1, "units"))
+        self.tree.bind("<Prior>", lambda event: self.scroll_table("scroll", -1, "pages"))
+        self.tree.bind("<Next>", lambda event: self.scroll_table("scroll", 1, "pages"))
+        self.render_table()
 
         button_frame = tk.Frame(self.root, bg="black")
         button_frame.pack(fill=tk.X, pady=10)
@@ -79,48 +121,192 @@ class DataDisplayGUI:
         )
         delete_button.pack(side=tk.LEFT, padx=5)
 
-    def create_plot_window(self):
-        self.plot_window = tk.Toplevel(self.root)
-        self.plot_window.title("Datenverlauf")
-        self.plot_window.geometry("700x500")
-        self.plot_window.configure(bg="white")
+        if self.meter_type:
+            # Import und Export laufen im Hintergrund, der Fortschritt kommt über den Worker zurück.
+            # Während einer Übertragung sind beide Schaltflächen gesperrt.
+            self.export_button = tk.Button(
+                button_frame, text="Exportieren", font=("Arial", 12), command=self.export_entries
+            )
+            self.export_button.pack(side=tk.LEFT, padx=5)
+            self.import_button = tk.Button(
+                button_frame, text="Importieren", font=("Arial", 12), command=self.import_entries
+            )
+            self.import_button.pack(side=tk.LEFT, padx=5)
+            self.progress = ttk.Progressbar(button_frame, orient=tk.HORIZONTAL, length=150, mode="determinate")
+            self.progress.pack(side=tk.LEFT, padx=5)
+
+    def update_progress(self, done, total):
+        if self.root.winfo_exists():
+            self.progress["value"] = 100 * done / total if total else 100
+
+    def set_transfer_running(self, running):
+        if self.root.winfo_exists():
+            state = tk.DISABLED if running else tk.NORMAL
+            self.export_button.config(state=state)
+            self.import_button.config(state=state)
+
+    def submit_transfer(self, func, *args, on_success, error_message):
+        def succeeded(result):
+            self.set_transfer_running(False)
+            on_success(result)
+
+        def failed(error):
+            self.set_transfer_running(False)
+            tk.messagebox.showerror("Fehler", f"{error_message}: {str(error)}")
+
+        self.set_transfer_running(True)
+        self.progress["value"] = 0
+        self.worker.submit(func, *args, self.worker.reporter(self.update_progress), on_success=succeeded, on_error=failed)
+
+    def export_entries(self):
+        path = filedialog.asksaveasfilename(
+            parent=self.root, defaultextension=".csv", filetypes=TRANSFER_FILETYPES, initialfile=f"{self.meter_type}.csv"
+        )
+        if not path:
+            return
+        self.submit_transfer(
+            transfer.export_file, self.provider.database, self.meter_type, path, None, None, None, 50000,
+            on_success=lambda written: tk.messagebox.showinfo("Export", f"{written} Einträge exportiert."),
+            error_message="Fehler beim Exportieren"
+        )
+
+    def import_entries(self):
+        path = filedialog.askopenfilename(parent=self.root, filetypes=TRANSFER_FILETYPES)
+        if not path:
+            return
+
+        def imported(result):
+            tk.messagebox.showinfo(
+                "Import",
+                f"{result['inserted']} Einträge importiert, {result['duplicates']} Duplikate übersprungen, "
+                f"{len(result['rejected'])} abgelehnt."
+            )
+            self.refresh_data()
+
+        self.submit_transfer(
+            transfer.import_file, self.provider.database, self.meter_type, path, None, "skip", 50000,
+            on_success=imported,
+            error_message="Fehler beim Importieren"
+        )
+
+    def resize_table(self, event):
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        visible_rows = max(1, (event.height - TABLE_HEADING_HEIGHT) // row_height)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.render_table()
+
+    def scroll_table(self, action, amount, unit=None):
+        total = self.table_total
+        if action == "moveto":
+            offset = int(float(amount) * total)
+        elif unit == "pages":
+            offset = self.table_offset + int(amount) * self.visible_rows
+        else:
+            offset = self.table_offset + int(amount)
+        offset = max(0, min(offset, total - self.visible_rows))
+        if offset != self.table_offset:
+            self.table_offset = offset
+            self.render_table()
+        return "break"
+
+    def render_table(self):
+        # Anzahl und sichtbare Zeilen im Hintergrund lesen, die Tabelle danach im Tk-Thread befüllen.
+        # Beim schnellen Blättern zählt nur die zuletzt angeforderte Seite.
+        data, offset, visible_rows, stale = self.data, self.table_offset, self.visible_rows, self._table_stale
+
+        def load():
+            if stale and isinstance(data, RecordPager):
+                data.invalidate()
+            total = len(data)
+            start = max(0, min(offset, total - visible_rows))
+            stop = start + visible_rows
+            records = data[start:stop]
+            # Vorauslesen, damit der nächste Bildlauf ohne Datenbankzugriff auskommt
+            data[stop:stop + TABLE_PREFETCH_ROWS]
+            return stale, total, start, records
+
+        self.worker.submit(
+            load,
+            on_success=self.fill_table,
+            on_error=lambda e: tk.messagebox.showerror("Fehler", f"Fehler beim Laden der Einträge: {str(e)}"),
+            key="table_page"
+        )
+
+    def fill_table(self, page):
+        if not self.root.winfo_exists():
+            return
+        stale, total, self.table_offset, records = page
+        if stale:
+            self._table_stale = False
+        self.table_total = total
+        stop = self.table_offset + self.visible_rows
 
-        sorted_data = sorted(self.data, key=lambda x: x[1])
-        timestamps = [record[1] for record in sorted_data]
-        values = [record[2] for record in sorted_data]
+        self.tree.delete(*self.tree.get_children())
+        for record in records:
+            self.tree.insert("", tk.END, values=record)
 
-        sns.set_theme(style="darkgrid")
-        fig, ax = plt.subplots(figsize=(6, 4), dpi=100)
+        if total:
+            self.scrollbar.set(self.table_offset / total, min(stop, total) / total)
+        else:
+            self.scrollbar.set(0.0, 1.0)
 
-        sns.lineplot(x=timestamps, y=values, ax=ax, marker="o", color="blue", linewidth=2.5, label="Verbrauchsdaten")
+    def create_plot_window(self, plot_data):
+        if not self.root.winfo_exists():
+            return
+        self.series, self.energy_targets = plot_data
 
-        # Ziel-Linien für Strom und Gas einfügen
-        if self.energy_targets["electricity"]:
-            ax.axhline(y=self.energy_targets["electricity"], color="green", linestyle="--", label="Ziel (Strom)")
-        if self.energy_targets["gas"]:
-            ax.axhline(y=self.energy_targets["gas"], color="red", linestyle="--", label="Ziel (Gas)")
+        self.plot_window = tk.Toplevel(self.root)
+        self.plot_window.title("Datenverlauf")
+        self.plot_window.geometry("700x500")
+        self.plot_window.configure(bg="white")
+        self.plot_window.protocol("WM_DELETE_WINDOW", lambda: self.plot_window.withdraw())
 
-        ax.set_title("Datenverlauf", fontsize=16, weight="bold", color="#333333")
-        ax.set_xlabel("Zeit", fontsize=12, color="#555555")
-        ax.set_ylabel("Wert", fontsize=12, color="#555555")
-        ax.tick_params(axis="x", rotation=45, labelsize=10, colors="#333333")
-        ax.tick_params(axis="y", labelsize=10, colors="#333333")
-        ax.legend(fontsize=10)
+        fig, ax, self.plot_line = build_plot(self.series, self.energy_targets)
 
         canvas = FigureCanvasTkAgg(fig, master=self.plot_window)
+        NavigationToolbar2Tk(canvas, self.plot_window)
         canvas_widget = canvas.get_tk_widget()
         canvas_widget.pack(fill=tk.BOTH, expand=True)
+        # Beim Zoomen/Verschieben den sichtbaren Ausschnitt neu ausdünnen
+        ax.callbacks.connect("xlim_changed", self.update_plot_resolution)
         canvas.draw()
 
         self.update_plot_window_position()
 
+    def load_plot_data(self):
+        if self.meter_type:
+            return self.provider.load_series(self.meter_type)
+        sorted_data = sorted(self.data[0:len(self.data)], key=lambda x: (x[1], x[0]))
+        return MeterSeries.from_rows(sorted_data)
+
+    def update_plot_resolution(self, ax):
+        start, end = (
+            mdates.num2date(limit).timestamp() for limit in ax.get_xlim()
+        )
+        # Sicht auf den sichtbaren Bereich (plus je ein Punkt davor/danach), ohne Kopie
+        first, last = self.series.index_range(int(start), int(end) + 1)
+        visible = self.series[max(first - 1, 0):last + 1]
+        timestamps, values = downsampling.downsample(visible.timestamps, visible.readings, ax.figure.bbox.width)
+        self.plot_line.set_data(timestamps.astype("datetime64[s]"), values)
+        self.plot_line.set_marker("o" if len(timestamps) <= PLOT_MARKER_LIMIT else "None")
+        ax.figure.canvas.draw_idle()
+
     def show_plot_window(self):
         if self.plot_window is None or not self.plot_window.winfo_exists():
-            self.create_plot_window()
+            # Messreihe und Energieziele im Hintergrund laden, das Fenster entsteht danach im Tk-Thread
+            self.worker.submit(
+                lambda: (self.load_plot_data(), self.load_energy_targets()),
+                on_success=self.create_plot_window,
+                on_error=lambda e: tk.messagebox.showerror("Fehler", f"Fehler beim Laden des Datenverlaufs: {str(e)}"),
+                key="plot_data"
+            )
         else:
             self.plot_window.deiconify()
 
     def update_plot_window_position(self):
+        if not self.plot_window or not self.plot_window.winfo_exists():
+            return
         self.root.update_idletasks()
         x = self.root.winfo_x() + self.root.winfo_width()
         y = self.root.winfo_y()
@@ -128,8 +314,6 @@ class DataDisplayGUI:
 
     def bind_window_events(self):
         self.root.bind("<Configure>", lambda event: self.update_plot_window_position())
-        if self.plot_window:
-            self.plot_window.protocol("WM_DELETE_WINDOW", lambda: self.plot_window.withdraw())
 
     def delete_selected_entry(self):
         selected_item = self.tree.selection()
@@ -139,15 +323,23 @@ class DataDisplayGUI:
 
         confirm = tk.messagebox.askyesno("Bestätigung", "Möchten Sie diesen Eintrag wirklich löschen?")
         if confirm:
-            for item in selected_item:
-                record = self.tree.item(item, "values")
-                record_id = record[0]
-                self.tree.delete(item)
+            record_ids = [self.tree.item(item, "values")[0] for item in selected_item]
+            if not isinstance(self.data, RecordPager):
+                self.data = [entry for entry in self.data if str(entry[0]) not in record_ids]
+            for record_id in record_ids:
                 if self.delete_callback:
-                    self.delete_callback(record_id)
-                self.data = [entry for entry in self.data if entry[0] != int(record_id)]
+                    # Das Löschen läuft im Hintergrund; die Anzeige wird danach aktualisiert
+                    self.delete_callback(record_id, self.refresh_data)
+            if not self.delete_callback:
+                self.refresh_data()
+
+    def refresh_data(self):
+        if not self.root.winfo_exists():
+            return
+        self._table_stale = True
+        self.render_table()
 
-            if self.plot_window and self.plot_window.winfo_exists():
-                self.plot_window.destroy()
-                self.plot_window = None
-            self.show_plot_window()
\ No newline at end of file
+        if self.plot_window and self.plot_window.winfo_exists():
+            self.plot_window.destroy()
+            self.plot_window = None
+        self.show_plot_window()
\ No newline at end of file
@@ -1,11 +1,13 @@
 from flowmeter.logic.meters import GasMeter
 import tkinter as tk
 from flowmeter.gui.rotatingcounter import RotatingCounter
+from flowmeter.gui.backgroundworker import BackgroundWorker
 from tkinter import messagebox
 
 class GasMeterGUI:
-    def __init__(self, root):
+    def __init__(self, root, worker=None):
         self.root = root
+        self.worker = worker or BackgroundWorker(self.root)
         self.gas_meter = GasMeter()
         self.gas_meter_list = []
         self.create_meter()
@@ -44,11 +46,20 @@ class GasMeterGUI:
 
         try:
             gas_number = float(gas_number_str[:-3] + "." + gas_number_str[-3:])
-            self.gas_meter.record_reading(gas_number)
-            tk.messagebox.showinfo("Erfolg!", "Gas-Zählerstand gespeichert!")
         except ValueError:
             tk.messagebox.showerror("Fehler", "Ungültiger Zählerstand. Überprüfen Sie die Eingabe.")
-        except Exception:
+            return
+
+        self.worker.submit(
+            self.gas_meter.record_reading, gas_number,
+            on_success=lambda _: tk.messagebox.showinfo("Erfolg!", "Gas-Zählerstand gespeichert!"),
+            on_error=self.show_save_error
+        )
+
+    def show_save_error(self, error):
+        if isinstance(error, ValueError):
+            tk.messagebox.showerror("Fehler", "Ungültiger Zählerstand. Überprüfen Sie die Eingabe.")
+        else:
             tk.messagebox.showerror("Fehler", "Ein unerwarteter Fehler ist aufgetreten.")
 
     def reset_to_last(self):
@@ -6,12 +6,14 @@ from tkinter import messagebox
 from tkinter import ttk
 from tkcalendar import Calendar
 from flowmeter.logic.energyprovider import EnergyProvider
+from flowmeter.gui.backgroundworker import BackgroundWorker
 import os
 
 
 class ProviderSettingsGUI:
-    def __init__(self, root):
+    def __init__(self, root, worker=None):
         self.root = root
+        self.worker = worker or BackgroundWorker(self.root)
         self.root.title("Energieversorger einstellen")
         self.root.geometry("290x700")
         self.root.configure(bg="black")
@@ -72,12 +74,22 @@ class ProviderSettingsGUI:
                 raise ValueError("Die jährliche Energie für Strom muss eine ganze Zahl sein.")
             if not gas_annual_energy.isdigit():
                 raise ValueError("Die jährliche Energie für Gas muss eine ganze Zahl sein.")
+        except ValueError as e:
+            tk.messagebox.showerror("Fehler", str(e))
+            return
 
+        def save():
             self.provider.add_provider("electricity", int(electricity_annual_energy), electricity_start_date)
             self.provider.add_provider("gas", int(gas_annual_energy), gas_start_date)
 
-            tk.messagebox.showinfo("Erfolg", "Einstellungen wurden erfolgreich gespeichert!")
-        except ValueError as e:
-            tk.messagebox.showerror("Fehler", str(e))
-        except Exception as e:
-            tk.messagebox.showerror("Fehler", f"Ein unerwarteter Fehler ist aufgetreten: {str(e)}")
\ No newline at end of file
+        self.worker.submit(
+            save,
+            on_success=lambda _: tk.messagebox.showinfo("Erfolg", "Einstellungen wurden erfolgreich gespeichert!"),
+            on_error=self.show_save_error
+        )
+
+    def show_save_error(self, error):
+        if isinstance(error, ValueError):
+            tk.messagebox.showerror("Fehler", str(error))
+        else:
+            tk.messagebox.showerror("Fehler", f"Ein unerwarteter Fehler ist aufgetreten: {str(error)}")
\ No newline at end of file
@@ -0,0 +1,259 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+import argparse
+import json
+import logging
+import queue
+import signal
+import socketserver
+import threading
+import time
+from datetime import datetime, timezone
+
+from flowmeter.database.database import Database, TIMESTAMP_FORMAT
+from flowmeter.logic.meters import BaseMeter
+
+logger = logging.getLogger("flowmeter.ingest")
+
+
+def parse_line(line, meter_types=("electricity", "gas")):
+    """
+    Liest einen Zählerstand aus einer Zeile, entweder als JSON
+    ({"meter": "gas", "reading": 12.345, "timestamp": "2024-01-01 12:00:00"})
+    oder als Text ("gas 12.345 [2024-01-01 12:00:00]"). Ohne Zeitstempel gilt die aktuelle UTC-Zeit.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    if line.startswith("{"):
+        data = json.loads(line)
+        meter_type, reading, timestamp = data["meter"], data["reading"], data.get("timestamp")
+    else:
+        parts = line.split(None, 2)
+        if len(parts) < 2:
+            raise ValueError(f"Ungültige Zeile: {line}")
+        meter_type, reading = parts[0], parts[1]
+        timestamp = parts[2] if len(parts) == 3 else None
+    if meter_type not in meter_types:
+        raise ValueError(f"Ungültiger Zählertyp {meter_type}. Erlaubt sind: {', '.join(meter_types)}.")
+    if timestamp is None:
+        timestamp = datetime.now(timezone.utc).strftime(TIMESTAMP_FORMAT)
+    return meter_type, timestamp, float(reading)
+
+
+class IngestDaemon:
+    """
+    Nimmt Zählerstände aus mehreren Quellen entgegen und speichert sie gesammelt (Group Commit),
+    sobald flush_rows Einträge vorliegen oder flush_interval Sekunden vergangen sind.
+    Ist die Warteschlange voll, blockieren die Quellen (Backpressure). Schlägt das Speichern fehl
+    (z. B. "database is locked"), wird derselbe Batch mit wachsendem Abstand erneut versucht.
+    """
+
+    def __init__(self, database, flush_interval=0.5, flush_rows=1000, max_queue=10000, retry_delay=0.1, max_retry_delay=5.0):
+        self.meters = {meter_type: BaseMeter(database, meter_type) for meter_type in database.schema.stored_meter_types}
+        self.flush_interval = flush_interval
+        self.flush_rows = flush_rows
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.stopping = threading.Event()
+        self.committed = 0
+        self.rejected = 0
+        self.write_errors = 0
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._committer = threading.Thread(target=self._run, name="flowmeter-ingest", daemon=True)
+
+    def start(self):
+        self._committer.start()
+
+    def stop(self):
+        self.stopping.set()
+        self._committer.join()
+
+    def submit(self, meter_type, timestamp, reading, ack=None, timeout=None):
+        # ack wird nach dem Commit (oder der Ablehnung bei der Prüfung) des Eintrags aufgerufen
+        self.queue.put((meter_type, timestamp, reading, ack), timeout=timeout)
+
+    def submit_line(self, line, ack=None):
+        try:
+            entry = parse_line(line, self.meters)
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning("Zeile verworfen: %s", e)
+            self.rejected += 1
+            if ack:
+                ack()
+            return
+        if entry is None:
+            if ack:
+                ack()
+            return
+        self.submit(*entry, ack=ack)
+
+    def _collect(self):
+        try:
+            batch = [self.queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.flush_rows:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        pending = []
+        delay = self.retry_delay
+        while not (self.stopping.is_set() and self.queue.empty() and not pending):
+            batch = pending or self._collect()
+            if not batch:
+                continue
+            pending = self.commit(batch)
+            if not pending:
+                delay = self.retry_delay
+            elif self.stopping.is_set():
+                # Ohne ack bleiben z. B. die Spool-Dateien liegen und werden beim nächsten Start eingelesen
+                logger.error("%d Zählerstände beim Beenden nicht gespeichert.", len(pending))
+                pending = []
+            else:
+                self.stopping.wait(delay)
+                delay = min(delay * 2, self.max_retry_delay)
+
+    def _ack(self, entries):
+        for *_, ack in entries:
+            if ack:
+                ack()
+
+    def commit(self, batch):
+        """
+        Speichert einen Batch je Zählertyp. Bestätigt werden nur gespeicherte oder bei der Prüfung
+        abgelehnte Einträge; die Einträge eines Zählertyps, dessen Schreibzugriff fehlschlug,
+        werden unbestätigt zurückgegeben.
+        """
+        by_meter = {}
+        for entry in batch:
+            by_meter.setdefault(entry[0], []).append(entry)
+        failed = []
+        for meter_type, entries in by_meter.items():
+            meter = self.meters.get(meter_type)
+            if meter is None:
+                logger.warning("%d Zählerstände mit ungültigem Zählertyp %s verworfen.", len(entries), meter_type)
+                self.rejected += len(entries)
+                self._ack(entries)
+                continue
+            try:
+                result = meter.record_readings([(timestamp, reading) for _, timestamp, reading, _ in entries])
+            except Exception as e:
+                logger.error("Speichern von %d %s-Zählerständen fehlgeschlagen, neuer Versuch folgt: %s", len(entries), meter_type, e)
+                self.write_errors += 1
+                failed.extend(entries)
+                continue
+            self.committed += result["inserted"]
+            self.rejected += len(result["rejected"])
+            for rejection in result["rejected"]:
+                logger.warning("%s-Zählerstand %s abgelehnt: %s", meter_type, rejection["row"], rejection["error"])
+            self._ack(entries)
+        return failed
+
+    def read_stream(self, stream):
+        for line in stream:
+            self.submit_line(line)
+
+    def serve_unix_socket(self, path):
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    daemon.submit_line(line.decode("utf-8"))
+
+        if os.path.exists(path):
+            os.remove(path)
+        server = socketserver.ThreadingUnixStreamServer(path, Handler)
+        server.daemon_threads = True
+        thread = threading.Thread(target=server.serve_forever, name="flowmeter-socket", daemon=True)
+        thread.start()
+        return server
+
+    def watch_spool(self, directory, poll_interval=1.0):
+        # Spool-Dateien werden erst gelöscht, wenn alle ihre Zeilen gespeichert sind.
+        # Erzeuger schreiben zunächst in eine Datei mit führendem Punkt und benennen sie danach um.
+        in_progress = set()
+        lock = threading.Lock()
+
+        def enqueue(path):
+            with open(path, "r", encoding="utf-8") as file:
+                lines = file.readlines()
+            remaining = [len(lines)]
+
+            def ack():
+                with lock:
+                    remaining[0] -= 1
+                    if remaining[0] == 0:
+                        os.remove(path)
+                        in_progress.discard(path)
+
+            if not lines:
+                with lock:
+                    os.remove(path)
+                    in_progress.discard(path)
+            for line in lines:
+                self.submit_line(line, ack=ack)
+
+        while not self.stopping.is_set():
+            for name in sorted(os.listdir(directory)):
+                path = os.path.join(directory, name)
+                with lock:
+                    if name.startswith(".") or not os.path.isfile(path) or path in in_progress:
+                        continue
+                    in_progress.add(path)
+                enqueue(path)
+            self.stopping.wait(poll_interval)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m flowmeter.ingest", description="Zählerstände ohne Oberfläche einlesen.")
+    parser.add_argument("--database", default="flowmeter/database/meter_readings.db")
+    parser.add_argument("--schema", default="flowmeter/database/database_model.yaml")
+    parser.add_argument("--stdin", action="store_true", help="Zeilen von der Standardeingabe lesen (Standard ohne weitere Quelle)")
+    parser.add_argument("--socket", help="Pfad eines UNIX-Sockets, der Zeilen entgegennimmt")
+    parser.add_argument("--spool", help="Verzeichnis, dessen Dateien zeilenweise eingelesen werden")
+    parser.add_argument("--flush-interval", type=int, default=500, help="Millisekunden bis zum nächsten Commit")
+    parser.add_argument("--flush-rows", type=int, default=1000, help="Einträge, ab denen sofort gespeichert wird")
+    parser.add_argument("--max-queue", type=int, default=10000, help="Größe der Warteschlange vor der Backpressure greift")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    database = Database(database_name=args.database, schema_file=args.schema)
+    database.initialize()
+    daemon = IngestDaemon(database, args.flush_interval / 1000, args.flush_rows, args.max_queue)
+    daemon.start()
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: daemon.stopping.set())
+    server = daemon.serve_unix_socket(args.socket) if args.socket else None
+    try:
+        if args.stdin or not (args.socket or args.spool):
+            daemon.read_stream(sys.stdin)
+            if not (args.socket or args.spool):
+                daemon.stopping.set()
+        if args.spool:
+            daemon.watch_spool(args.spool)
+        else:
+            daemon.stopping.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server:
+            server.shutdown()
+            server.server_close()
+        daemon.stop()
+        database.close()
+        logger.info("%d Zählerstände gespeichert, %d abgelehnt.", daemon.committed, daemon.rejected)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import numpy as np
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def to_arrays(rows, dtype=np.float64):
+    """
+    Wandelt (ID, Zeitstempel, Zählerstand)-Zeilen in Epoch-Sekunden (int64) und Zählerstände (dtype) um.
+    Skalierte Ganzzahlen (storage: integer) werden mit dtype=np.int64 exakt übernommen.
+    """
+    timestamps = np.array([row[1] for row in rows], dtype="datetime64[s]").astype(np.int64)
+    readings = np.fromiter((row[2] for row in rows), dtype=dtype, count=len(rows))
+    return timestamps, readings
+
+
+def interval_rates(timestamps, readings, scale=1):
+    # Bei skalierten Ganzzahlen ist die Differenz exakt, geteilt wird erst am Ende
+    hours = np.diff(timestamps) / 3600
+    valid = hours > 0
+    return np.diff(readings)[valid] / scale / hours[valid]
+
+
+class RunningConsumption:
+    """
+    Berechnet Verbrauchsraten blockweise in einem Durchlauf, ohne die Historie vorzuhalten.
+    """
+
+    def __init__(self, keep_consumptions=True, scale=1):
+        self.scale = scale
+        self.total_entries = 0
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+        self._last_timestamp = None
+        self._last_reading = None
+        self._chunks = [] if keep_consumptions else None
+
+    def add(self, timestamps, readings):
+        if len(timestamps) == 0:
+            return
+        self.total_entries += len(timestamps)
+        if self._last_timestamp is not None:
+            timestamps = np.concatenate(([self._last_timestamp], timestamps))
+            readings = np.concatenate(([self._last_reading], readings))
+        self._last_timestamp, self._last_reading = timestamps[-1], readings[-1]
+
+        rates = interval_rates(timestamps, readings, self.scale)
+        if rates.size == 0:
+            return
+        self.count += rates.size
+        self.total += float(rates.sum())
+        minimum, maximum = float(rates.min()), float(rates.max())
+        self.minimum = minimum if self.minimum is None else min(self.minimum, minimum)
+        self.maximum = maximum if self.maximum is None else max(self.maximum, maximum)
+        if self._chunks is not None:
+            self._chunks.append(rates)
+
+    def summary(self):
+        if self.count == 0:
+            return None
+        statistics = {
+            "average_consumption": self.total / self.count,
+            "min_consumption": self.minimum,
+            "max_consumption": self.maximum,
+        }
+        if self._chunks is not None:
+            rates = np.concatenate(self._chunks)
+            statistics["consumptions"] = rates.tolist()
+            statistics["percentiles"] = dict(zip(PERCENTILES, np.percentile(rates, PERCENTILES).tolist()))
+        return statistics
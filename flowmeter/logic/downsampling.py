@@ -0,0 +1,63 @@
+import numpy as np
+
+
+def minmax(x, y, buckets):
+    """
+    Behält je Bucket (gleich breite Abschnitte auf der x-Achse) den ersten, letzten, kleinsten und größten Punkt.
+    Spitzen bleiben so pixelgenau sichtbar.
+    """
+    if len(x) <= 4 * buckets or buckets < 1:
+        return x, y
+    edges = np.linspace(x[0], x[-1], buckets + 1)
+    bucket_ids = np.clip(np.searchsorted(edges, x, side="right") - 1, 0, buckets - 1)
+    order = np.lexsort((y, bucket_ids))
+    sorted_ids = bucket_ids[order]
+    starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+    ends = np.r_[starts[1:], len(order)] - 1
+    # x ist sortiert, daher sind Bucket-Grenzen in Indexreihenfolge zugleich erster/letzter Punkt
+    first = np.searchsorted(bucket_ids, sorted_ids[starts], side="left")
+    last = np.searchsorted(bucket_ids, sorted_ids[starts], side="right") - 1
+    keep = np.unique(np.concatenate((order[starts], order[ends], first, last)))
+    return x[keep], y[keep]
+
+
+def lttb(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets: wählt je Bucket den Punkt mit der größten Dreiecksfläche.
+    """
+    length = len(x)
+    if threshold >= length or threshold < 3:
+        return x, y
+    xf = x.astype(np.float64)
+    yf = y.astype(np.float64)
+    edges = np.linspace(1, length - 1, threshold - 1).astype(np.int64)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0] = 0
+    keep[-1] = length - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_stop = edges[bucket + 2] if bucket + 2 < len(edges) else length
+        next_x = xf[stop:next_stop].mean() if next_stop > stop else xf[-1]
+        next_y = yf[stop:next_stop].mean() if next_stop > stop else yf[-1]
+        areas = np.abs(
+            (xf[previous] - next_x) * (yf[start:stop] - yf[previous])
+            - (xf[previous] - xf[start:stop]) * (next_y - yf[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        keep[bucket + 1] = previous
+    return x[keep], y[keep]
+
+
+def downsample(x, y, width, start=None, end=None, method="minmax"):
+    """
+    Schneidet den sichtbaren Bereich [start, end] aus (sortiertes x) und reduziert ihn auf etwa die Pixelbreite.
+    """
+    first = 0 if start is None else max(int(np.searchsorted(x, start, side="left")) - 1, 0)
+    last = len(x) if end is None else min(int(np.searchsorted(x, end, side="right")) + 1, len(x))
+    x, y = x[first:last], y[first:last]
+    if method == "lttb":
+        return lttb(x, y, 2 * int(width))
+    if method == "minmax":
+        return minmax(x, y, int(width))
+    raise ValueError(f"Unbekanntes Verfahren {method}. Erlaubt sind: minmax, lttb.")
@@ -1,16 +1,28 @@
 import os, sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
-from datetime import datetime, timedelta
-from dateutil.relativedelta import relativedelta
+from datetime import datetime
+import numpy as np
 from flowmeter.database.database import Database
+from flowmeter.database.tracing import traced_methods
+from flowmeter.logic import consumption, projection
+from flowmeter.logic.meterseries import MeterSeries
+from flowmeter.logic.resultcache import result_cache
 
+@traced_methods
 class EnergyProvider:
-    def __init__(self, database=None):
+    def __init__(self, database=None, cache=None):
         if database is None:
             database = Database()
             database.initialize()
         self.database = database
+        # Standardmäßig prozessweit geteilt, damit auch neue Fenster von bereits berechneten Ergebnissen profitieren
+        self.cache = result_cache if cache is None else cache
+
+    def _cached(self, meter_type, name, params, compute):
+        # Schlüssel aus Datenbankdatei, Zählertyp, Auswertung, Parametern und Datenstand
+        key = (os.path.abspath(self.database.database_name), meter_type, name, params, self.database.data_version)
+        return self.cache.get_or_compute(key, compute)
 
     def add_provider(self, energy_type, annual_energy, start_date):
         try:
@@ -57,6 +69,70 @@ class EnergyProvider:
         except Exception as e:
             raise ValueError(f"Fehler beim Abrufen aller Energieanbieter: {str(e)}")
 
+    def get_monthly_consumption(self, meter_type):
+        # Verbrauch je Monat = letzter Stand des Monats minus letzter Stand des Vormonats.
+        # Gerechnet wird mit den gespeicherten Werten, bei storage: integer also exakt.
+        meter = self.database.get_meter_type(meter_type)
+        scale = meter.scale if meter.integer_storage else 1
+        monthly_consumption = {}
+        previous_reading = None
+        for month, _, _, first_reading, last_reading, _ in self.database.get_rollups(meter_type, "monthly", raw=True):
+            baseline = first_reading if previous_reading is None else previous_reading
+            monthly_consumption[month] = (last_reading - baseline) / scale
+            previous_reading = last_reading
+        return monthly_consumption
+
+    def reading_points(self, meter_type):
+        """
+        Stützpunkte (Epoch-Sekunden, Zählerstände) für die Interpolation: erster und letzter Stand jedes Tages
+        aus den Tageswerten. Jede Tagesgrenze liegt zwischen zwei solchen Punkten, die Interpolation an
+        Tagesgrenzen ist daher genauso exakt wie über alle Einträge, bei einem Bruchteil der Zeilen.
+        """
+        meter = self.database.get_meter_type(meter_type)
+        scale = meter.scale if meter.integer_storage else 1
+        rows = self.database.get_rollups(meter_type, "daily", raw=True)
+        timestamps = np.array([(row[1], row[2]) for row in rows], dtype="datetime64[s]").reshape(-1)
+        readings = np.array([(row[3], row[4]) for row in rows], dtype=np.float64).reshape(-1) / scale
+        return timestamps.astype(np.int64), readings
+
+    def project_consumption(self, energy_type, current_date=None):
+        """
+        Soll/Ist je Vertragsmonat und Vertragsjahr ab dem Vertragsbeginn sowie die Hochrechnung des laufenden
+        Vertragsjahres, siehe projection.project. Das Ergebnis wird je Anbieter, Stichtag und Datenstand
+        zwischengespeichert.
+        """
+        try:
+            provider = self.get_provider(energy_type)
+            if not provider:
+                raise ValueError(f"Kein Anbieter mit Typ {energy_type} gefunden.")
+
+            current_day = str(np.datetime64(current_date or datetime.now(), "D"))
+            params = (provider['annual_energy'], provider['start_date'], current_day)
+            return self._cached(energy_type, "projection", params, lambda: projection.project(
+                *self.reading_points(energy_type), provider['start_date'], provider['annual_energy'], current_day
+            ))
+
+        except Exception as e:
+            raise ValueError(f"Fehler bei der Hochrechnung des Verbrauchs: {str(e)}")
+
+    def get_energy_targets(self):
+        """
+        Monatliche Zielwerte (Jahresenergie / 12) je gespeichertem Zählertyp, None ohne Anbieter.
+        """
+        def targets():
+            providers = {provider['energy_type']: provider for provider in self.get_all_providers()}
+            return {
+                meter_type: providers[meter_type]['annual_energy'] / 12 if meter_type in providers else None
+                for meter_type in self.database.schema.stored_meter_types
+            }
+        return self._cached(None, "energy_targets", (), targets)
+
+    def get_projections(self, current_date=None):
+        return {
+            provider['energy_type']: self.project_consumption(provider['energy_type'], current_date)
+            for provider in self.get_all_providers()
+        }
+
     def prepare_monthly_data(self, energy_type, current_date=None):
         try:
             provider = self.get_provider(energy_type)
@@ -64,68 +140,92 @@ class EnergyProvider:
                 raise ValueError(f"Kein Anbieter mit Typ {energy_type} gefunden.")
 
             annual_energy = provider['annual_energy']
-            start_date = datetime.strptime(provider['start_date'], '%Y-%m-%d')
+            start_date = np.datetime64(provider['start_date'], "D")
 
             if current_date is None:
                 current_date = datetime.now()
 
-            monthly_energy = annual_energy / 12
-            start_period = current_date - relativedelta(years=1)
-            end_period = current_date + relativedelta(years=1)
-            data_points = []
-            current = start_period
-            while current <= end_period:
-                if current >= start_date:
-                    data_points.append({
-                        'date': current.strftime('%Y-%m-%d'),
-                        'consumption': monthly_energy
-                    })
-                current += relativedelta(months=1)
-
-            return data_points
+            current_day = np.datetime64(current_date, "D")
+            params = (annual_energy, provider['start_date'], str(current_day))
+            return self._cached(energy_type, "monthly_data", params, lambda: self._monthly_data(
+                energy_type, annual_energy, start_date, current_day
+            ))
 
         except Exception as e:
             raise ValueError(f"Fehler bei der Vorbereitung der monatlichen Daten: {str(e)}")
-        
-    def calculate_consumption(self, meter_type):
-        try:
-            if meter_type == "electricity":
-                entries = self.database.get_all_electricity_meters()
-            elif meter_type == "gas":
-                entries = self.database.get_all_gas_meters()
-            else:
-                raise ValueError("Ungültiger Zählertyp. Verwenden Sie 'electricity' oder 'gas'.")
 
-            entries = sorted(entries, key=lambda x: x[1])
+    def _monthly_data(self, energy_type, annual_energy, start_date, current_day):
+        monthly_energy = annual_energy / 12
+        actual_consumption = self.get_monthly_consumption(energy_type)
+
+        # Ein Jahr vor bis ein Jahr nach current_date, monatlich, ab Vertragsbeginn
+        dates = projection.add_months(current_day, np.arange(-12, 13))
+        dates = dates[dates >= start_date]
+        if not len(dates):
+            return []
+
+        # Verbrauch je Kalendermonat aus den auf die Monatsgrenzen interpolierten Zählerständen
+        months = dates.astype("datetime64[M]")
+        boundaries = projection.to_epoch_seconds(np.append(months, months[-1] + 1).astype("datetime64[D]"))
+        usage = projection.period_usage(*self.reading_points(energy_type), boundaries)
+
+        return [
+            {
+                'date': str(date),
+                'consumption': monthly_energy,
+                'actual_consumption': actual_consumption.get(str(month)),
+                'interpolated_consumption': None if np.isnan(interpolated) else float(interpolated),
+                'projected_consumption': None if np.isnan(projected) else float(projected),
+            }
+            for date, month, interpolated, projected in zip(dates, months, usage['actual'], usage['projected'])
+        ]
 
-            if len(entries) < 2:
-                return {"message": "Nicht genügend Datenpunkte für Verbrauchsberechnung."}
+    def load_series(self, meter_type, start=None, end=None, batch_size=50000):
+        """
+        Lädt die Messreihe eines Zählers (aufsteigend nach Zeit) als kompakte MeterSeries.
+        """
+        return MeterSeries.from_batches(self.database.iter_entry_batches(meter_type, start, end, batch_size))
 
-            consumptions = []
-            for i in range(1, len(entries)):
-                prev_value, prev_time = entries[i - 1][0], datetime.strptime(entries[i - 1][1], "%Y-%m-%d %H:%M:%S")
-                current_value, current_time = entries[i][0], datetime.strptime(entries[i][1], "%Y-%m-%d %H:%M:%S")
+    def calculate_consumption(self, meter_type, include_consumptions=True, batch_size=5000, series=None):
+        # Mit series wird eine bereits geladene Messreihe ausgewertet statt der Datenbank, ohne Zwischenspeicher
+        try:
+            if series is not None:
+                return self._calculate_consumption(meter_type, include_consumptions, batch_size, series)
+            return self._cached(meter_type, "consumption", (include_consumptions,), lambda: self._calculate_consumption(
+                meter_type, include_consumptions, batch_size
+            ))
 
-                time_diff = (current_time - prev_time).total_seconds() / 3600
+        except Exception as e:
+            raise ValueError(f"Fehler bei der Verbrauchsberechnung: {str(e)}")
 
-                if time_diff > 0:
-                    consumptions.append((current_value - prev_value) / time_diff)
+    def _calculate_consumption(self, meter_type, include_consumptions, batch_size, series=None):
+        meter = self.database.get_meter_type(meter_type)
+        if meter.integer_storage:
+            scale, dtype = meter.scale, np.int64
+        else:
+            scale, dtype = 1, np.float64
 
-            if not consumptions:
-                return {
-                    "message": "Keine gültigen Verbrauchsdaten vorhanden.",
-                    "average_consumption": None,
-                    "consumptions": [],
-                    "total_entries": len(entries)
-                }
+        running = consumption.RunningConsumption(keep_consumptions=include_consumptions, scale=scale)
+        if series is not None:
+            # Zählerstände zurück auf die gespeicherten Ganzzahlen, damit die Differenzen exakt bleiben
+            readings = np.rint(series.readings * scale).astype(dtype) if meter.integer_storage else series.readings
+            running.add(series.timestamps, readings)
+        else:
+            for rows in self.database.iter_entry_batches(meter_type, batch_size=batch_size, raw=True):
+                running.add(*consumption.to_arrays(rows, dtype))
+
+        if running.total_entries < 2:
+            return {"message": "Nicht genügend Datenpunkte für Verbrauchsberechnung."}
 
-            avg_consumption = sum(consumptions) / len(consumptions)
+        statistics = running.summary()
 
+        if statistics is None:
             return {
-                "average_consumption": avg_consumption,
-                "consumptions": consumptions,
-                "total_entries": len(entries)
+                "message": "Keine gültigen Verbrauchsdaten vorhanden.",
+                "average_consumption": None,
+                "consumptions": [],
+                "total_entries": running.total_entries
             }
 
-        except Exception as e:
-            raise ValueError(f"Fehler bei der Verbrauchsberechnung: {str(e)}")
+        statistics["total_entries"] = running.total_entries
+        return statistics
@@ -0,0 +1,94 @@
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from flowmeter.database.tracing import traced_methods
+from flowmeter.logic.meters import BaseMeter
+
+
+@traced_methods
+class FleetMeter(BaseMeter):
+    """
+    Ein Zähler der Flotte (Tabelle MeterReading), identifiziert über seine meterID.
+    Der Zählertyp ist reine Konfiguration (meter_types in database_model.yaml).
+    """
+
+    def __init__(self, database, meter_id, household_id, meter_type, name):
+        super().__init__(database=database, meter_type=meter_type)
+        self.meter_id = meter_id
+        self.household_id = household_id
+        self.name = name
+
+    def save_reading(self):
+        self.database.insert_fleet_reading(self.meter_id, self.record)
+
+    def save_readings(self, rows):
+        return self.database.insert_fleet_readings_bulk(self.meter_id, rows, validated=True)
+
+    def _fetch_last_entry(self):
+        return self.database.get_last_fleet_entry(self.meter_id)
+
+    def _scope(self):
+        return ("fleet", self.meter_id)
+
+    def get_all_records(self):
+        return self.database.get_all_fleet_entries(self.meter_id)
+
+    def iter_records(self, start=None, end=None, batch_size=5000):
+        return self.database.iter_fleet_entries(self.meter_id, start, end, batch_size)
+
+    def aggregate(self, bucket="day", start=None, end=None):
+        return self.database.aggregate_fleet(self.meter_id, bucket, start, end)
+
+    def delete_record(self, record_id):
+        try:
+            self.database.delete_fleet_entry(self.meter_id, record_id)
+            self._last_record = None
+        except Exception as e:
+            raise ValueError(f"Fehler beim Löschen des Eintrags mit ID {record_id}: {str(e)}")
+
+
+class MeterRegistry:
+    """
+    Verwaltet Haushalte und deren Zähler. Zähler werden je meterID nur einmal erzeugt,
+    damit der zwischengespeicherte letzte Zählerstand zwischen Aufrufen erhalten bleibt.
+    """
+
+    def __init__(self, database):
+        self.database = database
+        self._meters = {}
+
+    @property
+    def meter_types(self):
+        return tuple(self.database.schema.meter_types)
+
+    def household(self, name):
+        # Liefert die householdID und legt den Haushalt bei Bedarf an
+        row = self.database.get_household(name)
+        if row:
+            return row[0]
+        return self.database.insert_household(name)
+
+    def households(self):
+        return self.database.get_households()
+
+    def add_meter(self, household, meter_type, name):
+        household_id = self.household(household) if isinstance(household, str) else household
+        row = self.database.get_meter_by_name(household_id, meter_type, name)
+        meter_id = row[0] if row else self.database.insert_meter(household_id, meter_type, name)
+        return self.get_meter(meter_id)
+
+    def get_meter(self, meter_id):
+        meter = self._meters.get(meter_id)
+        if meter is None:
+            row = self.database.get_meter(meter_id)
+            if row is None:
+                raise ValueError(f"Zähler mit ID {meter_id} existiert nicht.")
+            meter = self._meters[meter_id] = FleetMeter(self.database, *row)
+        return meter
+
+    def meters(self, household):
+        household_id = self.household(household) if isinstance(household, str) else household
+        return [self.get_meter(row[0]) for row in self.database.get_household_meters(household_id)]
+
+    def clear(self):
+        self._meters.clear()
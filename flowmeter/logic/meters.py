@@ -2,82 +2,122 @@ import sys, os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
 
 from flowmeter.database.database import Database
+from flowmeter.database.tracing import traced_methods
+from flowmeter.database.validation import ValidationError
 
+@traced_methods
 class BaseMeter:
-    def __init__(self, database: Database):
+    # Name des Zählertyps aus meter_types in database_model.yaml
+    meter_type = None
+
+    def __init__(self, database: Database, meter_type=None):
+        if meter_type is not None:
+            self.meter_type = meter_type
         self.record = 0.0
         self.database = database
+        # Letzter gespeicherter Zählerstand und der Datenstand dieses Zählers (Database.scope_version),
+        # zu dem er gilt; None = muss neu gelesen werden
+        self._last_record = None
+        self._last_version = None
+
+    def _check_increasing(self, new_record, last_record):
+        # Typ, Vorzeichen und Genauigkeit prüft die Datenbank beim Speichern, hier nur die Reihenfolge;
+        # andere Typen als float lehnt sie ohnehin ab
+        if last_record and type(new_record) is float:
+            if new_record < last_record:
+                raise ValidationError("Der neue Zählerstand muss größer sein als der letzte Zählerstand.", "decreasing", new_record)
 
     def record_reading(self, new_record):
         last_record = self.get_last_record()
+        self._check_increasing(new_record, last_record)
 
-        if not isinstance(new_record, float):
-            raise ValueError("Ungültige Eingabe. Es sind nur Fließkommazahlen erlaubt.")
-        
-        if new_record < 0:
-            raise ValueError("Der Zählerstand darf nicht negativ sein.")
-
-        if last_record:
-            if new_record < last_record:
-                raise ValueError("Der neue Zählerstand muss größer sein als der letzte Zählerstand.")
-
+        version = self._last_version
         self.record = new_record
         self.save_reading()
+        self._remember(new_record, version)
+
+    def record_readings(self, readings):
+        # Wie record_reading, aber für viele (Zeitstempel, Zählerstand)-Paare in einer Transaktion.
+        # Steigend geprüft wird nur gegen gültige Einträge, ein abgelehnter darf die Vergleichsbasis nicht verschieben.
+        accepted, rejected = self.database.validate_readings(self.meter_type, readings)
+        last_record = self.get_last_record()
+        version = self._last_version
+        rows = []
+        for index, timestamp, new_record in accepted:
+            try:
+                self._check_increasing(new_record, last_record)
+            except ValidationError as e:
+                rejected.append({"index": index, "row": (timestamp, new_record), "code": e.code, "error": str(e)})
+                continue
+            rows.append((timestamp, new_record))
+            last_record = new_record
+        rejected.sort(key=lambda rejection: rejection["index"])
+
+        if not rows:
+            return {"inserted": 0, "rejected": rejected}
+
+        # Die Zeilen sind geprüft, die Datenbank übernimmt sie ohne erneute Prüfung
+        result = self.save_readings(rows)
+        self.record = rows[-1][1]
+        self._remember(self.record, version)
+        return {"inserted": result["inserted"], "rejected": rejected}
 
     def save_reading(self):
-        try:
-            if isinstance(self, ElectricityMeter):
-                self.database.insert_electricity_meter(self.record)
-            elif isinstance(self, GasMeter):
-                self.database.insert_gas_meter(self.record)
-            else:
-                raise ValueError("Unbekannter Zählertyp. Der Wert kann nicht gespeichert werden.")
-        except Exception:
-            raise
+        self.database.insert_meter_reading(self.meter_type, self.record)
+
+    def save_readings(self, rows):
+        return self.database.insert_meter_readings_bulk(self.meter_type, rows, validated=True)
 
     def get_last_record(self):
-        try:
-            if isinstance(self, ElectricityMeter):
-                last_record = self.database.get_last_electricity_meter()
-            elif isinstance(self, GasMeter):
-                last_record = self.database.get_last_gas_meter()
-            else:
-                raise ValueError("Unbekannter Zählertyp.")
-
-            if not last_record:
-                return 0.0
-            
-            return last_record[2]
-        except Exception as e:
-            raise
+        # Der gemerkte Wert gilt nur, solange niemand sonst diesen Zähler geändert hat, auch keine
+        # andere Instanz und kein anderer Prozess; Schreibzugriffe auf andere Zähler stören nicht
+        version = self.database.scope_version(self._scope())
+        if self._last_record is not None and self._last_version == version:
+            return self._last_record
+        last_record = self._fetch_last_entry()
+        self._last_record = last_record[2] if last_record else 0.0
+        self._last_version = version
+        return self._last_record
+
+    def _remember(self, record, version):
+        # Der eigene Commit erhöht den Stand dieses Zählers um genau eins; jede weitere Änderung seit
+        # dem Lesen stammt von jemand anderem, dann wird beim nächsten Mal neu gelesen. Ohne erneutes
+        # PRAGMA data_version: fremde Commits erkennt der nächste get_last_record.
+        current = self.database.scope_version(self._scope(), external=False)
+        if version is not None and current == (version[0], version[1] + 1):
+            self._last_record, self._last_version = record, current
+        else:
+            self._last_record = None
+
+    def _scope(self):
+        return self.meter_type
+
+    def _fetch_last_entry(self):
+        return self.database.get_last_entry(self.meter_type)
 
     def get_all_records(self):
-        try:
-            if isinstance(self, ElectricityMeter):
-                return self.database.get_all_electricity_meters()
-            elif isinstance(self, GasMeter):
-                return self.database.get_all_gas_meters()
-        except Exception:
-            raise
+        return self.database.get_all_entries(self.meter_type)
+
+    def aggregate(self, bucket="day", start=None, end=None):
+        return self.database.aggregate(self.meter_type, bucket, start, end)
 
     def reset_all_data(self):
         try:
             self.database.delete_all_data()
+            self._last_record = None
         except Exception:
             raise
 
     def delete_record(self, record_id):
         try:
-            if isinstance(self, ElectricityMeter):
-                self.database.delete_electricity_meter(record_id)
-            elif isinstance(self, GasMeter):
-                self.database.delete_gas_meter(record_id)
-            else:
-                raise ValueError("Unbekannter Zählertyp.")
+            self.database.delete_entry(self.meter_type, record_id)
+            self._last_record = None
         except Exception as e:
             raise ValueError(f"Fehler beim Löschen des Eintrags mit ID {record_id}: {str(e)}")
 
 class ElectricityMeter(BaseMeter):
+    meter_type = "electricity"
+
     def __init__(self, database=None):
         if database is None:
             database = Database()
@@ -85,6 +125,8 @@ class ElectricityMeter(BaseMeter):
         super().__init__(database=database)
 
 class GasMeter(BaseMeter):
+    meter_type = "gas"
+
     def __init__(self, database=None):
         if database is None:
             database = Database()
@@ -0,0 +1,132 @@
+from datetime import datetime
+
+import numpy as np
+
+from flowmeter.logic import consumption
+
+
+def to_epoch(timestamp):
+    """
+    Wandelt einen Zeitstempel (Epoch-Sekunden, datetime oder "YYYY-MM-DD HH:MM:SS") in Epoch-Sekunden um.
+    """
+    if isinstance(timestamp, (int, np.integer)):
+        return int(timestamp)
+    if isinstance(timestamp, datetime):
+        timestamp = timestamp.replace(tzinfo=None)
+    return int(np.datetime64(timestamp, "s").astype(np.int64))
+
+
+class MeterSeries:
+    """
+    Spaltenweise Messreihe eines Zählers: IDs und Epoch-Sekunden als int64, Zählerstände als float64,
+    nach Zeit sortiert. Etwa 24 Byte je Eintrag statt eines Tupels mit Zeitstempel-String.
+    Bereichsabfragen per binärer Suche liefern Sichten auf dieselben Puffer, ohne zu kopieren.
+    """
+
+    __slots__ = ("_ids", "_timestamps", "_readings", "_size")
+
+    def __init__(self, ids=None, timestamps=None, readings=None, capacity=0):
+        if ids is None:
+            self._ids = np.empty(capacity, dtype=np.int64)
+            self._timestamps = np.empty(capacity, dtype=np.int64)
+            self._readings = np.empty(capacity, dtype=np.float64)
+            self._size = 0
+        else:
+            self._ids = np.asarray(ids, dtype=np.int64)
+            self._timestamps = np.asarray(timestamps, dtype=np.int64)
+            self._readings = np.asarray(readings, dtype=np.float64)
+            if not len(self._ids) == len(self._timestamps) == len(self._readings):
+                raise ValueError("Alle Spalten müssen gleich lang sein.")
+            self._size = len(self._ids)
+
+    @classmethod
+    def from_rows(cls, rows):
+        # (ID, Zeitstempel, Zählerstand)-Zeilen, bereits nach Zeit sortiert
+        timestamps, readings = consumption.to_arrays(rows)
+        ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        return cls(ids, timestamps, readings)
+
+    @classmethod
+    def from_batches(cls, batches):
+        series = cls()
+        for rows in batches:
+            series.extend(cls.from_rows(rows))
+        return series
+
+    @property
+    def ids(self):
+        return self._ids[:self._size]
+
+    @property
+    def timestamps(self):
+        return self._timestamps[:self._size]
+
+    @property
+    def readings(self):
+        return self._readings[:self._size]
+
+    @property
+    def nbytes(self):
+        return self.ids.nbytes + self.timestamps.nbytes + self.readings.nbytes
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        for index in range(self._size):
+            yield self[index]
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return MeterSeries(self.ids[key], self.timestamps[key], self.readings[key])
+        if key < 0:
+            key += self._size
+        if not 0 <= key < self._size:
+            raise IndexError("Index außerhalb des gültigen Bereichs.")
+        # Gleiche Form wie die Datenbankzeilen: (ID, Zeitstempel-String, Zählerstand)
+        timestamp = str(np.datetime64(int(self._timestamps[key]), "s")).replace("T", " ")
+        return int(self._ids[key]), timestamp, float(self._readings[key])
+
+    def _reserve(self, size):
+        if size <= len(self._ids):
+            return
+        # Neue Puffer statt resize, damit bestehende Sichten gültig bleiben
+        capacity = max(size, 2 * len(self._ids), 16)
+        for name in ("_ids", "_timestamps", "_readings"):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            setattr(self, name, grown)
+
+    def append(self, record_id, timestamp, reading):
+        timestamp = to_epoch(timestamp)
+        if self._size and timestamp < self._timestamps[self._size - 1]:
+            raise ValueError("Einträge müssen in zeitlicher Reihenfolge angefügt werden.")
+        self._reserve(self._size + 1)
+        self._ids[self._size] = record_id
+        self._timestamps[self._size] = timestamp
+        self._readings[self._size] = reading
+        self._size += 1
+
+    def extend(self, other):
+        if not len(other):
+            return
+        if self._size and other.timestamps[0] < self._timestamps[self._size - 1]:
+            raise ValueError("Einträge müssen in zeitlicher Reihenfolge angefügt werden.")
+        end = self._size + len(other)
+        self._reserve(end)
+        self._ids[self._size:end] = other.ids
+        self._timestamps[self._size:end] = other.timestamps
+        self._readings[self._size:end] = other.readings
+        self._size = end
+
+    def index_range(self, start=None, end=None):
+        # Positionen [first, last) der Einträge mit start <= Zeitstempel < end
+        timestamps = self.timestamps
+        first = 0 if start is None else int(np.searchsorted(timestamps, to_epoch(start), side="left"))
+        last = self._size if end is None else int(np.searchsorted(timestamps, to_epoch(end), side="left"))
+        return first, max(first, last)
+
+    def between(self, start=None, end=None):
+        first, last = self.index_range(start, end)
+        return self[first:last]
@@ -0,0 +1,115 @@
+import numpy as np
+
+
+def add_months(date, months):
+    """
+    Verschiebt ein Datum vektorisiert um months Monate (Skalar oder Array). Wie bei relativedelta wird
+    der Tag auf das Monatsende begrenzt, z. B. 31.01. + 1 Monat = 29.02.; gerechnet wird immer vom
+    Ausgangsdatum aus, der Tag wandert also nicht.
+    """
+    date = np.datetime64(date, "D")
+    month = date.astype("datetime64[M]")
+    day = (date - month.astype("datetime64[D]")).astype(np.int64)
+    months = month + np.asarray(months)
+    month_length = ((months + 1).astype("datetime64[D]") - months.astype("datetime64[D]")).astype(np.int64)
+    return months.astype("datetime64[D]") + np.minimum(day, month_length - 1)
+
+
+def months_between(start, end):
+    # Anzahl voller Monate von start bis end (größtes k mit add_months(start, k) <= end)
+    start, end = np.datetime64(start, "D"), np.datetime64(end, "D")
+    months = int((end.astype("datetime64[M]") - start.astype("datetime64[M]")).astype(np.int64))
+    return months - 1 if add_months(start, months) > end else months
+
+
+def to_epoch_seconds(dates):
+    return np.asarray(dates).astype("datetime64[s]").astype(np.int64)
+
+
+def interpolate(timestamps, readings, at):
+    """
+    Zählerstände zu beliebigen Zeitpunkten (Epoch-Sekunden), linear zwischen den Messpunkten.
+    Außerhalb der Messreihe NaN, dort wird nicht extrapoliert.
+    """
+    at = np.asarray(at, dtype=np.float64)
+    if not len(timestamps):
+        return np.full(at.shape, np.nan)
+    return np.interp(at, timestamps, readings, left=np.nan, right=np.nan)
+
+
+def period_usage(timestamps, readings, boundaries):
+    """
+    Verbrauch in den Zeiträumen [boundaries[i], boundaries[i + 1]) für alle Zeiträume auf einmal.
+    Liefert Arrays:
+      usage     Verbrauch im von Messwerten abgedeckten Teil des Zeitraums (NaN ohne Abdeckung)
+      coverage  abgedeckter Anteil des Zeitraums, 0 bis 1
+      actual    Verbrauch, falls der Zeitraum vollständig abgedeckt ist, sonst NaN
+      projected auf den ganzen Zeitraum hochgerechneter Verbrauch bei gleichbleibender Rate
+    """
+    boundaries = np.asarray(boundaries, dtype=np.int64)
+    starts, ends = boundaries[:-1], boundaries[1:]
+    if len(timestamps):
+        covered_start = np.clip(starts, timestamps[0], timestamps[-1])
+        covered_end = np.clip(ends, timestamps[0], timestamps[-1])
+        values = np.interp(np.concatenate([covered_start, covered_end]), timestamps, readings)
+        usage = values[len(starts):] - values[:len(starts)]
+        span = covered_end - covered_start
+    else:
+        usage = span = np.zeros(len(starts))
+
+    length = ends - starts
+    coverage = span / length
+    with np.errstate(invalid="ignore", divide="ignore"):
+        projected = np.where(span > 0, usage * length / span, np.nan)
+    return {
+        "usage": np.where(span > 0, usage, np.nan),
+        "coverage": coverage,
+        "actual": np.where(coverage >= 1, usage, np.nan),
+        "projected": projected,
+    }
+
+
+def _optional(value):
+    return None if np.isnan(value) else float(value)
+
+
+def _records(dates, usage, target):
+    return [
+        {
+            "start": str(start),
+            "end": str(end),
+            "target": target,
+            "actual": _optional(actual),
+            "usage": _optional(used),
+            "coverage": float(coverage),
+            "projected": _optional(projected),
+        }
+        for start, end, actual, used, coverage, projected in zip(
+            dates[:-1], dates[1:], usage["actual"], usage["usage"], usage["coverage"], usage["projected"]
+        )
+    ]
+
+
+def project(timestamps, readings, start_date, annual_energy, current_date):
+    """
+    Soll/Ist je Vertragsmonat und Vertragsjahr ab start_date bis zum Ende des laufenden Vertragsjahres.
+    timestamps (Epoch-Sekunden, aufsteigend) und readings sind die Stützpunkte der Zählerstände;
+    die Zählerstände an den Grenzen werden interpoliert. Die Hochrechnung des laufenden Vertragsjahres
+    steht in projected_annual, ihre Abweichung vom Jahresziel in projected_difference.
+    """
+    elapsed = months_between(start_date, current_date)
+    years = max(elapsed // 12, 0) + 1 if elapsed >= 0 else 0
+    dates = add_months(start_date, np.arange(12 * years + 1)) if years else np.empty(0, dtype="datetime64[D]")
+    epochs = to_epoch_seconds(dates)
+
+    months = _records(dates, period_usage(timestamps, readings, epochs), annual_energy / 12) if years else []
+    periods = _records(dates[::12], period_usage(timestamps, readings, epochs[::12]), annual_energy) if years else []
+    current = periods[-1] if periods else None
+    projected = current["projected"] if current else None
+    return {
+        "months": months,
+        "periods": periods,
+        "current_period": current,
+        "projected_annual": projected,
+        "projected_difference": None if projected is None else projected - annual_energy,
+    }
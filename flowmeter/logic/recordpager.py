@@ -0,0 +1,72 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from collections import OrderedDict
+
+
+class RecordPager:
+    """
+    Seitenweiser Lesezugriff auf die Einträge eines Zählers, neueste zuerst.
+    Verhält sich für len() und Slicing wie eine Liste, lädt aber nur die benötigten Seiten.
+    """
+
+    def __init__(self, database, meter_type, page_size=200, max_pages=16):
+        if page_size < 1 or max_pages < 1:
+            raise ValueError("Seitengröße und Anzahl der Seiten müssen mindestens 1 sein.")
+        self.database = database
+        self.meter_type = meter_type
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.invalidate()
+
+    def invalidate(self):
+        self._count = None
+        self._pages = OrderedDict()
+        # Letzter Schlüssel (Zeitstempel, ID) je bekannter Seite, für die Keyset-Abfrage der Folgeseite
+        self._boundaries = {}
+
+    def __len__(self):
+        if self._count is None:
+            self._count = self.database.count_entries(self.meter_type)
+        return self._count
+
+    def _page(self, index):
+        page = self._pages.get(index)
+        if page is not None:
+            self._pages.move_to_end(index)
+            return page
+
+        before = self._boundaries.get(index - 1)
+        if before is not None:
+            page = self.database.get_entries_page(self.meter_type, self.page_size, before=before)
+        else:
+            page = self.database.get_entries_page(self.meter_type, self.page_size, offset=index * self.page_size)
+        if page:
+            self._boundaries[index] = (page[-1][1], page[-1][0])
+
+        self._pages[index] = page
+        if len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+        return page
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                raise ValueError("Nur zusammenhängende Bereiche werden unterstützt.")
+            rows = []
+            for index in range(start // self.page_size, (stop - 1) // self.page_size + 1 if stop > start else 0):
+                page = self._page(index)
+                first = index * self.page_size
+                rows.extend(page[max(start - first, 0):stop - first])
+            return rows
+
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("Index außerhalb des gültigen Bereichs.")
+        return self._page(key // self.page_size)[key % self.page_size]
+
+    def __iter__(self):
+        for index in range((len(self) + self.page_size - 1) // self.page_size):
+            yield from self._page(index)
@@ -0,0 +1,101 @@
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+SAMPLE_ITEMS = 100
+
+
+def estimate_size(value):
+    """
+    Ungefährer Speicherbedarf eines Ergebnisses in Byte. Bei langen Listen wird nur eine Stichprobe
+    vermessen und hochgerechnet, damit die Schätzung selbst billig bleibt.
+    """
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(key) + estimate_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        sample = value[:SAMPLE_ITEMS]
+        items = sum(estimate_size(item) for item in sample)
+        return sys.getsizeof(value) + (items * len(value) // len(sample) if sample else 0)
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """
+    LRU-Zwischenspeicher für abgeleitete Auswertungen. Der Schlüssel enthält den Datenstand
+    (Database.data_version, zählt auch Schreibzugriffe anderer Prozesse), veraltete Ergebnisse
+    werden daher nie geliefert und fallen mit der Zeit heraus.
+    Begrenzt wird über die Anzahl der Einträge und optional über den geschätzten Speicherbedarf.
+    Gelieferte Ergebnisse werden zwischen Aufrufern geteilt und dürfen nicht verändert werden.
+    """
+
+    def __init__(self, max_entries=128, max_size=64 * 1024 * 1024, sizeof=estimate_size):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.sizeof = sizeof
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Außerhalb der Sperre rechnen; zwei gleichzeitige Fehlzugriffe rechnen im Zweifel doppelt
+        value = compute()
+        size = self.sizeof(value) if self.max_size is not None else 0
+        if self.max_size is not None and size > self.max_size:
+            return value
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[1]
+            self._entries[key] = (value, size)
+            self._size += size
+            self._evict()
+        return value
+
+    def _evict(self):
+        while self._entries and (
+            len(self._entries) > self.max_entries or (self.max_size is not None and self._size > self.max_size)
+        ):
+            _, (_, size) = self._entries.popitem(last=False)
+            self._size -= size
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "size": self._size,
+            }
+
+
+result_cache = ResultCache()
@@ -0,0 +1,224 @@
+import os, sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+import argparse
+import csv
+import gzip
+import json
+
+import numpy as np
+
+from flowmeter.database.database import Database, TIMESTAMP_BLOCK_PATTERN
+
+FORMATS = ("csv", "jsonl")
+
+
+def detect_format(path):
+    name = path[:-3] if path.endswith(".gz") else path
+    extension = os.path.splitext(name)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    raise ValueError(f"Unbekanntes Dateiformat {extension or path}. Erlaubt sind: {', '.join(FORMATS)}.")
+
+
+def _open(path, mode):
+    # .gz-Dateien werden transparent (de)komprimiert
+    if path.endswith(".gz"):
+        return gzip.open(path, mode)
+    return open(path, mode)
+
+
+def _normalize_timestamp(timestamp):
+    try:
+        return str(np.datetime64(timestamp, "s")).replace("T", " ")
+    except (ValueError, TypeError):
+        return timestamp
+
+
+def normalize_timestamps(timestamps):
+    """
+    Bringt einen Block ISO-Zeitstempel (auch mit "T" oder ohne Sekunden) in das Format der Datenbank.
+    Nicht lesbare Werte bleiben unverändert und werden beim Speichern abgelehnt.
+    """
+    try:
+        # Häufigster Fall: der Block liegt schon im Datenbankformat vor
+        block = "\n".join(timestamps)
+        if len(block) == 20 * len(timestamps) - 1 and TIMESTAMP_BLOCK_PATTERN.fullmatch(block):
+            return list(timestamps)
+    except TypeError:
+        pass
+    try:
+        parsed = np.array(timestamps, dtype="datetime64[s]")
+    except (ValueError, TypeError):
+        # Mindestens ein Wert ist kein Zeitstempel: den Block einzeln umwandeln
+        return [_normalize_timestamp(timestamp) for timestamp in timestamps]
+    return np.char.replace(np.datetime_as_string(parsed), "T", " ").tolist()
+
+
+def _parse_reading(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def parse_readings(values):
+    # Blockweise nach float; nicht lesbare Werte bleiben unverändert und werden beim Speichern abgelehnt
+    try:
+        return np.array(values, dtype=np.float64).tolist()
+    except (TypeError, ValueError):
+        return [_parse_reading(value) for value in values]
+
+
+def _text_blocks(file, block_bytes):
+    # Ganze Zeilen, etwa block_bytes auf einmal, damit nicht jede Zeile einzeln durch Python läuft
+    while True:
+        lines = file.readlines(block_bytes)
+        if not lines:
+            return
+        yield b"".join(lines).decode("utf-8")
+
+
+def _position(file):
+    # Bei .gz die Position in der komprimierten Datei, damit sie zur Dateigröße passt
+    return (file.fileobj if isinstance(file, gzip.GzipFile) else file).tell()
+
+
+def _csv_columns(text, first_block):
+    lines = text.splitlines()
+    # Eine Kopfzeile wird daran erkannt, dass ihre zweite Spalte keine Zahl ist
+    if first_block and lines:
+        header = next(csv.reader(lines[:1]), [])
+        if len(header) >= 2 and not isinstance(_parse_reading(header[1]), float):
+            del lines[0]
+    lines = [line for line in lines if line]
+    if '"' not in text and all(line.count(",") == 1 for line in lines):
+        # Einfaches CSV ohne Anführungszeichen: jede Zeile hat genau ein Komma
+        fields = ",".join(lines).split(",")
+        return fields[0::2], fields[1::2]
+    rows = [(row[0], row[1]) if len(row) == 2 else (",".join(row), None) for row in csv.reader(lines)]
+    return [row[0] for row in rows], [row[1] for row in rows]
+
+
+def _jsonl_columns(text, first_block):
+    timestamps = []
+    readings = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+            timestamp, reading = entry["timestamp"], entry["reading"]
+        except (ValueError, KeyError, TypeError):
+            timestamp, reading = line.strip(), None
+        timestamps.append(timestamp)
+        readings.append(reading)
+    return timestamps, readings
+
+
+def read_file(path, file_format=None, batch_size=50000, progress=None):
+    """
+    Liest (Zeitstempel, Zählerstand)-Paare blockweise aus CSV oder JSONL mit konstantem Speicherbedarf.
+    progress(bytes_gelesen, bytes_gesamt) wird nach jedem Block aufgerufen.
+    """
+    file_format = file_format or detect_format(path)
+    parse = _csv_columns if file_format == "csv" else _jsonl_columns
+    total = os.path.getsize(path)
+    with _open(path, "rb") as file:
+        # Eine Zeile umfasst typischerweise 25 bis 50 Byte
+        for index, text in enumerate(_text_blocks(file, 32 * batch_size)):
+            timestamps, readings = parse(text, index == 0)
+            if timestamps:
+                yield from zip(normalize_timestamps(timestamps), parse_readings(readings))
+            if progress:
+                progress(min(_position(file), total), total)
+    if progress:
+        progress(total, total)
+
+
+def import_file(database, meter_type, path, file_format=None, on_duplicate="skip", batch_size=50000, progress=None):
+    """
+    Importiert eine CSV- oder JSONL-Datei über den Bulk-Import. Bereits vorhandene Zeitstempel werden
+    je nach on_duplicate übersprungen ("skip"), überschrieben ("replace") oder erneut gespeichert (None).
+    """
+    rows = read_file(path, file_format, batch_size, progress)
+    return database.insert_meter_readings_bulk(meter_type, rows, batch_size, on_duplicate)
+
+
+def export_file(database, meter_type, path, file_format=None, start=None, end=None, batch_size=50000, progress=None):
+    """
+    Schreibt die Einträge eines Zählertyps aufsteigend nach Zeit als CSV oder JSONL.
+    progress(geschriebene_einträge, einträge_gesamt) wird nach jedem Block aufgerufen.
+    """
+    file_format = file_format or detect_format(path)
+    total = database.count_entries(meter_type)
+    written = 0
+    temporary_path = f"{path}.tmp{'.gz' if path.endswith('.gz') else ''}"
+    try:
+        with _open(temporary_path, "wt") as file:
+            if file_format == "csv":
+                file.write("timestamp,reading\n")
+            for rows in database.iter_entry_batches(meter_type, start, end, batch_size):
+                if file_format == "csv":
+                    file.write("".join([f"{row[1]},{row[2]!r}\n" for row in rows]))
+                else:
+                    file.write("".join([f'{{"timestamp": "{row[1]}", "reading": {row[2]!r}}}\n' for row in rows]))
+                written += len(rows)
+                if progress:
+                    progress(written, max(total, written))
+        os.replace(temporary_path, path)
+    except BaseException:
+        # Keine halbe Exportdatei zurücklassen
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+    if progress and not written:
+        progress(0, 0)
+    return written
+
+
+def print_progress(done, total):
+    percent = 100 * done / total if total else 100
+    print(f"\r{percent:5.1f} %", end="", file=sys.stderr, flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m flowmeter.transfer", description="Zählerstände als CSV oder JSONL importieren und exportieren.")
+    parser.add_argument("action", choices=("import", "export"))
+    parser.add_argument("path", help="CSV- oder JSONL-Datei, optional mit .gz")
+    parser.add_argument("--meter", required=True, help="Zählertyp, z. B. electricity oder gas")
+    parser.add_argument("--format", choices=FORMATS, help="Dateiformat (Standard: aus der Dateiendung)")
+    parser.add_argument("--on-duplicate", choices=("skip", "replace", "keep"), default="skip", help="Umgang mit bereits gespeicherten Zeitstempeln")
+    parser.add_argument("--start", help="Export ab diesem Zeitstempel")
+    parser.add_argument("--end", help="Export bis vor diesen Zeitstempel")
+    parser.add_argument("--batch-size", type=int, default=50000)
+    parser.add_argument("--quiet", action="store_true", help="Keinen Fortschritt ausgeben")
+    parser.add_argument("--database", default="flowmeter/database/meter_readings.db")
+    parser.add_argument("--schema", default="flowmeter/database/database_model.yaml")
+    args = parser.parse_args(argv)
+
+    progress = None if args.quiet else print_progress
+    database = Database(database_name=args.database, schema_file=args.schema)
+    database.initialize()
+    try:
+        if args.action == "import":
+            on_duplicate = None if args.on_duplicate == "keep" else args.on_duplicate
+            result = import_file(database, args.meter, args.path, args.format, on_duplicate, args.batch_size, progress)
+            if progress:
+                print(file=sys.stderr)
+            print(f"{result['inserted']} Einträge importiert, {result.get('duplicates', 0)} Duplikate, {len(result['rejected'])} abgelehnt.")
+            for rejection in result["rejected"][:20]:
+                print(f"Eintrag {rejection['index'] + 1}: {rejection['error']}", file=sys.stderr)
+        else:
+            written = export_file(database, args.meter, args.path, args.format, args.start, args.end, args.batch_size, progress)
+            if progress:
+                print(file=sys.stderr)
+            print(f"{written} Einträge exportiert.")
+    finally:
+        database.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import asyncio
+import os
+import threading
+import pytest
+from flowmeter.database.asyncdatabase import AsyncDatabase
+from flowmeter.database.connectionregistry import connection_registry
+
+@pytest.fixture
+def async_database():
+    database = AsyncDatabase(database_name="tests/test_flowmeter.db")
+    asyncio.run(database.initialize())
+    yield database
+    asyncio.run(database.close())
+    database.database.delete_all_data()
+    database.database.close()
+
+def test_concurrent_inserts_share_one_transaction(async_database, monkeypatch):
+    calls = []
+    original = async_database.database.insert_meter_readings_bulk
+
+    def counting_bulk_insert(*args, **kwargs):
+        calls.append(len(args[1]))
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(async_database.database, "insert_meter_readings_bulk", counting_bulk_insert)
+
+    async def produce():
+        await asyncio.gather(*[
+            async_database.insert_electricity_meter(float(value), f"2024-01-01 00:{value // 60:02d}:{value % 60:02d}")
+            for value in range(200)
+        ])
+        return await async_database.get_all_electricity_meters()
+
+    entries = asyncio.run(produce())
+    assert len(entries) == 200
+    assert calls == [200], "Alle gleichzeitigen Einfügungen sollten in einer Transaktion landen."
+
+def test_invalid_reading_fails_only_its_caller(async_database):
+    async def produce():
+        return await asyncio.gather(
+            async_database.insert_gas_meter(10.5),
+            async_database.insert_gas_meter(1.23456),
+            async_database.insert_gas_meter("11.0"),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(produce())
+    assert results[0] is None
+    assert isinstance(results[1], ValueError)
+    assert isinstance(results[2], ValueError)
+    assert len(async_database.database.get_all_gas_meters()) == 1
+
+def test_provider_crud_and_consumption(async_database):
+    async def run():
+        await async_database.insert_energy_provider("gas", 1200, "2024-01-01")
+        provider = await async_database.get_energy_provider("gas")
+        await async_database.insert_gas_meter(10.0, "2024-01-01 00:00:00")
+        await async_database.insert_gas_meter(12.0, "2024-01-01 02:00:00")
+        result = await async_database.calculate_consumption("gas")
+        last = await async_database.get_last_gas_meter()
+        await async_database.delete_energy_provider("gas")
+        return provider, result, last, await async_database.get_all_energy_providers()
+
+    provider, result, last, providers = asyncio.run(run())
+    assert provider[2] == 1200
+    assert result["average_consumption"] == 1.0
+    assert last[2] == 12.0
+    assert providers == []
+
+def test_close_releases_worker_connections():
+    database = AsyncDatabase(database_name="tests/test_flowmeter.db", readers=2)
+
+    async def run():
+        await database.initialize()
+        await database.get_all_electricity_meters()
+        await database.close()
+
+    asyncio.run(run())
+    path = os.path.abspath("tests/test_flowmeter.db")
+    assert [key for key in connection_registry._connections if key[0] == path and key[1] != threading.get_ident()] == []
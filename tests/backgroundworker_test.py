@@ -0,0 +1,84 @@
+import threading
+import time
+import pytest
+from flowmeter.gui.backgroundworker import BackgroundWorker
+
+class FakeRoot:
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, delay, callback):
+        self.callbacks.append(callback)
+
+    def run_until_idle(self, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while self.callbacks and time.monotonic() < deadline:
+            callback = self.callbacks.pop(0)
+            callback()
+            time.sleep(0.001)
+        assert not self.callbacks, "Der Worker sollte alle Aufträge abgeschlossen haben."
+
+@pytest.fixture
+def worker():
+    root = FakeRoot()
+    worker = BackgroundWorker(root)
+    yield worker
+    worker.shutdown()
+
+def test_result_is_delivered_via_after(worker):
+    results = []
+    caller = threading.get_ident()
+    worker.submit(threading.get_ident, on_success=results.append)
+    worker.root.run_until_idle()
+    assert len(results) == 1
+    assert results[0] != caller, "Der Auftrag sollte nicht im aufrufenden Thread laufen."
+
+def test_errors_are_delivered_to_on_error(worker):
+    errors = []
+    worker.submit(int, "keine Zahl", on_error=errors.append)
+    worker.root.run_until_idle()
+    assert isinstance(errors[0], ValueError)
+
+def test_repeated_requests_are_coalesced(worker):
+    started = threading.Event()
+    release = threading.Event()
+    results = []
+
+    def slow():
+        started.set()
+        release.wait(1)
+        return "alt"
+
+    worker.submit(slow, on_success=results.append, key="daten")
+    started.wait(1)
+    worker.submit(lambda: "verworfen", on_success=results.append, key="daten")
+    worker.submit(lambda: "neu", on_success=results.append, key="daten")
+    release.set()
+    worker.root.run_until_idle()
+    assert results == ["neu"]
+
+def test_cancel_drops_result(worker):
+    release = threading.Event()
+    results = []
+    worker.submit(lambda: release.wait(1), on_success=results.append, key="daten")
+    worker.cancel("daten")
+    release.set()
+    worker.root.run_until_idle()
+    assert results == []
+
+def test_reporter_delivers_progress_on_tk_thread(worker):
+    progress = []
+    caller = threading.get_ident()
+
+    def task(report):
+        for done in (1, 2, 3):
+            report(done, 3)
+        return "fertig"
+
+    report = worker.reporter(lambda done, total: progress.append((done, total, threading.get_ident())))
+    results = []
+    worker.submit(task, report, on_success=results.append)
+    worker.root.run_until_idle()
+    assert [(done, total) for done, total, _ in progress] == [(1, 3), (2, 3), (3, 3)]
+    assert all(thread == caller for _, _, thread in progress)
+    assert results == ["fertig"]
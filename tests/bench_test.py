@@ -0,0 +1,44 @@
+import json
+from flowmeter.bench import BENCHMARKS, LOAD_SCHEMA, STARTUP, compare, main, run, synthetic_history
+from flowmeter.database.validation import ReadingValidator
+
+def test_synthetic_history_is_reproducible_and_valid():
+    rows = list(synthetic_history(2500, block_size=1000))
+    assert rows == list(synthetic_history(2500))
+    assert rows[0][0] == "2010-01-01 00:00:00" and rows[1][0] == "2010-01-01 00:01:00"
+    readings = [reading for _, reading in rows]
+    assert readings == sorted(readings)
+    validator = ReadingValidator(6, 1)
+    assert all(validator.check(reading) is None for reading in readings)
+
+def test_run_reports_every_benchmark(tmp_path):
+    report = run([100], repeat=1, directory=str(tmp_path))
+    assert set(report["results"]) == {f"{name}@100" for name in BENCHMARKS} | {STARTUP, LOAD_SCHEMA}
+    assert all(result["seconds"] > 0 for result in report["results"].values())
+    assert report["results"]["get_last_entry@100"]["per_operation"] < report["results"]["get_last_entry@100"]["seconds"]
+    assert report["results"]["import_csv@100"]["rows_per_second"] > 0
+    # Der schnelle Weg über user_version ist viel billiger als das erste Laden des Schemas
+    assert report["results"]["initialize@100"]["per_operation"] < report["results"][LOAD_SCHEMA]["seconds"]
+    assert report["results"][LOAD_SCHEMA]["cached_per_operation"] < report["results"][LOAD_SCHEMA]["seconds"]
+
+def test_compare_flags_regressions():
+    baseline = {"results": {"a@1": {"seconds": 1.0}, "b@1": {"seconds": 1.0}}}
+    report = {"results": {"a@1": {"seconds": 1.2}, "b@1": {"seconds": 1.5}, "c@1": {"seconds": 9.0}}}
+    assert compare(report, baseline, tolerance=0.25) == {
+        "a@1": {"ratio": 1.2, "regression": False},
+        "b@1": {"ratio": 1.5, "regression": True},
+    }
+
+def test_command_line_writes_json_and_baseline(tmp_path):
+    output, baseline = tmp_path / "bench.json", tmp_path / "baseline.json"
+    arguments = ["--sizes", "50", "--repeat", "1", "--only", "get_last_entry,insert_bulk", "--directory", str(tmp_path)]
+    assert main(arguments + ["--output", str(output), "--save-baseline", str(baseline)]) == 0
+    assert set(json.loads(output.read_text())["results"]) == {"insert_bulk@50", "get_last_entry@50"}
+
+    # Eine unmöglich schnelle Basis muss als Verlangsamung erkannt werden
+    report = json.loads(baseline.read_text())
+    for result in report["results"].values():
+        result["seconds"] = 1e-12
+    baseline.write_text(json.dumps(report))
+    assert main(arguments + ["--output", str(output), "--baseline", str(baseline)]) == 1
+    assert all(entry["regression"] for entry in json.loads(output.read_text())["comparison"].values())
@@ -1,5 +1,10 @@
+from datetime import datetime
 import pytest
 import os
+import sqlite3
+import threading
+import yaml
+from flowmeter.database.connectionregistry import connection_registry
 from flowmeter.database.database import Database
 
 @pytest.fixture
@@ -117,4 +122,327 @@ def test_get_all_energy_providers(test_database):
     db.insert_energy_provider('electricity', 2000, '2025-01-01')
     db.insert_energy_provider('gas', 1500, '2025-01-01')
     results = db.get_all_energy_providers()
-    assert len(results) == 2, "Es sollten genau zwei Energieversorger-Einträge vorhanden sein."
\ No newline at end of file
+    assert len(results) == 2, "Es sollten genau zwei Energieversorger-Einträge vorhanden sein."
+
+def test_bulk_insert_electricity_meters(test_database):
+    db = test_database
+    readings = [
+        ("2024-01-01 00:00:00", 100.0),
+        ("2024-01-01 00:15:00", 100.5),
+        ("2024-01-01 00:30:00", 101.2),
+    ]
+    result = db.insert_electricity_meters_bulk(readings, chunk_size=2)
+    assert result["inserted"] == 3
+    assert result["rejected"] == []
+    entries = db.get_all_electricity_meters()
+    assert [entry[1] for entry in entries] == ["2024-01-01 00:30:00", "2024-01-01 00:15:00", "2024-01-01 00:00:00"]
+    assert entries[0][2] == 101.2
+
+def test_bulk_insert_gas_meters_rejects_invalid_rows(test_database):
+    db = test_database
+    readings = [
+        (datetime(2024, 1, 1, 12, 0, 0), 10.125),
+        ("2024-01-01 13:00:00", 10.1234),
+        ("01.01.2024", 10.2),
+        ("2024-01-01 14:00:00", "10.3"),
+        ("2024-01-01 15:00:00",),
+    ]
+    result = db.insert_gas_meters_bulk(readings)
+    assert result["inserted"] == 1
+    assert [rejection["index"] for rejection in result["rejected"]] == [1, 2, 3, 4]
+    entries = db.get_all_gas_meters()
+    assert len(entries) == 1
+    assert entries[0][1] == "2024-01-01 12:00:00"
+
+def test_bulk_insert_invalid_chunk_size(test_database):
+    with pytest.raises(ValueError):
+        test_database.insert_electricity_meters_bulk([], chunk_size=0)
+
+def test_connections_are_shared_per_path(test_database):
+    db = test_database
+    other = Database(database_name=db.database_name, schema_file=db.schema_file)
+    assert other._connect() is db._connect(), "Gleicher Pfad sollte dieselbe Verbindung nutzen."
+    journal_mode = db._execute_sql("PRAGMA journal_mode;", fetchone=True)
+    assert journal_mode[0] == "wal"
+
+def test_connections_are_thread_local(test_database):
+    db = test_database
+    connections = []
+    thread = threading.Thread(target=lambda: connections.append(db._connect()))
+    thread.start()
+    thread.join()
+    assert connections[0] is not db._connect(), "Jeder Thread sollte eine eigene Verbindung erhalten."
+
+def test_close_only_affects_own_thread(test_database):
+    db = test_database
+    opened, closed = threading.Event(), threading.Event()
+    results = []
+
+    def reader():
+        db.get_all_electricity_meters()
+        opened.set()
+        closed.wait()
+        results.append(db.get_all_electricity_meters())
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    opened.wait()
+    db.close()
+    closed.set()
+    thread.join()
+    assert results == [[]], "Die Verbindung des anderen Threads sollte offen bleiben."
+
+def test_connections_of_finished_threads_are_released(test_database):
+    db = test_database
+    connections = []
+    thread = threading.Thread(target=lambda: connections.append(db._connect()))
+    thread.start()
+    thread.join()
+    connection_registry.prune()
+    with pytest.raises(sqlite3.ProgrammingError):
+        connections[0].execute("SELECT 1;")
+
+def test_invalidated_connections_are_reopened_per_thread(test_database):
+    db = test_database
+    connections = []
+    ready, invalidated = threading.Event(), threading.Event()
+
+    def worker():
+        connections.append(db._connect())
+        ready.set()
+        invalidated.wait()
+        connections.append(db._connect())
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    ready.wait()
+    connection_registry.invalidate(db.database_name)
+    invalidated.set()
+    thread.join()
+    assert connections[0] is not connections[1]
+
+def test_closed_connection_is_reopened(test_database):
+    db = test_database
+    db.insert_electricity_meter(100.0)
+    db.close()
+    assert db.get_last_electricity_meter()[2] == 100.0
+
+def test_transaction_takes_write_lock_immediately(test_database):
+    db = test_database
+    other = sqlite3.connect(db.database_name, timeout=0)
+    try:
+        with db._transaction():
+            # Schon vor dem ersten Schreiben darf keine andere Verbindung schreiben
+            with pytest.raises(sqlite3.OperationalError, match="locked"):
+                other.execute("BEGIN IMMEDIATE")
+    finally:
+        other.close()
+
+def test_schema_is_parsed_once(test_database):
+    db = test_database
+    other = Database(database_name=db.database_name, schema_file=db.schema_file)
+    assert other.schema is db.schema, "Das Schema sollte nur einmal pro Prozess geladen werden."
+    with pytest.raises(TypeError):
+        db.sql["insert_gas_meter"] = "DELETE FROM GasMeter;"
+
+def test_schema_version_is_stored(test_database):
+    db = test_database
+    user_version = db._execute_sql("PRAGMA user_version;", fetchone=True)[0]
+    assert user_version == db.schema.version
+    assert db._is_consistent()
+
+def test_outdated_schema_version_is_recreated(test_database):
+    db = test_database
+    db.insert_electricity_meter(100.0)
+    db._execute_sql("PRAGMA user_version = 0;")
+    assert not db._is_consistent()
+    db.initialize()
+    assert db._is_consistent()
+    assert len(db.get_all_electricity_meters()) == 1, "Vorhandene Daten sollten erhalten bleiben."
+
+def test_aggregate_daily_buckets(test_database):
+    db = test_database
+    db.insert_electricity_meters_bulk([
+        ("2024-01-01 08:00:00", 100.0),
+        ("2024-01-01 20:00:00", 104.0),
+        ("2024-01-02 08:00:00", 110.0),
+        ("2024-01-02 20:00:00", 111.5),
+        ("2024-01-03 08:00:00", 120.0),
+    ])
+    result = db.aggregate("electricity", bucket="day", end="2024-01-03")
+    assert result == [
+        ("2024-01-01", "2024-01-01 08:00:00", "2024-01-01 20:00:00", 100.0, 104.0, 4.0, 2),
+        ("2024-01-02", "2024-01-02 08:00:00", "2024-01-02 20:00:00", 110.0, 111.5, 7.5, 2),
+    ]
+
+def test_aggregate_monthly_buckets(test_database):
+    db = test_database
+    db.insert_gas_meters_bulk([
+        (datetime(2024, 1, 10), 10.0),
+        (datetime(2024, 1, 31, 23, 59, 59), 12.5),
+        (datetime(2024, 2, 15), 20.25),
+    ])
+    result = db.aggregate("gas", bucket="month", start=datetime(2024, 1, 1))
+    assert [(row[0], row[5]) for row in result] == [("2024-01", 2.5), ("2024-02", 7.75)]
+
+def test_aggregate_weekly_buckets_span_year_boundary(test_database):
+    db = test_database
+    db.insert_electricity_meters_bulk([
+        ("2024-12-29 12:00:00", 90.0),
+        ("2024-12-30 08:00:00", 100.0),
+        ("2025-01-01 08:00:00", 105.0),
+        ("2025-01-05 20:00:00", 112.0),
+        ("2025-01-06 08:00:00", 113.0),
+    ])
+    result = db.aggregate("electricity", bucket="week")
+    assert [(row[0], row[5], row[6]) for row in result] == [
+        ("2024-12-23", 0.0, 1),
+        ("2024-12-30", 22.0, 3),
+        ("2025-01-06", 1.0, 1),
+    ]
+
+def test_aggregate_invalid_bucket(test_database):
+    with pytest.raises(ValueError):
+        test_database.aggregate("electricity", bucket="year")
+
+def test_rollups_follow_inserts_and_deletes(test_database):
+    db = test_database
+    db.insert_electricity_meters_bulk([
+        ("2024-01-31 08:00:00", 100.0),
+        ("2024-01-31 20:00:00", 104.0),
+        ("2024-02-01 08:00:00", 110.0),
+    ])
+    assert db.get_rollups("electricity", "daily") == [
+        ("2024-01-31", "2024-01-31 08:00:00", "2024-01-31 20:00:00", 100.0, 104.0, 2),
+        ("2024-02-01", "2024-02-01 08:00:00", "2024-02-01 08:00:00", 110.0, 110.0, 1),
+    ]
+    assert [row[0] for row in db.get_rollups("electricity", "monthly")] == ["2024-01", "2024-02"]
+
+    last_of_january = [entry for entry in db.get_all_electricity_meters() if entry[1] == "2024-01-31 20:00:00"][0]
+    db.delete_electricity_meter(last_of_january[0])
+    assert db.get_rollups("electricity", "monthly")[0][4] == 100.0
+
+    db.insert_electricity_meter(120.0)
+    daily = db.get_rollups("electricity", "daily")
+    assert daily[-1][4] == 120.0 and daily[-1][5] == 1
+
+def test_rebuild_rollups(test_database):
+    db = test_database
+    db.insert_gas_meters_bulk([("2024-03-01 00:00:00", 1.0), ("2024-03-02 00:00:00", 2.5)])
+    expected = db.get_rollups("gas", "daily")
+    db._execute_sql("DELETE FROM GasDaily;")
+    db.rebuild_rollups()
+    assert db.get_rollups("gas", "daily") == expected
+    assert db.get_rollups("gas", "monthly") == [("2024-03", "2024-03-01 00:00:00", "2024-03-02 00:00:00", 1.0, 2.5, 2)]
+
+def test_delete_all_data_clears_rollups(test_database):
+    db = test_database
+    db.insert_gas_meter(12.5)
+    db.delete_all_data()
+    assert db.get_rollups("gas", "daily") == []
+    assert db.get_rollups("gas", "monthly") == []
+
+def test_iter_entries_pages_in_timestamp_order(test_database):
+    db = test_database
+    db.insert_electricity_meters_bulk([
+        ("2024-01-01 00:00:00", 1.0),
+        ("2024-01-01 00:00:00", 2.0),
+        ("2024-01-02 00:00:00", 3.0),
+        ("2024-01-03 00:00:00", 4.0),
+        ("2024-01-04 00:00:00", 5.0),
+    ])
+    batches = list(db.iter_entry_batches("electricity", batch_size=2))
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [entry[2] for entry in db.iter_entries("electricity", batch_size=2)] == [1.0, 2.0, 3.0, 4.0, 5.0]
+    ranged = db.iter_entries("electricity", start="2024-01-02", end=datetime(2024, 1, 4), batch_size=1)
+    assert [entry[2] for entry in ranged] == [3.0, 4.0]
+
+def test_meter_type_descriptors(test_database):
+    db = test_database
+    electricity = db.get_meter_type("electricity")
+    assert electricity.table == "ElectricityMeter"
+    assert (electricity.validator.integer_digits, electricity.validator.decimals) == (6, 1)
+    assert "INSERT INTO GasMeter" in db.get_meter_type("gas").sql.insert
+    assert db.schema.stored_meter_types == ("electricity", "gas")
+    with pytest.raises(ValueError, match="Ungültiger Zählertyp"):
+        db.get_meter_type("water")
+
+def test_meter_sql_is_immutable(test_database):
+    meter = test_database.get_meter_type("gas")
+    with pytest.raises(AttributeError):
+        meter.sql.insert = "DELETE FROM GasMeter;"
+    with pytest.raises(AttributeError):
+        meter.raw_sql.last_entry = "SELECT 1;"
+
+def test_readings_are_stored_as_scaled_integers(test_database):
+    db = test_database
+    db.insert_electricity_meter(123456.7)
+    db.insert_gas_meters_bulk([("2024-01-01 12:00:00", 12345.678)])
+    assert db._execute_sql("SELECT electricityMeterReading, typeof(electricityMeterReading) FROM ElectricityMeter;", fetchone=True) == (1234567, "integer")
+    assert db._execute_sql("SELECT gasMeterReading FROM GasMeter;", fetchone=True)[0] == 12345678
+    assert db.get_last_electricity_meter()[2] == 123456.7
+    assert db.get_last_gas_meter()[2] == 12345.678
+    assert db.get_rollups("gas", "daily")[0][3] == 12345.678
+
+def test_decimal_storage_is_migrated(tmp_path):
+    with open("flowmeter/database/database_model.yaml", "r") as file:
+        definition = yaml.safe_load(file)
+    for meter_type in ("electricity", "gas"):
+        definition["database"]["meter_types"][meter_type]["storage"] = "decimal"
+    decimal_schema = tmp_path / "decimal_model.yaml"
+    with open(decimal_schema, "w") as file:
+        yaml.safe_dump(definition, file)
+
+    database_name = str(tmp_path / "migration.db")
+    old = Database(database_name=database_name, schema_file=str(decimal_schema))
+    old.initialize()
+    old.insert_electricity_meters_bulk([("2024-01-01 12:00:00", 100.1), ("2024-02-01 12:00:00", 100.3)])
+    assert old._execute_sql("SELECT typeof(electricityMeterReading) FROM ElectricityMeter;", fetchone=True)[0] == "real"
+    old.close()
+
+    new = Database(database_name=database_name)
+    new.initialize()
+    rows = new._execute_sql("SELECT electricityMeterReading FROM ElectricityMeter ORDER BY timestamp;", fetchall=True)
+    assert rows == [(1001,), (1003,)]
+    assert [row[2] for row in new.get_all_electricity_meters()] == [100.3, 100.1]
+    assert [row[4] for row in new.get_rollups("electricity", "monthly")] == [100.1, 100.3]
+    assert new._execute_sql("SELECT electricityMeterReading FROM electricity_meter_last_entry;", fetchone=True)[0] == 100.3
+    new.close()
+
+def test_views_follow_storage(tmp_path):
+    with open("flowmeter/database/database_model.yaml", "r") as file:
+        definition = yaml.safe_load(file)
+    definition["database"]["meter_types"]["electricity"]["storage"] = "decimal"
+    decimal_schema = tmp_path / "decimal_model.yaml"
+    with open(decimal_schema, "w") as file:
+        yaml.safe_dump(definition, file)
+
+    db = Database(database_name=str(tmp_path / "views.db"), schema_file=str(decimal_schema))
+    db.initialize()
+    db.insert_electricity_meter(100.1)
+    db.insert_gas_meter(12.345)
+    assert db.get_last_electricity_meter()[2] == 100.1
+    assert db._execute_sql("SELECT electricityMeterReading FROM electricity_meter_last_entry;", fetchone=True)[0] == 100.1
+    assert db._execute_sql("SELECT electricityMeterReading FROM electricity_meter_all_entries;", fetchone=True)[0] == 100.1
+    assert db._execute_sql("SELECT gasMeterReading FROM gas_meter_last_entry;", fetchone=True)[0] == 12.345
+    db.close()
+
+def test_data_version_counts_changes(test_database):
+    version = test_database.data_version
+    test_database.get_all_electricity_meters()
+    assert test_database.data_version == version
+    test_database.insert_electricity_meter(1.0)
+    assert test_database.data_version > version
+    version = test_database.data_version
+    Database(database_name="tests/test_flowmeter.db").delete_all_data()
+    assert test_database.data_version > version
+
+def test_data_version_sees_other_processes(test_database):
+    version = test_database.data_version
+    assert test_database.data_version == version
+    # Eine eigene Verbindung steht für einen anderen Prozess, etwa den Ingest-Dienst
+    other = sqlite3.connect(test_database.database_name)
+    other.execute("INSERT INTO ElectricityMeter (electricityMeterReading) VALUES (10);")
+    other.commit()
+    other.close()
+    assert test_database.data_version > version
@@ -0,0 +1,123 @@
+import threading
+import time
+import pytest
+from flowmeter.database.database import Database
+from flowmeter.gui.backgroundworker import BackgroundWorker
+from flowmeter.gui.datadisplay import DataDisplayGUI
+from flowmeter.logic.recordpager import RecordPager
+
+class FakeRoot:
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, delay, callback):
+        self.callbacks.append(callback)
+
+    def winfo_exists(self):
+        return True
+
+    def run_until_idle(self, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while self.callbacks and time.monotonic() < deadline:
+            self.callbacks.pop(0)()
+            time.sleep(0.001)
+
+class FakeTree:
+    def __init__(self):
+        self.rows = []
+
+    def get_children(self):
+        return list(range(len(self.rows)))
+
+    def delete(self, *items):
+        self.rows = []
+
+    def insert(self, parent, index, values):
+        self.rows.append(values)
+
+class FakeScrollbar:
+    def set(self, first, last):
+        self.position = (first, last)
+
+class FakeButton:
+    def __init__(self):
+        self.state = "normal"
+
+    def config(self, state):
+        self.state = state
+
+@pytest.fixture
+def test_database():
+    database = Database(database_name="tests/test_flowmeter.db")
+    database.initialize()
+    yield database
+    database.delete_all_data()
+    database.connection.close()
+
+@pytest.fixture
+def display(test_database):
+    # Ohne Bildschirm: nur die Teile, die Tabelle und Übertragung brauchen
+    display = DataDisplayGUI.__new__(DataDisplayGUI)
+    display.root = FakeRoot()
+    display.worker = BackgroundWorker(display.root)
+    display.tree = FakeTree()
+    display.scrollbar = FakeScrollbar()
+    display.table_offset = 0
+    display.table_total = 0
+    display.visible_rows = 3
+    display._table_stale = False
+    yield display
+    display.worker.shutdown()
+
+def test_table_is_loaded_off_the_tk_thread(display, test_database, monkeypatch):
+    test_database.insert_electricity_meters_bulk([(f"2024-01-01 00:00:0{second}", float(second)) for second in range(5)])
+    threads = []
+
+    def recording(original):
+        def query(*args, **kwargs):
+            threads.append(threading.get_ident())
+            return original(*args, **kwargs)
+        return query
+
+    for name in ("count_entries", "get_entries_page"):
+        monkeypatch.setattr(test_database, name, recording(getattr(test_database, name)))
+    display.data = RecordPager(test_database, "electricity")
+
+    display.render_table()
+    assert display.tree.rows == []
+    display.root.run_until_idle()
+    assert [row[2] for row in display.tree.rows] == [4.0, 3.0, 2.0]
+    assert display.table_total == 5
+    assert threads and threading.get_ident() not in threads
+
+def test_refresh_reloads_pages(display, test_database, monkeypatch):
+    test_database.insert_electricity_meter(1.0)
+    display.data = RecordPager(test_database, "electricity")
+    display.render_table()
+    display.root.run_until_idle()
+    test_database.insert_electricity_meter(2.0)
+
+    display.plot_window = None
+    monkeypatch.setattr(display, "show_plot_window", lambda: None)
+    display.refresh_data()
+    display.root.run_until_idle()
+    assert display.table_total == 2 and not display._table_stale
+
+def test_transfer_buttons_are_locked_while_running(display):
+    display.export_button, display.import_button = FakeButton(), FakeButton()
+    display.progress = {}
+    started, release = threading.Event(), threading.Event()
+    results = []
+
+    def transfer(progress):
+        started.set()
+        release.wait(2)
+        return 7
+
+    display.submit_transfer(transfer, on_success=results.append, error_message="Fehler")
+    started.wait(2)
+    assert display.export_button.state == "disabled" and display.import_button.state == "disabled"
+    release.set()
+    display.root.run_until_idle()
+    assert results == [7]
+    assert display.export_button.state == "normal" and display.import_button.state == "normal"
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from flowmeter.logic.downsampling import downsample, lttb, minmax
+
+@pytest.fixture
+def series():
+    x = np.arange(100000, dtype=np.int64) * 900
+    y = np.sin(np.arange(100000) / 500.0)
+    y[54321] = 25.0
+    y[12345] = -25.0
+    return x, y
+
+def test_minmax_keeps_peaks_and_endpoints(series):
+    x, y = series
+    dx, dy = minmax(x, y, 700)
+    assert len(dx) <= 4 * 700
+    assert dy.max() == 25.0 and dy.min() == -25.0
+    assert dx[0] == x[0] and dx[-1] == x[-1]
+    assert np.all(np.diff(dx) > 0)
+
+def test_lttb_returns_threshold_points(series):
+    x, y = series
+    dx, dy = lttb(x, y, 500)
+    assert len(dx) == 500
+    assert dx[0] == x[0] and dx[-1] == x[-1]
+    assert 25.0 in dy and -25.0 in dy
+    assert np.all(np.diff(dx) > 0)
+
+def test_small_series_unchanged():
+    x = np.arange(10)
+    y = np.arange(10) * 2.0
+    assert len(minmax(x, y, 100)[0]) == 10
+    assert len(lttb(x, y, 100)[0]) == 10
+
+def test_downsample_visible_window(series):
+    x, y = series
+    dx, dy = downsample(x, y, 100, start=x[1000], end=x[2000])
+    assert dx[0] <= x[1000] and dx[-1] >= x[2000]
+    assert len(dx) <= 400
+    with pytest.raises(ValueError):
+        downsample(x, y, 100, method="random")
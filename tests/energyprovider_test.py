@@ -1,6 +1,8 @@
 from datetime import datetime
+import sqlite3
 import pytest
 from flowmeter.logic.energyprovider import EnergyProvider
+from flowmeter.logic.resultcache import ResultCache
 from flowmeter.database.database import Database
 from dateutil.relativedelta import relativedelta
 
@@ -96,4 +98,136 @@ def test_calculate_consumption(test_database):
     else:
         assert "average_consumption" in result
         assert result["average_consumption"] > 0
-        assert len(result["consumptions"]) == 2 
\ No newline at end of file
+        assert len(result["consumptions"]) == 2 
+
+def test_calculate_consumption_uses_readings(test_database):
+    provider = EnergyProvider(database=test_database)
+    test_database.insert_electricity_meters_bulk([
+        ("2024-01-01 00:00:00", 1000.0),
+        ("2024-01-01 01:00:00", 1002.0),
+        ("2024-01-01 03:00:00", 1010.0),
+        ("2024-01-01 04:00:00", 1011.0),
+    ])
+
+    result = provider.calculate_consumption("electricity")
+
+    assert result["consumptions"] == [2.0, 4.0, 1.0]
+    assert result["average_consumption"] == pytest.approx(7.0 / 3)
+    assert result["min_consumption"] == 1.0
+    assert result["max_consumption"] == 4.0
+    assert result["percentiles"][50] == 2.0
+    assert result["total_entries"] == 4
+
+def test_calculate_consumption_invalid_meter_type(test_database):
+    provider = EnergyProvider(database=test_database)
+    with pytest.raises(ValueError):
+        provider.calculate_consumption("water")
+
+def test_prepare_monthly_data_includes_actual_consumption(test_database):
+    provider = EnergyProvider(database=test_database)
+    provider.add_provider("gas", 1200, "2024-01-01")
+    test_database.insert_gas_meters_bulk([
+        ("2024-01-01 00:00:00", 100.0),
+        ("2024-01-31 00:00:00", 150.0),
+        ("2024-02-28 00:00:00", 230.0),
+    ])
+
+    data_points = provider.prepare_monthly_data("gas", current_date=datetime(2024, 6, 15))
+    by_month = {point['date'][:7]: point for point in data_points}
+
+    assert by_month["2024-01"]["consumption"] == 100
+    assert by_month["2024-01"]["actual_consumption"] == 50.0
+    assert by_month["2024-02"]["actual_consumption"] == 80.0
+    assert by_month["2024-03"]["actual_consumption"] is None
+
+def test_calculate_consumption_streams_batches(test_database):
+    provider = EnergyProvider(database=test_database)
+    test_database.insert_gas_meters_bulk([
+        (f"2024-01-01 {hour:02d}:00:00", float(hour * 2)) for hour in range(10)
+    ])
+
+    streamed = provider.calculate_consumption("gas", include_consumptions=False, batch_size=3)
+    full = provider.calculate_consumption("gas", batch_size=3)
+
+    assert streamed["average_consumption"] == 2.0
+    assert streamed["min_consumption"] == streamed["max_consumption"] == 2.0
+    assert "consumptions" not in streamed
+    assert full["consumptions"] == [2.0] * 9
+    assert full["total_entries"] == 10
+
+def test_monthly_consumption_is_exact(test_database):
+    energy_provider = EnergyProvider(database=test_database)
+    test_database.insert_electricity_meters_bulk([
+        ("2024-01-01 12:00:00", 0.1),
+        ("2024-01-31 12:00:00", 0.4),
+        ("2024-02-28 12:00:00", 0.7),
+    ])
+    assert energy_provider.get_monthly_consumption("electricity") == {"2024-01": 0.3, "2024-02": 0.3}
+
+def test_prepare_monthly_data_interpolates_month_boundaries(test_database):
+    provider = EnergyProvider(database=test_database)
+    provider.add_provider("gas", 1200, "2024-01-01")
+    test_database.insert_gas_meters_bulk([
+        ("2024-01-01 00:00:00", 100.0),
+        ("2024-01-31 00:00:00", 150.0),
+        ("2024-02-10 00:00:00", 160.0),
+    ])
+
+    by_month = {point['date'][:7]: point for point in provider.prepare_monthly_data("gas", current_date=datetime(2024, 6, 15))}
+
+    assert by_month["2024-01"]["interpolated_consumption"] == pytest.approx(51.0)
+    assert by_month["2024-02"]["interpolated_consumption"] is None
+    assert by_month["2024-02"]["projected_consumption"] == pytest.approx(9.0 * 29 / 9)
+
+def test_project_consumption_is_memoized_per_data_version(test_database):
+    provider = EnergyProvider(database=test_database)
+    provider.add_provider("electricity", 3650, "2024-01-01")
+    test_database.insert_electricity_meters_bulk([("2024-01-01 00:00:00", 0.0), ("2024-01-11 00:00:00", 100.0)])
+
+    first = provider.project_consumption("electricity", current_date=datetime(2024, 1, 11))
+    assert first["projected_annual"] == pytest.approx(3660.0)
+    assert provider.project_consumption("electricity", current_date=datetime(2024, 1, 11)) is first
+
+    test_database.insert_electricity_meter(200.0)
+    assert provider.project_consumption("electricity", current_date=datetime(2024, 1, 11)) is not first
+
+def test_cached_consumption_follows_other_processes(test_database):
+    provider = EnergyProvider(database=test_database)
+    test_database.insert_electricity_meters_bulk([("2024-01-01 00:00:00", 0.0), ("2024-01-02 00:00:00", 24.0)])
+    first = provider.calculate_consumption("electricity")
+    assert provider.calculate_consumption("electricity") is first
+
+    other = sqlite3.connect(test_database.database_name)
+    other.execute("INSERT INTO ElectricityMeter (timestamp, electricityMeterReading) VALUES ('2024-01-03 00:00:00', 720);")
+    other.commit()
+    other.close()
+    assert provider.calculate_consumption("electricity") is not first
+
+def test_get_projections_covers_all_providers(test_database):
+    provider = EnergyProvider(database=test_database)
+    provider.add_provider("electricity", 3650, "2024-01-01")
+    provider.add_provider("gas", 1200, "2024-01-01")
+    projections = provider.get_projections(current_date=datetime(2024, 6, 1))
+    assert set(projections) == {"electricity", "gas"}
+    assert projections["gas"]["projected_annual"] is None
+
+def test_results_are_cached_until_data_changes(test_database):
+    cache = ResultCache()
+    provider = EnergyProvider(database=test_database, cache=cache)
+    test_database.insert_gas_meters_bulk([("2024-01-01 00:00:00", 1.0), ("2024-01-01 01:00:00", 3.0)])
+
+    first = provider.calculate_consumption("gas")
+    assert provider.calculate_consumption("gas") is first
+    assert cache.stats()["hits"] == 1
+
+    test_database.insert_gas_meters_bulk([("2024-01-01 02:00:00", 4.0)])
+    assert provider.calculate_consumption("gas")["consumptions"] == [2.0, 1.0]
+    test_database.delete_all_data()
+    assert "message" in provider.calculate_consumption("gas")
+    assert cache.stats()["misses"] == 3
+
+def test_energy_targets(test_database):
+    provider = EnergyProvider(database=test_database, cache=ResultCache())
+    assert provider.get_energy_targets() == {"electricity": None, "gas": None}
+    provider.add_provider("gas", 1200, "2024-01-01")
+    assert provider.get_energy_targets() == {"electricity": None, "gas": 100.0}
@@ -0,0 +1,97 @@
+import pytest
+from flowmeter.database.database import Database
+from flowmeter.logic.fleet import MeterRegistry
+
+@pytest.fixture
+def test_database():
+    database = Database(database_name="tests/test_flowmeter.db")
+    database.initialize()
+    yield database
+    database.delete_all_data()
+    database.connection.close()
+
+@pytest.fixture
+def registry(test_database):
+    return MeterRegistry(test_database)
+
+def test_add_meter_is_idempotent(registry):
+    first = registry.add_meter("Musterstraße 1", "water", "Küche")
+    second = registry.add_meter("Musterstraße 1", "water", "Küche")
+    assert first is second
+    assert first.meter_type == "water"
+    assert [meter.name for meter in registry.meters("Musterstraße 1")] == ["Küche"]
+
+def test_invalid_meter_type(registry):
+    with pytest.raises(ValueError, match="Ungültiger Zählertyp"):
+        registry.add_meter("Musterstraße 1", "steam", "Keller")
+
+def test_readings_are_separated_per_meter(registry):
+    heat = registry.add_meter("Musterstraße 1", "heat", "Heizung")
+    water = registry.add_meter("Musterstraße 2", "water", "Garten")
+    heat.record_reading(1234.567)
+    water.record_reading(12.5)
+    water.record_reading(13.25)
+    assert heat.get_last_record() == 1234.567
+    assert [row[2] for row in water.get_all_records()] == [13.25, 12.5]
+    with pytest.raises(ValueError, match="Der neue Zählerstand muss größer sein"):
+        water.record_reading(1.0)
+
+def test_reading_pattern_from_configuration(registry):
+    water = registry.add_meter("Musterstraße 1", "water", "Bad")
+    with pytest.raises(ValueError, match="mehr als 3 Nachkommastellen"):
+        water.record_reading(1.2345)
+
+def test_bulk_iter_and_aggregate(registry):
+    meter = registry.add_meter("Musterstraße 1", "heat", "Heizung")
+    other = registry.add_meter("Musterstraße 1", "heat", "Werkstatt")
+    rows = [(f"2024-01-0{day} 12:00:00", float(day * 10)) for day in range(1, 6)]
+    result = meter.record_readings(rows + [("gestern", 100.0)])
+    assert result["inserted"] == 5
+    assert [rejection["index"] for rejection in result["rejected"]] == [5]
+    other.record_readings([("2024-01-01 12:00:00", 999.0)])
+
+    assert [row[2] for row in meter.iter_records(batch_size=2)] == [10.0, 20.0, 30.0, 40.0, 50.0]
+    assert [row[2] for row in meter.iter_records(start="2024-01-03 00:00:00")] == [30.0, 40.0, 50.0]
+    buckets = meter.aggregate("day")
+    assert [bucket[0] for bucket in buckets] == [f"2024-01-0{day}" for day in range(1, 6)]
+    assert [bucket[5] for bucket in buckets] == [0.0, 10.0, 10.0, 10.0, 10.0]
+
+def test_aggregate_weekly_buckets_span_year_boundary(registry):
+    meter = registry.add_meter("Musterstraße 1", "water", "Küche")
+    meter.record_readings([("2024-12-30 08:00:00", 1.0), ("2025-01-02 08:00:00", 3.5)])
+    assert [(bucket[0], bucket[6]) for bucket in meter.aggregate("week")] == [("2024-12-30", 2)]
+
+def test_last_record_survives_writes_to_other_meters(registry, monkeypatch):
+    calls = []
+    original = registry.database.get_last_fleet_entry
+
+    def counting_get_last_fleet_entry(meter_id):
+        calls.append(meter_id)
+        return original(meter_id)
+
+    monkeypatch.setattr(registry.database, "get_last_fleet_entry", counting_get_last_fleet_entry)
+    kitchen = registry.add_meter("Musterstraße 1", "water", "Küche")
+    garden = registry.add_meter("Musterstraße 1", "water", "Garten")
+    kitchen.record_reading(1.0)
+    garden.record_reading(5.0)
+    garden.record_readings([("2024-01-01 00:00:00", 6.0)])
+    kitchen.record_reading(2.0)
+    assert calls == [kitchen.meter_id, garden.meter_id]
+    registry.database._execute_sql("INSERT INTO MeterReading (meterID, reading) VALUES (?, 3.0);", (kitchen.meter_id,))
+    assert kitchen.get_last_record() == 3.0, "Nicht zugeordnete Änderungen sollten den Cache verwerfen."
+
+def test_delete_record(registry):
+    meter = registry.add_meter("Musterstraße 1", "electricity", "Zähler 1")
+    meter.record_readings([("2024-01-01 12:00:00", 1.5), ("2024-01-02 12:00:00", 2.5)])
+    newest = meter.get_all_records()[0]
+    meter.delete_record(newest[0])
+    assert meter.get_last_record() == 1.5
+
+def test_unknown_meter(registry):
+    with pytest.raises(ValueError, match="existiert nicht"):
+        registry.get_meter(123456)
+
+def test_delete_all_data_clears_fleet(test_database, registry):
+    registry.add_meter("Musterstraße 1", "gas", "Keller").record_reading(1.5)
+    test_database.delete_all_data()
+    assert test_database.get_households() == []
@@ -0,0 +1,142 @@
+import io
+import queue
+import sqlite3
+import threading
+import pytest
+from flowmeter.database.database import Database
+from flowmeter.ingest import IngestDaemon, parse_line
+
+@pytest.fixture
+def test_database():
+    database = Database(database_name="tests/test_flowmeter.db")
+    database.initialize()
+    yield database
+    database.delete_all_data()
+    database.connection.close()
+
+def test_parse_line_formats():
+    assert parse_line("gas 12.345 2024-01-01 12:00:00") == ("gas", "2024-01-01 12:00:00", 12.345)
+    assert parse_line('{"meter": "electricity", "reading": 100.5, "timestamp": "2024-01-01 12:00:00"}') == (
+        "electricity", "2024-01-01 12:00:00", 100.5
+    )
+    assert parse_line("gas 1.0")[0] == "gas"
+    assert parse_line("   ") is None
+    with pytest.raises(ValueError):
+        parse_line("water 1.0")
+
+def test_stream_is_group_committed(test_database, monkeypatch):
+    daemon = IngestDaemon(test_database, flush_interval=0.05, flush_rows=50)
+    commits = []
+    original = test_database.insert_meter_readings_bulk
+
+    def counting_bulk_insert(*args, **kwargs):
+        commits.append(len(args[1]))
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(test_database, "insert_meter_readings_bulk", counting_bulk_insert)
+    lines = [f"electricity {100 + value}.0 2024-01-01 00:{value // 60:02d}:{value % 60:02d}\n" for value in range(120)]
+    lines.append("gas kaputt\n")
+
+    daemon.read_stream(io.StringIO("".join(lines)))
+    daemon.start()
+    daemon.stop()
+
+    assert len(test_database.get_all_electricity_meters()) == 120
+    assert sum(commits) == 120 and len(commits) <= 3
+    assert daemon.committed == 120 and daemon.rejected == 1
+
+def test_meter_semantics_are_enforced(test_database):
+    daemon = IngestDaemon(test_database, flush_interval=0.05)
+    daemon.read_stream(io.StringIO(
+        "gas 10.0 2024-01-01 00:00:00\n"
+        "gas 9.0 2024-01-01 01:00:00\n"
+        "gas -1.0 2024-01-01 02:00:00\n"
+        "gas 11.0 2024-01-01 03:00:00\n"
+    ))
+    daemon.start()
+    daemon.stop()
+
+    assert [entry[2] for entry in test_database.get_all_gas_meters()] == [11.0, 10.0]
+    assert daemon.rejected == 2
+
+def test_full_queue_applies_backpressure(test_database):
+    daemon = IngestDaemon(test_database, max_queue=1)
+    daemon.submit("gas", "2024-01-01 00:00:00", 1.0)
+    with pytest.raises(queue.Full):
+        daemon.submit("gas", "2024-01-01 00:01:00", 2.0, timeout=0.01)
+
+def test_spool_file_removed_after_commit(test_database, tmp_path):
+    spool_file = tmp_path / "readings.txt"
+    spool_file.write_text("electricity 1.0 2024-01-01 00:00:00\nelectricity 2.0 2024-01-01 01:00:00\n")
+    daemon = IngestDaemon(test_database, flush_interval=0.02)
+    daemon.start()
+    watcher = threading.Thread(target=daemon.watch_spool, args=(str(tmp_path), 0.01))
+    watcher.start()
+    for _ in range(200):
+        if not spool_file.exists():
+            break
+        daemon.stopping.wait(0.01)
+    daemon.stop()
+    watcher.join()
+
+    assert not spool_file.exists()
+    assert len(test_database.get_all_electricity_meters()) == 2
+
+def fail_writes(database, monkeypatch, failures):
+    original = database.insert_meter_readings_bulk
+
+    def bulk_insert(*args, **kwargs):
+        if failures:
+            failures.pop()
+            raise sqlite3.OperationalError("database is locked")
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(database, "insert_meter_readings_bulk", bulk_insert)
+
+def test_failed_write_is_not_acknowledged(test_database, monkeypatch):
+    daemon = IngestDaemon(test_database)
+    fail_writes(test_database, monkeypatch, [True])
+    acks = []
+    batch = [
+        ("gas", "2024-01-01 00:00:00", 1.0, lambda: acks.append("gas")),
+        ("water", "2024-01-01 00:00:00", 1.0, lambda: acks.append("water")),
+    ]
+    assert daemon.commit(batch) == batch[:1]
+    assert acks == ["water"] and daemon.rejected == 1 and daemon.write_errors == 1
+    assert daemon.commit(batch[:1]) == []
+    assert acks == ["water", "gas"] and daemon.committed == 1
+
+def test_failed_write_is_retried(test_database, monkeypatch):
+    daemon = IngestDaemon(test_database, flush_interval=0.01, retry_delay=0.01)
+    fail_writes(test_database, monkeypatch, [True, True])
+    acks = []
+    daemon.submit("electricity", "2024-01-01 00:00:00", 5.0, ack=lambda: acks.append(True))
+    daemon.start()
+    for _ in range(200):
+        if acks:
+            break
+        daemon.stopping.wait(0.01)
+    daemon.stop()
+
+    assert acks == [True] and daemon.write_errors == 2
+    assert [entry[2] for entry in test_database.get_all_electricity_meters()] == [5.0]
+
+def test_spool_file_kept_while_writes_fail(test_database, tmp_path, monkeypatch):
+    spool_file = tmp_path / "readings.txt"
+    spool_file.write_text("electricity 1.0 2024-01-01 00:00:00\n")
+    daemon = IngestDaemon(test_database, flush_interval=0.01, retry_delay=10.0)
+    fail_writes(test_database, monkeypatch, [True])
+    daemon.start()
+    watcher = threading.Thread(target=daemon.watch_spool, args=(str(tmp_path), 0.01))
+    watcher.start()
+    for _ in range(200):
+        if daemon.write_errors:
+            break
+        daemon.stopping.wait(0.01)
+    assert spool_file.exists()
+    daemon.stop()
+    watcher.join()
+
+    # Beim Beenden wird noch einmal gespeichert, erst dann ist die Datei erledigt
+    assert not spool_file.exists()
+    assert len(test_database.get_all_electricity_meters()) == 1
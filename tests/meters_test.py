@@ -1,6 +1,10 @@
+import sqlite3
 import pytest
-from flowmeter.logic.meters import ElectricityMeter, GasMeter
+import yaml
+from flowmeter.logic.meters import BaseMeter, ElectricityMeter, GasMeter
+from flowmeter.database.connectionregistry import connection_registry
 from flowmeter.database.database import Database
+from flowmeter.database.validation import ReadingValidator, ValidationError
 
 @pytest.fixture
 def test_database():
@@ -40,6 +44,21 @@ def test_record_reading_less_than_last_value(test_database):
     with pytest.raises(ValueError, match="Der neue Zählerstand muss größer sein als der letzte Zählerstand."):
         gas.record_reading(12345.5)
 
+def test_record_readings_rejected_rows_do_not_move_baseline(test_database):
+    electricity = ElectricityMeter(database=test_database)
+    result = electricity.record_readings([
+        ("garbage", 500.0),
+        ("2024-01-01T00:00:00", 400.0),
+        ("2024-01-01 00:00:00", 300.12),
+        ("2024-01-01 00:00:00", 200.0),
+        ("2024-01-02 00:00:00", 150.0),
+    ])
+    assert result["inserted"] == 1
+    assert [(rejection["index"], rejection["code"]) for rejection in result["rejected"]] == [
+        (0, "timestamp"), (1, "timestamp"), (2, "precision"), (4, "decreasing"),
+    ]
+    assert electricity.get_last_record() == 200.0
+
 def test_reading_saved_to_database(test_database):
     electricity = ElectricityMeter(database=test_database)
     electricity.record_reading(123456.7)
@@ -63,4 +82,150 @@ def test_reading_boundary_values(test_database):
 
     gas = GasMeter(database=test_database)
     gas.record_reading(10000.000)
-    gas.record_reading(99999.999)
\ No newline at end of file
+    gas.record_reading(99999.999)
+
+def test_readings_are_validated_once(test_database, monkeypatch):
+    checks = []
+    original_check = ReadingValidator.check
+    original_chunk = test_database._validate_chunk
+
+    def counting_check(validator, value):
+        checks.append(value)
+        return original_check(validator, value)
+
+    def counting_validate_chunk(*args, **kwargs):
+        checks.append(args[0])
+        return original_chunk(*args, **kwargs)
+
+    monkeypatch.setattr(ReadingValidator, "check", counting_check)
+    monkeypatch.setattr(test_database, "_validate_chunk", counting_validate_chunk)
+    electricity = ElectricityMeter(database=test_database)
+    electricity.record_reading(100.0)
+    assert checks == [100.0]
+    rows = [("2024-01-01 00:00:00", 101.0), ("2024-01-02 00:00:00", 102.5)]
+    electricity.record_readings(rows)
+    assert checks == [100.0, rows]
+    assert electricity.get_last_record() == 102.5
+
+def test_last_record_is_cached_after_insert(test_database, monkeypatch):
+    calls = []
+    original = test_database.get_last_entry
+
+    def counting_get_last_entry(meter_type):
+        calls.append(meter_type)
+        return original(meter_type)
+
+    monkeypatch.setattr(test_database, "get_last_entry", counting_get_last_entry)
+    electricity = ElectricityMeter(database=test_database)
+    electricity.record_reading(100.0)
+    assert calls == ["electricity"]
+    electricity.record_reading(101.0)
+    assert electricity.get_last_record() == 101.0
+    assert calls == ["electricity"], "Der letzte Zählerstand sollte aus dem Cache kommen."
+
+def test_data_version_is_read_once_per_reading(test_database, monkeypatch):
+    electricity = ElectricityMeter(database=test_database)
+    electricity.record_reading(100.0)
+    calls = []
+    original = connection_registry._check_external
+
+    def counting_check_external(path, connection):
+        calls.append(path)
+        return original(path, connection)
+
+    monkeypatch.setattr(connection_registry, "_check_external", counting_check_external)
+    electricity.record_reading(101.0)
+    assert len(calls) == 1, "PRAGMA data_version sollte nur einmal je Zählerstand abgefragt werden."
+
+def test_last_record_survives_writes_to_other_meters(test_database, monkeypatch):
+    calls = []
+    original = test_database.get_last_entry
+
+    def counting_get_last_entry(meter_type):
+        calls.append(meter_type)
+        return original(meter_type)
+
+    monkeypatch.setattr(test_database, "get_last_entry", counting_get_last_entry)
+    electricity = ElectricityMeter(database=test_database)
+    gas = GasMeter(database=test_database)
+    electricity.record_reading(100.0)
+    gas.record_reading(10.0)
+    electricity.record_reading(101.0)
+    gas.record_reading(11.0)
+    assert calls == ["electricity", "gas"]
+
+def test_last_record_cache_invalidated_on_delete(test_database):
+    gas = GasMeter(database=test_database)
+    gas.record_reading(10.0)
+    gas.record_reading(11.0)
+    last_id = test_database.get_last_gas_meter()[0]
+    gas.delete_record(last_id)
+    assert gas.get_last_record() == 10.0
+
+def test_last_record_cache_invalidated_on_reset(test_database):
+    electricity = ElectricityMeter(database=test_database)
+    electricity.record_reading(500.0)
+    electricity.reset_all_data()
+    assert electricity.get_last_record() == 0.0
+    electricity.record_reading(1.0)
+
+def test_last_record_follows_other_instances(test_database):
+    first = ElectricityMeter(database=test_database)
+    second = ElectricityMeter(database=test_database)
+    first.record_reading(100.0)
+    second.record_reading(200.0)
+    with pytest.raises(ValidationError):
+        first.record_reading(150.0)
+    assert [entry[2] for entry in test_database.get_all_electricity_meters()] == [200.0, 100.0]
+
+def test_last_record_follows_reset_by_other_instance(test_database):
+    entry_window = ElectricityMeter(database=test_database)
+    entry_window.record_reading(500.0)
+    ElectricityMeter(database=test_database).reset_all_data()
+    entry_window.record_reading(100.0)
+    assert entry_window.get_last_record() == 100.0
+
+def test_last_record_follows_other_processes(test_database):
+    gas = GasMeter(database=test_database)
+    gas.record_reading(10.0)
+    other = sqlite3.connect(test_database.database_name)
+    other.execute("INSERT INTO GasMeter (gasMeterReading) VALUES (20000);")
+    other.commit()
+    other.close()
+    assert gas.get_last_record() == 20.0
+
+def test_timestamp_index_is_used(test_database):
+    plan = test_database._execute_sql(
+        "EXPLAIN QUERY PLAN SELECT * FROM electricity_meter_all_entries;", fetchall=True
+    )
+    assert any("idx_electricity_meter_timestamp" in row[3] for row in plan)
+
+def test_meter_type_is_class_attribute(test_database):
+    assert ElectricityMeter(database=test_database).meter_type == "electricity"
+    assert GasMeter(database=test_database).meter_type == "gas"
+    with pytest.raises(ValueError, match="Ungültiger Zählertyp"):
+        BaseMeter(test_database).record_reading(1.0)
+
+def test_meter_type_from_configuration(tmp_path):
+    with open("flowmeter/database/database_model.yaml", "r") as file:
+        definition = yaml.safe_load(file)
+    definition["database"]["meter_types"]["water"].update({
+        "table": "WaterMeter",
+        "id_column": "waterMeterID",
+        "reading_column": "waterMeterReading",
+        "daily_table": "WaterDaily",
+        "monthly_table": "WaterMonthly",
+    })
+    schema_file = tmp_path / "database_model.yaml"
+    with open(schema_file, "w") as file:
+        yaml.safe_dump(definition, file)
+
+    database = Database(database_name=str(tmp_path / "water.db"), schema_file=str(schema_file))
+    database.initialize()
+    water = BaseMeter(database, "water")
+    water.record_readings([("2024-01-01 12:00:00", 10.5), ("2024-01-02 12:00:00", 12.25)])
+    assert water.get_last_record() == 12.25
+    assert [row[4] for row in database.get_rollups("water", "daily")] == [10.5, 12.25]
+    with pytest.raises(ValueError, match="mehr als 3 Nachkommastellen"):
+        water.record_reading(13.2345)
+    database.close()
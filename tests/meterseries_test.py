@@ -0,0 +1,63 @@
+import sys
+import numpy as np
+import pytest
+from flowmeter.database.database import Database
+from flowmeter.logic.energyprovider import EnergyProvider
+from flowmeter.logic.meterseries import MeterSeries, to_epoch
+
+@pytest.fixture
+def test_database():
+    database = Database(database_name="tests/test_flowmeter.db")
+    database.initialize()
+    yield database
+    database.delete_all_data()
+    database.connection.close()
+
+@pytest.fixture
+def rows():
+    return [(index + 1, f"2024-01-{index + 1:02d} 12:00:00", float(index)) for index in range(10)]
+
+def test_from_rows_and_getitem(rows):
+    series = MeterSeries.from_rows(rows)
+    assert len(series) == 10
+    assert series[0] == rows[0]
+    assert series[-1] == rows[-1]
+    assert list(series) == rows
+    with pytest.raises(IndexError):
+        series[10]
+
+def test_append_grows_and_keeps_views_valid(rows):
+    series = MeterSeries()
+    series.append(*rows[0])
+    view = series[0:1]
+    for row in rows[1:]:
+        series.append(*row)
+    assert view[0] == rows[0]
+    assert series.ids.tolist() == list(range(1, 11))
+    with pytest.raises(ValueError, match="zeitlicher Reihenfolge"):
+        series.append(11, "2023-12-31 00:00:00", 1.0)
+
+def test_between_is_zero_copy(rows):
+    series = MeterSeries.from_rows(rows)
+    window = series.between("2024-01-03 00:00:00", "2024-01-05 12:00:00")
+    assert window.readings.tolist() == [2.0, 3.0]
+    assert np.shares_memory(window.readings, series.readings)
+    assert len(series.between(end="2024-01-01 00:00:00")) == 0
+    assert len(series.between(start=to_epoch("2024-01-10 12:00:00"))) == 1
+
+def test_memory_footprint(rows):
+    series = MeterSeries.from_rows(rows * 100)
+    tuples = rows * 100
+    tuple_bytes = sum(sys.getsizeof(row) + sys.getsizeof(row[1]) + sys.getsizeof(row[2]) for row in tuples)
+    assert series.nbytes * 6 < tuple_bytes
+
+def test_provider_series_and_consumption(test_database):
+    test_database.insert_electricity_meters_bulk([
+        ("2024-01-01 00:00:00", 100.1),
+        ("2024-01-01 01:00:00", 100.3),
+        ("2024-01-01 03:00:00", 100.9),
+    ])
+    provider = EnergyProvider(database=test_database)
+    series = provider.load_series("electricity")
+    assert series.readings.tolist() == [100.1, 100.3, 100.9]
+    assert provider.calculate_consumption("electricity", series=series) == provider.calculate_consumption("electricity")
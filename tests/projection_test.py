@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from flowmeter.logic.projection import add_months, interpolate, months_between, period_usage, project, to_epoch_seconds
+
+def epochs(*timestamps):
+    return to_epoch_seconds(np.array(timestamps, dtype="datetime64[s]"))
+
+def test_add_months_clamps_to_month_end():
+    dates = add_months("2024-01-31", np.arange(4))
+    assert [str(date) for date in dates] == ["2024-01-31", "2024-02-29", "2024-03-31", "2024-04-30"]
+    assert str(add_months("2024-03-15", -12)) == "2023-03-15"
+
+def test_months_between():
+    assert months_between("2024-01-31", "2024-02-29") == 1
+    assert months_between("2024-01-31", "2024-02-28") == 0
+    assert months_between("2024-03-01", "2024-01-01") == -2
+
+def test_interpolate_does_not_extrapolate():
+    timestamps = epochs("2024-01-01T00:00:00", "2024-01-03T00:00:00")
+    values = interpolate(timestamps, np.array([100.0, 120.0]), epochs("2023-12-31", "2024-01-02", "2024-01-04"))
+    assert np.isnan(values[0]) and np.isnan(values[2])
+    assert values[1] == 110.0
+
+def test_period_usage_and_projection():
+    # 1 Einheit pro Tag vom 01.01. bis 16.01.
+    timestamps = epochs("2024-01-01", "2024-01-16")
+    readings = np.array([0.0, 15.0])
+    usage = period_usage(timestamps, readings, epochs("2024-01-01", "2024-01-11", "2024-01-31", "2024-02-10"))
+    assert usage["actual"][0] == 10.0
+    assert np.isnan(usage["actual"][1])
+    assert usage["usage"][1] == 5.0
+    assert usage["coverage"][1] == 0.25
+    assert usage["projected"][1] == pytest.approx(20.0)
+    assert np.isnan(usage["usage"][2]) and usage["coverage"][2] == 0
+
+def test_project_contract_periods():
+    # Vertrag ab 15.03.2023, 365 Einheiten pro Jahr, gleichmäßig 1 Einheit pro Tag bis zum 15.09.2024
+    timestamps = epochs("2023-03-15", "2024-09-15")
+    days = (timestamps[1] - timestamps[0]) / 86400
+    result = project(timestamps, np.array([0.0, days]), "2023-03-15", 365, "2024-09-15")
+
+    assert [period["start"] for period in result["periods"]] == ["2023-03-15", "2024-03-15"]
+    assert result["periods"][0]["actual"] == 366.0
+    assert result["periods"][1]["actual"] is None
+    assert len(result["months"]) == 24
+    assert result["months"][0]["start"] == "2023-03-15" and result["months"][0]["end"] == "2023-04-15"
+    assert result["months"][0]["actual"] == 31.0
+    assert result["months"][0]["target"] == pytest.approx(365 / 12)
+    assert result["current_period"] is result["periods"][-1]
+    assert result["projected_annual"] == pytest.approx(365.0)
+    assert result["projected_difference"] == pytest.approx(0.0)
+
+def test_project_before_contract_start():
+    result = project(np.empty(0, dtype=np.int64), np.empty(0), "2025-01-01", 1000, "2024-06-01")
+    assert result == {
+        "months": [], "periods": [], "current_period": None, "projected_annual": None, "projected_difference": None
+    }
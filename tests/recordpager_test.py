@@ -0,0 +1,54 @@
+import pytest
+from flowmeter.database.database import Database
+from flowmeter.logic.recordpager import RecordPager
+
+@pytest.fixture
+def test_database():
+    database = Database(database_name="tests/test_flowmeter.db")
+    database.initialize()
+    database.insert_electricity_meters_bulk([
+        (f"2024-01-{day:02d} 00:00:00", float(day)) for day in range(1, 26)
+    ])
+    yield database
+    database.delete_all_data()
+    database.connection.close()
+
+def test_pager_matches_all_entries(test_database):
+    pager = RecordPager(test_database, "electricity", page_size=4, max_pages=2)
+    assert len(pager) == 25
+    assert list(pager) == test_database.get_all_electricity_meters()
+    assert pager[5:11] == test_database.get_all_electricity_meters()[5:11]
+    assert pager[0][2] == 25.0
+    assert pager[-1][2] == 1.0
+
+def test_pager_keeps_bounded_page_cache(test_database):
+    pager = RecordPager(test_database, "electricity", page_size=5, max_pages=2)
+    pager[0:25]
+    assert len(pager._pages) == 2
+
+def test_pager_uses_keyset_for_following_pages(test_database, monkeypatch):
+    pager = RecordPager(test_database, "electricity", page_size=5)
+    last_of_first_page = pager[0:5][-1]
+    calls = []
+    original = test_database.get_entries_page
+
+    def record_call(meter_type, limit, before=None, offset=0):
+        calls.append((before, offset))
+        return original(meter_type, limit, before=before, offset=offset)
+
+    monkeypatch.setattr(test_database, "get_entries_page", record_call)
+    assert pager[5][2] == 20.0
+    assert calls == [(("2024-01-21 00:00:00", last_of_first_page[0]), 0)]
+
+def test_pager_invalidate_after_delete(test_database):
+    pager = RecordPager(test_database, "electricity", page_size=10)
+    newest = pager[0]
+    test_database.delete_electricity_meter(newest[0])
+    pager.invalidate()
+    assert len(pager) == 24
+    assert pager[0][2] == 24.0
+
+def test_pager_index_out_of_range(test_database):
+    pager = RecordPager(test_database, "electricity")
+    with pytest.raises(IndexError):
+        pager[25]
@@ -0,0 +1,44 @@
+import numpy as np
+from flowmeter.logic.resultcache import ResultCache, estimate_size
+
+def test_hits_and_misses_are_counted():
+    cache = ResultCache()
+    calls = []
+    compute = lambda: calls.append(1) or "wert"
+    assert cache.get_or_compute("a", compute) == "wert"
+    assert cache.get_or_compute("a", compute) == "wert"
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResultCache(max_entries=2)
+    cache.get_or_compute("a", lambda: 1)
+    cache.get_or_compute("b", lambda: 2)
+    cache.get_or_compute("a", lambda: 1)
+    cache.get_or_compute("c", lambda: 3)
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert cache.stats()["evictions"] == 1
+
+def test_size_limit():
+    cache = ResultCache(max_size=100, sizeof=len)
+    cache.get_or_compute("a", lambda: "x" * 60)
+    cache.get_or_compute("b", lambda: "x" * 60)
+    assert "a" not in cache and "b" in cache
+    # Zu große Ergebnisse werden geliefert, aber nicht gespeichert
+    assert cache.get_or_compute("c", lambda: "x" * 200) == "x" * 200
+    assert "c" not in cache
+    assert cache.stats()["size"] == 60
+
+def test_clear_keeps_statistics():
+    cache = ResultCache()
+    cache.get_or_compute("a", lambda: 1)
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.stats()["misses"] == 1
+
+def test_estimate_size():
+    assert estimate_size(np.zeros(1000)) == 8000
+    assert estimate_size([1.5] * 10000) > 10000 * 8
+    assert estimate_size({"a": []}) > 0
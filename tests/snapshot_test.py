@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from flowmeter.database.database import Database
+from flowmeter.database.snapshot import HEADER, export_snapshot, import_snapshot, load_snapshot, _encode_meter_type
+
+@pytest.fixture
+def test_database():
+    database = Database(database_name="tests/test_flowmeter.db")
+    database.initialize()
+    yield database
+    database.delete_all_data()
+    database.connection.close()
+
+@pytest.fixture
+def readings():
+    return [(f"2024-01-{day:02d} 12:00:00", 1000.0 + day * 0.125) for day in range(1, 29)]
+
+def test_export_is_memory_mapped(test_database, readings, tmp_path):
+    test_database.insert_gas_meters_bulk(readings)
+    path = tmp_path / "gas.snapshot"
+    assert export_snapshot(test_database, "gas", str(path)) == 28
+    assert path.stat().st_size == HEADER.size + 16 * 28
+
+    snapshot = load_snapshot(str(path))
+    assert snapshot.meter_type == "gas"
+    assert isinstance(snapshot.readings, np.memmap)
+    assert snapshot.readings[0] == 1000125
+    assert snapshot.timestamps[0] == np.datetime64("2024-01-01T12:00:00", "s").astype(np.int64)
+    assert snapshot.values().tolist() == [reading for _, reading in readings]
+
+def test_round_trip_through_bulk_import(test_database, readings, tmp_path):
+    test_database.insert_electricity_meters_bulk([(timestamp, round(reading, 1)) for timestamp, reading in readings])
+    path = str(tmp_path / "electricity.snapshot")
+    export_snapshot(test_database, "electricity", path)
+    expected = [row[1:] for row in test_database.get_all_electricity_meters()]
+    test_database.delete_all_data()
+
+    result = import_snapshot(test_database, path, chunk_size=5)
+    assert result == {"inserted": 28, "rejected": []}
+    assert [row[1:] for row in test_database.get_all_electricity_meters()] == expected
+    assert len(test_database.get_rollups("electricity", "daily")) == 28
+
+def test_empty_snapshot(test_database, tmp_path):
+    path = str(tmp_path / "empty.snapshot")
+    assert export_snapshot(test_database, "gas", path) == 0
+    assert len(load_snapshot(path)) == 0
+    assert import_snapshot(test_database, path)["inserted"] == 0
+
+def test_invalid_snapshot(test_database, tmp_path):
+    path = tmp_path / "broken.snapshot"
+    path.write_bytes(b"keine Snapshot-Datei" * 10)
+    with pytest.raises(ValueError, match="Ungültige Snapshot-Datei"):
+        load_snapshot(str(path))
+
+def test_precision_mismatch(test_database, readings, tmp_path):
+    test_database.insert_gas_meters_bulk(readings)
+    path = str(tmp_path / "gas.snapshot")
+    export_snapshot(test_database, "gas", path)
+    with pytest.raises(ValueError, match="Nachkommastellen"):
+        import_snapshot(test_database, path, meter_type="electricity")
+
+def test_export_streams_batches(test_database, readings, tmp_path):
+    test_database.insert_gas_meters_bulk(readings)
+    path = tmp_path / "gas.snapshot"
+    assert export_snapshot(test_database, "gas", str(path), batch_size=5) == 28
+    snapshot = load_snapshot(str(path))
+    assert snapshot.values().tolist() == [reading for _, reading in readings]
+    assert [entry.name for entry in tmp_path.iterdir()] == ["gas.snapshot"]
+
+def test_long_meter_type_is_rejected():
+    assert _encode_meter_type("x" * 16) == b"x" * 16
+    with pytest.raises(ValueError):
+        _encode_meter_type("x" * 17)
+    with pytest.raises(ValueError):
+        _encode_meter_type("wärme")
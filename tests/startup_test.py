@@ -0,0 +1,28 @@
+import sys
+import pytest
+from flowmeter import gui
+from flowmeter.bench import HEAVY_MODULES, STARTUP_MODULE, import_profile, main
+
+def test_main_menu_starts_without_heavy_modules():
+    seconds, modules = import_profile(STARTUP_MODULE)
+    assert seconds > 0
+    assert STARTUP_MODULE in modules and "flowmeter.gui.electricitymeter" in modules
+    assert not [name for name in modules if name.split(".")[0] in HEAVY_MODULES]
+    assert "flowmeter.gui.datadisplay" not in modules and "flowmeter.gui.providersettings" not in modules
+
+def test_startup_benchmark_from_command_line(tmp_path):
+    output = tmp_path / "startup.json"
+    assert main(["--only", "startup", "--repeat", "1", "--output", str(output)]) == 0
+    assert '"heavy_modules": []' in output.read_text()
+
+def test_windows_load_on_first_access():
+    from flowmeter.gui.providersettings import ProviderSettingsGUI
+    assert gui.ProviderSettingsGUI is ProviderSettingsGUI
+    with pytest.raises(AttributeError):
+        gui.UnknownGUI
+
+def test_prewarm_imports_modules_in_background():
+    thread = gui.prewarm(("flowmeter.gui.providersettings", "flowmeter.gui.unknown"))
+    thread.join(timeout=30)
+    assert not thread.is_alive() and thread.daemon
+    assert "flowmeter.gui.providersettings" in sys.modules
@@ -0,0 +1,109 @@
+import json
+import time
+import pytest
+from flowmeter.database.database import Database
+from flowmeter.database.tracing import Tracer, traced, tracer
+from flowmeter.logic.energyprovider import EnergyProvider
+from flowmeter.logic.meters import ElectricityMeter
+from flowmeter.logic.resultcache import ResultCache
+
+@pytest.fixture
+def test_database():
+    database = Database(database_name="tests/test_flowmeter.db")
+    database.initialize()
+    yield database
+    database.delete_all_data()
+    database.connection.close()
+
+@pytest.fixture
+def tracing():
+    tracer.reset()
+    tracer.enable(slow_query_threshold=None)
+    yield tracer
+    tracer.disable()
+    tracer.reset()
+
+def test_disabled_tracer_records_nothing(test_database):
+    tracer.reset()
+    test_database.insert_electricity_meter(1.0)
+    test_database.get_all_electricity_meters()
+    stats = tracer.stats()
+    assert stats["enabled"] is False
+    assert stats["statements"] == {} and stats["commits"] == 0
+
+def test_statements_rows_and_commits(test_database, tracing):
+    test_database.insert_electricity_meters_bulk([("2024-01-01 00:00:00", 1.0), ("2024-01-02 00:00:00", 2.0)])
+    rows = test_database.get_all_electricity_meters()
+    stats = tracing.stats()
+
+    select = next(value for key, value in stats["statements"].items() if key.startswith("SELECT electricityMeterID"))
+    assert select["count"] == 1
+    assert select["rows"] == len(rows) == 2
+    assert sum(select["histogram"].values()) == 1
+    insert = next(value for key, value in stats["statements"].items() if key.startswith("INSERT INTO ElectricityMeter (timestamp"))
+    assert insert["rows"] == 2
+    assert stats["commits"] == 2
+
+def test_transaction_fetches_count_rows(test_database, tracing):
+    test_database.insert_electricity_meter(1.0)
+    stats = tracing.stats()["statements"]
+    timestamp = next(value for key, value in stats.items() if key.startswith("SELECT timestamp"))
+    assert timestamp["rows"] == 1
+
+def test_slow_queries_capture_query_plan(test_database, tracing):
+    tracing.slow_query_threshold = 0.0
+    test_database.get_last_electricity_meter()
+    slow = tracing.stats()["slow_queries"]
+    assert slow
+    assert slow[-1]["sql"].startswith("SELECT electricityMeterID")
+    assert any("ElectricityMeter" in step for step in slow[-1]["plan"])
+
+def test_streamed_reads_are_traced(test_database, tracing):
+    tracing.slow_query_threshold = 0.0
+    test_database.insert_electricity_meters_bulk([(f"2024-01-0{day} 00:00:00", float(day)) for day in range(1, 8)])
+    batches = list(test_database.iter_entry_batches("electricity", batch_size=5))
+    assert [len(rows) for rows in batches] == [5, 2]
+    EnergyProvider(database=test_database, cache=ResultCache(max_entries=0)).calculate_consumption("electricity")
+    stats = tracing.stats()
+
+    streamed = next(value for key, value in stats["statements"].items() if "after_timestamp" in key)
+    assert streamed["count"] >= 2 and streamed["rows"] >= 7
+    assert any("after_timestamp" in query["sql"] and query["plan"] for query in stats["slow_queries"])
+
+def test_public_methods_are_traced(test_database, tracing):
+    meter = ElectricityMeter(database=test_database)
+    meter.record_reading(1.0)
+    EnergyProvider(database=test_database, cache=ResultCache()).calculate_consumption("electricity")
+    operations = tracing.stats()["operations"]
+    assert operations["ElectricityMeter.record_reading"]["count"] == 1
+    assert operations["ElectricityMeter.save_reading"]["count"] == 1
+    assert operations["EnergyProvider.calculate_consumption"]["count"] == 1
+
+def test_traced_keeps_exceptions_and_name():
+    class Example:
+        @traced()
+        def fail(self):
+            raise KeyError("x")
+
+    tracer.enable()
+    try:
+        with pytest.raises(KeyError):
+            Example().fail()
+        assert tracer.stats()["operations"]["Example.fail"]["count"] == 1
+        assert Example.fail.__name__ == "fail"
+    finally:
+        tracer.disable()
+        tracer.reset()
+
+def test_dump_and_periodic_reporting(tmp_path):
+    local = Tracer()
+    local.enable()
+    local.record_operation("Beispiel", 0.002)
+    path = tmp_path / "trace.json"
+    local.start_reporting(interval=0.01, path=str(path))
+    deadline = time.monotonic() + 2
+    while not path.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    local.stop_reporting()
+    stats = json.loads(path.read_text())
+    assert stats["operations"]["Beispiel"]["histogram"]["<=5ms"] == 1
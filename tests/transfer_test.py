@@ -0,0 +1,143 @@
+import gzip
+import json
+import pytest
+from flowmeter.database.database import Database
+from flowmeter.transfer import detect_format, export_file, import_file, main, read_file
+
+@pytest.fixture
+def test_database():
+    database = Database(database_name="tests/test_flowmeter.db")
+    database.initialize()
+    yield database
+    database.delete_all_data()
+    database.connection.close()
+
+@pytest.fixture
+def readings():
+    return [(f"2024-01-{day:02d} 12:00:00", 1000.0 + day * 0.5) for day in range(1, 29)]
+
+def write_csv(path, lines):
+    path.write_text("".join(f"{line}\n" for line in lines))
+    return str(path)
+
+def test_detect_format():
+    assert detect_format("zaehler.csv") == "csv"
+    assert detect_format("zaehler.jsonl.gz") == "jsonl"
+    with pytest.raises(ValueError, match="Unbekanntes Dateiformat"):
+        detect_format("zaehler.xlsx")
+
+@pytest.mark.parametrize("name", ["gas.csv", "gas.jsonl", "gas.csv.gz", "gas.jsonl.gz"])
+def test_round_trip(test_database, readings, tmp_path, name):
+    test_database.insert_gas_meters_bulk(readings)
+    path = str(tmp_path / name)
+    assert export_file(test_database, "gas", path) == 28
+    expected = [row[1:] for row in test_database.get_all_gas_meters()]
+    test_database.delete_all_data()
+
+    result = import_file(test_database, "gas", path, batch_size=5)
+    assert result == {"inserted": 28, "rejected": [], "duplicates": 0}
+    assert [row[1:] for row in test_database.get_all_gas_meters()] == expected
+
+def test_jsonl_lines(test_database, readings, tmp_path):
+    test_database.insert_gas_meters_bulk(readings[:1])
+    path = tmp_path / "gas.jsonl"
+    export_file(test_database, "gas", str(path))
+    assert json.loads(path.read_text()) == {"timestamp": "2024-01-01 12:00:00", "reading": 1000.5}
+
+def test_csv_without_header_and_iso_timestamps(tmp_path):
+    path = write_csv(tmp_path / "strom.csv", ["2024-01-01T12:00:00,100.5", "2024-01-02T12:00,101"])
+    assert list(read_file(path)) == [("2024-01-01 12:00:00", 100.5), ("2024-01-02 12:00:00", 101.0)]
+
+def test_csv_with_quotes_and_header(tmp_path):
+    path = write_csv(tmp_path / "strom.csv", ['"Zeitpunkt","Stand"', '"2024-01-01 12:00:00","100.5"'])
+    assert list(read_file(path)) == [("2024-01-01 12:00:00", 100.5)]
+
+def test_skip_duplicates(test_database, tmp_path):
+    test_database.insert_electricity_meters_bulk([("2024-01-01 12:00:00", 100.0)])
+    path = write_csv(tmp_path / "strom.csv", [
+        "timestamp,reading", "2024-01-01 12:00:00,999.0", "2024-01-02 12:00:00,101.0", "2024-01-02 12:00:00,102.0"
+    ])
+    result = import_file(test_database, "electricity", path)
+    assert result["inserted"] == 1
+    assert result["duplicates"] == 2
+    assert sorted(row[1:] for row in test_database.get_all_electricity_meters()) == [
+        ("2024-01-01 12:00:00", 100.0), ("2024-01-02 12:00:00", 101.0)
+    ]
+
+def test_replace_duplicates(test_database, tmp_path):
+    test_database.insert_electricity_meters_bulk([("2024-01-01 12:00:00", 100.0)])
+    path = write_csv(tmp_path / "strom.csv", ["2024-01-01 12:00:00,99.5", "2024-01-02 12:00:00,101.0"])
+    result = import_file(test_database, "electricity", path, on_duplicate="replace")
+    assert (result["inserted"], result["duplicates"]) == (1, 1)
+    assert sorted(row[1:] for row in test_database.get_all_electricity_meters()) == [
+        ("2024-01-01 12:00:00", 99.5), ("2024-01-02 12:00:00", 101.0)
+    ]
+    assert test_database.get_rollups("electricity", "daily")[0][3] == 99.5
+
+def test_keep_duplicates(test_database, tmp_path):
+    test_database.insert_electricity_meters_bulk([("2024-01-01 12:00:00", 100.0)])
+    path = write_csv(tmp_path / "strom.csv", ["2024-01-01 12:00:00,100.0"])
+    assert import_file(test_database, "electricity", path, on_duplicate=None) == {"inserted": 1, "rejected": []}
+    assert test_database.count_entries("electricity") == 2
+
+def test_invalid_duplicate_mode(test_database, tmp_path):
+    path = write_csv(tmp_path / "strom.csv", ["2024-01-01 12:00:00,100.0"])
+    with pytest.raises(ValueError, match="Duplikatbehandlung"):
+        import_file(test_database, "electricity", path, on_duplicate="merge")
+
+def test_rejected_rows_keep_their_position(test_database, tmp_path):
+    path = write_csv(tmp_path / "strom.csv", [
+        "2024-01-01 12:00:00,100.0", "gestern,101.0", "2024-01-03 12:00:00,abc", "2024-01-04 12:00:00,1.25"
+    ])
+    result = import_file(test_database, "electricity", path)
+    assert result["inserted"] == 1
+    assert [(rejection["index"], rejection["code"]) for rejection in result["rejected"]] == [
+        (1, "timestamp"), (2, "type"), (3, "precision")
+    ]
+
+def test_progress_is_reported(test_database, readings, tmp_path):
+    test_database.insert_gas_meters_bulk(readings)
+    path = str(tmp_path / "gas.csv.gz")
+    exported = []
+    export_file(test_database, "gas", path, batch_size=10, progress=lambda done, total: exported.append((done, total)))
+    assert exported == [(10, 28), (20, 28), (28, 28)]
+
+    imported = []
+    test_database.delete_all_data()
+    import_file(test_database, "gas", path, batch_size=2, progress=lambda done, total: imported.append((done, total)))
+    assert imported[-1][0] == imported[-1][1]
+    assert all(done <= total for done, total in imported)
+    assert [done for done, _ in imported] == sorted(done for done, _ in imported)
+
+def test_export_range(test_database, readings, tmp_path):
+    test_database.insert_gas_meters_bulk(readings)
+    path = tmp_path / "gas.csv"
+    assert export_file(test_database, "gas", str(path), start="2024-01-10", end="2024-01-12") == 2
+    assert path.read_text().splitlines()[1:] == ["2024-01-10 12:00:00,1005.0", "2024-01-11 12:00:00,1005.5"]
+
+def test_gzip_export_is_compressed(test_database, readings, tmp_path):
+    test_database.insert_gas_meters_bulk(readings)
+    path = tmp_path / "gas.csv.gz"
+    export_file(test_database, "gas", str(path))
+    with gzip.open(path, "rt") as file:
+        assert file.readline() == "timestamp,reading\n"
+    assert not (tmp_path / "gas.csv.gz.tmp.gz").exists()
+
+def test_failed_export_removes_temporary_file(test_database, readings, tmp_path):
+    test_database.insert_gas_meters_bulk(readings)
+    path = tmp_path / "gas.csv"
+
+    def fail(done, total):
+        raise RuntimeError("Abbruch")
+
+    with pytest.raises(RuntimeError):
+        export_file(test_database, "gas", str(path), batch_size=10, progress=fail)
+    assert list(tmp_path.iterdir()) == []
+
+def test_command_line(test_database, tmp_path, capsys):
+    path = write_csv(tmp_path / "strom.csv", ["2024-01-01 12:00:00,100.0", "2024-01-02 12:00:00,101.0"])
+    main(["import", path, "--meter", "electricity", "--database", "tests/test_flowmeter.db", "--quiet"])
+    assert "2 Einträge importiert, 0 Duplikate, 0 abgelehnt." in capsys.readouterr().out
+    export = str(tmp_path / "export.jsonl")
+    main(["export", export, "--meter", "electricity", "--database", "tests/test_flowmeter.db", "--quiet"])
+    assert "2 Einträge exportiert." in capsys.readouterr().out
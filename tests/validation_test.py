@@ -0,0 +1,57 @@
+import time
+import numpy as np
+import pytest
+from flowmeter.database.validation import ReadingValidator, ValidationError
+
+@pytest.fixture
+def electricity():
+    return ReadingValidator(6, 1, "electricity-Zählerstand")
+
+@pytest.fixture
+def gas():
+    return ReadingValidator(5, 3, "gas-Zählerstand")
+
+def test_valid_values_are_scaled(electricity, gas):
+    assert electricity.validate(123456.7) == 1234567
+    assert electricity.validate(0.0) == 0
+    assert gas.validate(12345.678) == 12345678
+    assert gas.validate(0.001) == 1
+
+@pytest.mark.parametrize("value, code", [
+    (12, "type"),
+    ("12.5", "type"),
+    (True, "type"),
+    (None, "type"),
+    (-0.5, "negative"),
+    (1234567.0, "range"),
+    (float("inf"), "range"),
+    (float("nan"), "range"),
+    (1.25, "precision"),
+    (1e-05, "precision"),
+    (0.1 + 0.2, "precision"),
+])
+def test_invalid_values(electricity, value, code):
+    with pytest.raises(ValidationError) as error:
+        electricity.validate(value)
+    assert error.value.code == code
+    assert isinstance(error.value, ValueError)
+
+def test_float_repr_edge_cases(gas):
+    # str() liefert hier Exponentialschreibweise, der Wert ist trotzdem exakt darstellbar
+    assert gas.check(1e-3) is None
+    assert gas.check(1e4) is None
+    assert gas.check(1e-05)[0] == "precision"
+    assert gas.check(1e5)[0] == "range"
+
+def test_validate_array(gas):
+    scaled, errors = gas.validate_array(np.array([1.5, -1.0, 0.0001, 99999.999, 100000.0, np.nan]))
+    assert scaled.tolist() == [1500, 0, 0, 99999999, 0, 0]
+    assert [(error["index"], error["code"]) for error in errors] == [(1, "negative"), (2, "precision"), (4, "range"), (5, "range")]
+
+def test_validate_array_is_fast(electricity):
+    values = np.round(np.random.default_rng(1).uniform(0, 999999, 1_000_000), 1)
+    start = time.perf_counter()
+    scaled, errors = electricity.validate_array(values)
+    assert time.perf_counter() - start < 0.5
+    assert errors == []
+    assert np.array_equal(scaled, np.rint(values * 10).astype(np.int64))